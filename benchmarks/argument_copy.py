@@ -0,0 +1,64 @@
+"""
+Time and memory spent on copying arguments while building a sweep that passes
+the same large NumPy array to many scheduled calls. By default every argument
+is deep-copied (`call_by_value`); compare with functions marked
+`schedule_hint(pass_by='readonly')`, and with passing a read-only array, which
+is recognised as immutable and never copied.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/argument_copy.py [MB] [calls]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from noodles import schedule, schedule_hint, gather, get_workflow
+
+
+@schedule
+def mean_copy(a, i):
+    return a.mean() + i
+
+
+@schedule_hint(pass_by='readonly')
+def mean_readonly(a, i):
+    return a.mean() + i
+
+
+def measure(f, data, calls):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    wf = get_workflow(gather(*[f(data, i) for i in range(calls)]))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del wf
+    return elapsed, peak
+
+
+def main(mb, calls):
+    data = np.zeros(mb * 2**20 // 8)
+    frozen = data.copy()
+    frozen.setflags(write=False)
+
+    cases = [
+        ('copy', mean_copy, data),
+        ('readonly hint', mean_readonly, data),
+        ('frozen array', mean_copy, frozen)]
+
+    print("{} calls on a {} MB array".format(calls, mb))
+    print("{:>14} {:>10} {:>12}".format("mode", "time (s)", "peak (MB)"))
+    for name, f, arg in cases:
+        elapsed, peak = measure(f, arg, calls)
+        print("{:>14} {:>10.3f} {:>12.1f}".format(name, elapsed, peak / 2**20))
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [100, 20][len(args):]))
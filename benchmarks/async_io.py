@@ -0,0 +1,55 @@
+"""
+Many I/O bound jobs, simulated by sleeping for 50 ms. With `run_parallel`,
+every job that is waiting occupies a thread; with `run_async`, coroutine
+jobs wait on the event loop, so all of them can wait at the same time.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/async_io.py [n [n_threads]]
+"""
+
+import asyncio
+import sys
+import time
+
+from noodles import schedule, gather, run_parallel
+from noodles.run.asynchronous import run_async
+
+
+@schedule
+def wait(i):
+    time.sleep(0.05)
+    return i
+
+
+@schedule
+async def wait_async(i):
+    await asyncio.sleep(0.05)
+    return i
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+def main(n, n_threads):
+    modes = [
+        ('threads', lambda: run_parallel(
+            total(gather(*[wait(i) for i in range(n)])), n_threads)),
+        ('asyncio', lambda: run_async(
+            total(gather(*[wait_async(i) for i in range(n)]))))]
+
+    print("{:>8} {:>8} {:>10} {:>10}".format(
+        "runner", "jobs", "time (s)", "jobs / s"))
+    for name, run in modes:
+        start = time.perf_counter()
+        assert run() == n * (n - 1) // 2
+        elapsed = time.perf_counter() - start
+        print("{:>8} {:>8} {:>10.3f} {:>10.1f}".format(
+            name, n, elapsed, n / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 64)
@@ -0,0 +1,49 @@
+"""
+Per-job overhead for a `patterns.map` over many tiny calls. Every call is a
+job, with its own message, key and entry in the job keeper. With the
+`batch` hint (or `Scheduler(batch=...)`) ready calls to the same function
+are grouped into one message, run in one go by the worker, and split up
+again by the scheduler. Times include building the workflow inside `map`,
+which is the same for every batch size.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/batch_map.py [n [batch ...]]
+"""
+
+import sys
+import time
+
+from noodles import schedule, get_workflow
+from noodles.patterns import map
+from noodles.run.scheduler import Scheduler
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
+
+
+@schedule
+def increment(x):
+    return x + 1
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+def main(n, batch_sizes):
+    print("{:>8} {:>10} {:>10} {:>10}".format(
+        "batch", "calls", "time (s)", "us / call"))
+    for batch in batch_sizes:
+        wf = get_workflow(total(map(increment, range(n))))
+        start = time.perf_counter()
+        result = Scheduler(batch=batch).run(Queue() >> worker, wf)
+        elapsed = time.perf_counter() - start
+        assert result == n * (n + 1) // 2
+        print("{:>8} {:>10} {:>10.3f} {:>10.2f}".format(
+            batch or 1, n, elapsed, elapsed / n * 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+         [int(a) for a in sys.argv[2:]] or [None, 100, 10000])
@@ -0,0 +1,63 @@
+"""
+Deduplication of stored results: a sweep of jobs with different arguments,
+that give only a few different large results. The job database stores every
+result in the record of its job, or keeps results in a content-addressed
+:py:class:`BlobStore`, storing each distinct result once. Shown are the time
+of the first run, the time of a second run that takes all results from the
+database, and the size on disk.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/blob_store.py [n_jobs [n_results [size]]]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from noodles import schedule_hint, gather, serial
+from noodles.run.run_with_prov import run_parallel_opt
+
+
+@schedule_hint(store=True)
+def load(i, n_results, size):
+    return [float(i % n_results)] * size
+
+
+def sweep(n_jobs, n_results, size):
+    return gather(*[load(i, n_results, size) for i in range(n_jobs)])
+
+
+def disk_usage(path):
+    return sum(os.path.getsize(os.path.join(d, f))
+               for d, _, files in os.walk(path) for f in files)
+
+
+def main(n_jobs, n_results, size):
+    print("{:>8} {:>8} {:>10} {:>10} {:>10}".format(
+        "database", "blobs", "run (s)", "rerun (s)", "disk (MB)"))
+
+    for database in ['journal', 'SQLite']:
+        for blobs in [False, True]:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'cache')
+                blob_dir = os.path.join(tmp, 'blobs') if blobs else None
+
+                times = []
+                for _ in range(2):
+                    start = time.perf_counter()
+                    run_parallel_opt(sweep(n_jobs, n_results, size), 4,
+                                     serial.base, path, database=database,
+                                     blob_dir=blob_dir)
+                    times.append(time.perf_counter() - start)
+
+                print("{:>8} {:>8} {:>10.3f} {:>10.3f} {:>10.1f}".format(
+                    database, 'yes' if blobs else 'no', times[0], times[1],
+                    disk_usage(tmp) / 2**20))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 20000)
@@ -0,0 +1,78 @@
+"""
+Serialisation throughput of the base registry, for job messages as sent by
+`run_process` (one JSON line per job), for a nested workflow (as sent by the
+scheduler when a job returns a workflow) and for plain result payloads
+(lists and dicts of numbers and strings). Every object on the way passes
+through `Registry.encode`, which looks up the serialiser for its type.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/encode_throughput.py [n]
+"""
+
+import sys
+import time
+
+from noodles import schedule, gather, get_workflow, serial
+from noodles.run.messages import JobMessage
+
+
+@schedule
+def simulate(x, y, method='fast'):
+    return x * y
+
+
+@schedule
+def combine(a, b):
+    return a + b
+
+
+def nested_workflow(n):
+    results = [simulate(i, 0.5) for i in range(n)]
+    while len(results) > 1:
+        results = [combine(a, b) for a, b in
+                   zip(results[0::2], results[1::2])] + results[len(results) & ~1:]
+    return get_workflow(gather(results[0], *[simulate(i, i) for i in range(n)]))
+
+
+def job_messages(n):
+    wf = get_workflow(gather(*[simulate(i, 0.5) for i in range(n)]))
+    return [JobMessage(str(i), node) for i, node in enumerate(wf.nodes.values())]
+
+
+def payload(n):
+    return [{'index': i, 'energy': i * 0.5, 'label': "run-{}".format(i),
+             'coords': [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+             'shape': (3, 2)} for i in range(n)]
+
+
+def throughput(f, obj, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = f(obj)
+        best = min(best, time.perf_counter() - start)
+    return best, len(data)
+
+
+def main(n):
+    registry = serial.base()
+    cases = [
+        ('jobs', job_messages(n)),
+        ('workflow', nested_workflow(n)),
+        ('payload', payload(n))]
+
+    def to_json_lines(msgs):
+        return "\n".join(registry.to_json(m) for m in msgs)
+
+    print("{:>10} {:>10} {:>10} {:>10}".format(
+        "object", "time (s)", "MB", "MB / s"))
+    for name, obj in cases:
+        f = to_json_lines if name == 'jobs' else registry.to_json
+        elapsed, size = throughput(f, obj)
+        print("{:>10} {:>10.3f} {:>10.2f} {:>10.1f}".format(
+            name, elapsed, size / 2**20, size / 2**20 / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
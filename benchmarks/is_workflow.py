@@ -0,0 +1,70 @@
+"""
+Cost of recognising promises among the arguments of a call. Every argument
+passed to a scheduled function is checked with :py:func:`is_workflow`, and
+every result coming back to the scheduler as well. These checks used to call
+`dir(x)`, which builds and sorts the full attribute list of `x`; now only
+the `__is_workflow__` marker on the type of `x` is looked up.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/is_workflow.py [n]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from noodles import schedule, get_workflow
+from noodles.workflow import is_workflow, Workflow
+
+
+@schedule
+def value(x):
+    return x
+
+
+@schedule
+def add(a, b):
+    return a + b
+
+
+def is_workflow_dir(x):
+    """The old implementation."""
+    return isinstance(x, Workflow) or ('_workflow' in dir(x))
+
+
+def per_call(check, x, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        check(x)
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def main(n):
+    samples = [
+        ('int', 42),
+        ('str', "hello"),
+        ('list', list(range(10))),
+        ('ndarray', np.zeros(10)),
+        ('promise', value(1)),
+        ('workflow', get_workflow(value(1)))]
+
+    print("{:>10} {:>12} {:>12}".format(
+        "argument", "dir (ns)", "marker (ns)"))
+    for name, x in samples:
+        assert is_workflow(x) == is_workflow_dir(x)
+        print("{:>10} {:>12.0f} {:>12.0f}".format(
+            name, per_call(is_workflow_dir, x, n), per_call(is_workflow, x, n)))
+
+    start = time.perf_counter()
+    x = value(0)
+    for i in range(n // 10):
+        x = add(x, i)
+    get_workflow(x).nodes
+    print("\nbuilding a chain of {} calls: {:.1f} us / call".format(
+        n // 10, (time.perf_counter() - start) / (n // 10) * 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,75 @@
+"""
+Job database backends for the caching runners: TinyDB, SQLite and the
+append-only journal. For a growing history of `n` jobs, we time storing
+them (registering each job, a time stamp and its result), and looking each
+of them up again, as a cache hit. TinyDB scans and rewrites its whole file
+for every operation, so it is only run for the smaller sizes.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/job_db.py [n ...]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from noodles.prov import open_job_db
+from noodles.run.job_keeper import JobKeeper
+
+
+def job_msg(i):
+    return {'data': {'function': 'benchmarks.job_db.work',
+                     'arguments': [[{'kind': 'regular', 'name': 'x'}, i]],
+                     'hints': {'version': '1'}}}
+
+
+def prov(i):
+    return '{:032x}'.format(i)
+
+
+def store(db, n):
+    for key in range(n):
+        db.new_job(key, prov(key), job_msg(key))
+        db.add_time_stamp(key, 'start')
+        db.store_result(key, key)
+
+
+def retrieve(db, n):
+    running = JobKeeper()
+    for key in range(n):
+        assert db.job_exists(prov(key))
+        status, _, result = db.get_result_or_attach(key, prov(key), running)
+        assert status == 'retrieved' and result == key
+
+
+def main(sizes):
+    print("{:>8} {:>8} {:>10} {:>10}".format(
+        "database", "jobs", "store (s)", "hit (s)"))
+    for database in ['TinyDB', 'SQLite', 'journal']:
+        for n in sizes:
+            if database == 'TinyDB' and n > 1000:
+                continue
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'cache')
+
+                db = open_job_db(database, path)
+                start = time.perf_counter()
+                store(db, n)
+                if hasattr(db, 'flush'):
+                    db.flush()
+                stored = time.perf_counter()
+
+                retrieve(db, n)
+                done = time.perf_counter()
+                if hasattr(db, 'close'):
+                    db.close()
+
+            print("{:>8} {:>8} {:>10.3f} {:>10.3f}".format(
+                database, n, stored - start, done - stored))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [250, 1000, 100000])
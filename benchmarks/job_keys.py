@@ -0,0 +1,69 @@
+"""
+Scheduling throughput with different kinds of job keys: `uuid4` strings (the
+old default), compact 64-bit integers from `job_keys` (the new default), and
+a plain counter. We time registering jobs with the `JobKeeper` on its own,
+and a complete run of a wide `gather` in a single thread, which also hashes
+each key a few times on its way through the scheduler.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/job_keys.py [n]
+"""
+
+import sys
+import time
+import uuid
+from itertools import count
+
+from noodles import schedule, gather, get_workflow
+from noodles.run.scheduler import (Scheduler, Job)
+from noodles.run.job_keeper import (JobKeeper, job_keys)
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
+
+
+@schedule
+def value(x):
+    return x
+
+
+def uuid_keys():
+    while True:
+        yield str(uuid.uuid4())
+
+
+def register(n, keys):
+    wf = get_workflow(value(0))
+    jobs = JobKeeper(keys=keys)
+    job = Job(wf, wf.root)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        key, _ = jobs.register(job)
+        del jobs[key]
+    return time.perf_counter() - start
+
+
+def run(n, keys):
+    wf = get_workflow(gather(*[value(i) for i in range(n)]))
+
+    start = time.perf_counter()
+    Scheduler(job_keeper=JobKeeper(keys=keys)).run(Queue() >> worker, wf)
+    return time.perf_counter() - start
+
+
+def main(n):
+    modes = [
+        ('uuid4', uuid_keys),
+        ('job_keys', job_keys),
+        ('count', count)]
+
+    print("{:>10} {:>14} {:>14}".format(
+        "keys", "register (us)", "run (us/job)"))
+    for name, keys in modes:
+        print("{:>10} {:>14.2f} {:>14.2f}".format(
+            name, register(n, keys()) / n * 1e6, run(n, keys()) / n * 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,98 @@
+"""
+Makespan of synthetic workflows with the FIFO :py:class:`Scheduler` and the
+:py:class:`PriorityScheduler`, on a pool of threads. Jobs sleep for their
+cost, so the numbers can be compared with the lower bound: the longer of
+the critical path and the total work divided over the threads.
+
+* `chain`: many short independent jobs, created before a chain of longer
+  ones. In FIFO order the chain only starts after the short jobs.
+* `layers`: random layered graph, every node taking two or three inputs
+  from the layer before it, with random costs.
+
+The priority scheduler is run twice: ranking nodes by the number of steps
+to the end of the workflow, and weighting the steps by `cost` hints.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/priority_makespan.py [n_threads]
+"""
+
+import sys
+import time
+import random
+
+from noodles import schedule, gather, update_hints
+from noodles.workflow import (get_workflow, upward_rank)
+from noodles.run.scheduler import Scheduler
+from noodles.run.priority import PriorityScheduler
+from noodles.run.queue import Queue
+from noodles.run.thread_pool import thread_pool
+from noodles.run.worker import worker
+
+
+@schedule
+def step(dt, *args):
+    time.sleep(dt)
+    return dt
+
+
+def job(dt, *args):
+    obj = step(dt, *args)
+    update_hints(obj, {'cost': dt})
+    return obj
+
+
+def chain(n_short=60, n_long=8):
+    short = [job(0.005) for _ in range(n_short)]
+    x = job(0.02)
+    for _ in range(n_long - 1):
+        x = job(0.02, x)
+    return gather(*short, x)
+
+
+def layers(n_layers=8, width=12, seed=1):
+    rng = random.Random(seed)
+    layer = [job(rng.choice([0.002, 0.005, 0.02])) for _ in range(width)]
+    for _ in range(n_layers - 1):
+        layer = [job(rng.choice([0.002, 0.005, 0.02]),
+                     *rng.sample(layer, rng.choice([2, 3])))
+                 for _ in range(width)]
+    return gather(*layer)
+
+
+def lower_bound(wf, n_threads):
+    wf = get_workflow(wf)
+    cost = {n: wf.nodes[n].hints.get('cost', 0) for n in wf.nodes}
+    critical = max(upward_rank(wf.links, cost.get).values())
+    return max(critical, sum(cost.values()) / n_threads)
+
+
+def makespan(wf, scheduler, n_threads):
+    pool = Queue() >> thread_pool(*[worker] * n_threads)
+    start = time.perf_counter()
+    scheduler.run(pool, get_workflow(wf))
+    return time.perf_counter() - start
+
+
+def main(n_threads):
+    modes = [
+        ('fifo', lambda: Scheduler()),
+        ('depth', lambda: PriorityScheduler(n_threads, default_cost=1.0)),
+        ('cost', lambda: PriorityScheduler(n_threads))]
+
+    print("{:>8} {:>10} {:>10} {:>10}".format(
+        "dag", "scheduler", "time (s)", "bound (s)"))
+    for name, make in [('chain', chain), ('layers', layers)]:
+        for mode, scheduler in modes:
+            wf = make()
+            if mode == 'depth':
+                for node in get_workflow(wf).nodes.values():
+                    node.hints.pop('cost', None)
+
+            bound = lower_bound(make(), n_threads)
+            print("{:>8} {:>10} {:>10.3f} {:>10.3f}".format(
+                name, mode, makespan(wf, scheduler(), n_threads), bound))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
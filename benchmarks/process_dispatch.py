@@ -0,0 +1,79 @@
+"""
+Dispatch of many short jobs over a number of worker processes. We compare
+picking a worker at random for every job (what `run_process` used to do)
+with sending each job to the least loaded worker, holding one or two jobs
+in flight per worker. A few of the jobs take ten times longer than the
+rest; with random dispatch, other jobs pile up behind them while some
+workers sit idle. Times include starting the workers.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/process_dispatch.py [n_jobs [n_workers]]
+"""
+
+import os
+import sys
+import time
+import random
+
+from noodles import schedule, gather, serial, Scheduler
+from noodles.workflow import get_workflow
+from noodles.run.process import process_worker
+from noodles.run.hybrid import (
+    hybrid_threaded_worker, balanced_threaded_worker)
+
+
+@schedule
+def work(i, dt):
+    time.sleep(dt)
+    return i
+
+
+def workflow(n_jobs):
+    return gather(*[work(i, 0.02 if i % 20 == 0 else 0.002)
+                    for i in range(n_jobs)])
+
+
+def start_workers(n_workers, capacity=None):
+    return {i: process_worker(serial.base, capacity=capacity)
+            for i in range(n_workers)}
+
+
+def random_dispatch(n_workers):
+    workers = start_workers(n_workers)
+    names = list(workers)
+    return hybrid_threaded_worker(lambda job: random.choice(names), workers)
+
+
+def balanced_dispatch(capacity):
+    return lambda n_workers: balanced_threaded_worker(
+        start_workers(n_workers, capacity))
+
+
+def main(n_jobs, n_workers):
+    modes = [
+        ('random', random_dispatch),
+        ('credit 1', balanced_dispatch(1)),
+        ('credit 2', balanced_dispatch(2))]
+
+    print("{:>10} {:>8} {:>10} {:>10}".format(
+        "dispatch", "jobs", "time (s)", "jobs / s"))
+    for name, connect in modes:
+        start = time.perf_counter()
+        result = Scheduler().run(
+            connect(n_workers), get_workflow(workflow(n_jobs)))
+        elapsed = time.perf_counter() - start
+        assert result == list(range(n_jobs))
+        print("{:>10} {:>8} {:>10.3f} {:>10.1f}".format(
+            name, n_jobs, elapsed, n_jobs / elapsed))
+
+
+if __name__ == '__main__':
+    # the workers import the scheduled function from this module by name
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['PYTHONPATH'] = os.pathsep.join(
+        [sys.path[0], os.environ.get('PYTHONPATH', '')])
+
+    from process_dispatch import main
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
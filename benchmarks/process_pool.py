@@ -0,0 +1,57 @@
+"""
+Per-job latency and CPU-bound scaling of `run_process_pool`, compared with
+`run_process`, which sends every job as a line of JSON to a worker started
+through `worker.sh`. Times include starting the workers.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/process_pool.py [n_jobs [n_workers]]
+"""
+
+import os
+import sys
+import time
+
+from noodles import schedule, gather, serial, run_process
+from noodles.run.process_pool import run_process_pool
+
+
+@schedule
+def tiny(i):
+    return i
+
+
+@schedule
+def busy(i):
+    x = 0
+    for j in range(200000):
+        x += j % 7
+    return i
+
+
+def main(n_jobs, n_workers):
+    runners = [
+        ('process', lambda wf: run_process(
+            wf, n_workers, registry=serial.base)),
+        ('pool', lambda wf: run_process_pool(wf, n_workers))]
+
+    print("{:>8} {:>6} {:>8} {:>10} {:>12}".format(
+        "runner", "jobs", "kind", "time (s)", "ms / job"))
+    for kind, f, n in [('tiny', tiny, n_jobs), ('busy', busy, n_jobs // 10)]:
+        for name, run in runners:
+            start = time.perf_counter()
+            assert run(gather(*[f(i) for i in range(n)])) == list(range(n))
+            elapsed = time.perf_counter() - start
+            print("{:>8} {:>6} {:>8} {:>10.3f} {:>12.3f}".format(
+                name, n, kind, elapsed, elapsed / n * 1e3))
+
+
+if __name__ == '__main__':
+    # the workers import the scheduled functions from this module by name
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['PYTHONPATH'] = os.pathsep.join(
+        [sys.path[0], os.environ.get('PYTHONPATH', '')])
+
+    from process_pool import main
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
@@ -0,0 +1,79 @@
+"""
+Round-trip throughput of NumPy arrays between the scheduler and a worker
+process started with `run_process`. The array is sent to the worker as the
+argument of a job, and comes back as its result. We compare the JSON lines
+protocol, where arrays are saved with `numpy.save` and base64 encoded, with
+the framed protocol, where arrays travel as raw out-of-band buffers, and
+with shared memory, where only the name of a segment is sent.
+The base64 path needs several copies of the array in memory at once, so it
+is skipped for arrays larger than 256 MB. Times include starting the worker.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/process_roundtrip.py [MB ...]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from noodles import schedule_hint, serial, run_process
+from noodles.serial.numpy import (
+    arrays_to_string, arrays_to_buffers, arrays_to_shared_memory)
+
+
+def registry_base64():
+    return serial.base() + arrays_to_string()
+
+
+def registry_framed():
+    return serial.base() + arrays_to_buffers()
+
+
+def registry_shared():
+    return serial.base() + arrays_to_shared_memory()
+
+
+@schedule_hint(pass_by='readonly')
+def identity(a):
+    return a
+
+
+def roundtrip(a, **kwargs):
+    start = time.perf_counter()
+    b = run_process(identity(a), n_processes=1, **kwargs)
+    elapsed = time.perf_counter() - start
+    assert b.shape == a.shape and b[-1] == a[-1]
+    return elapsed
+
+
+def main(sizes):
+    modes = [
+        ('base64', dict(registry=registry_base64)),
+        ('framed', dict(registry=registry_framed, framed=True)),
+        ('shared', dict(registry=registry_shared))]
+
+    startup = min(roundtrip(np.zeros(1), **kw) for _, kw in modes)
+    print("worker start-up: {:.3f} s".format(startup))
+
+    print("{:>8} {:>8} {:>10} {:>10}".format("MB", "mode", "time (s)", "MB / s"))
+    for mb in sizes:
+        a = np.random.random(mb * 2**20 // 8)
+        for name, kwargs in modes:
+            if name == 'base64' and mb > 256:
+                continue
+            elapsed = roundtrip(a, **kwargs)
+            print("{:>8} {:>8} {:>10.3f} {:>10.1f}".format(
+                mb, name, elapsed, 2 * mb / elapsed))
+
+
+if __name__ == '__main__':
+    # the worker imports the registry from this module by name
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ['PYTHONPATH'] = os.pathsep.join(
+        [sys.path[0], os.environ.get('PYTHONPATH', '')])
+
+    from process_roundtrip import main
+    main([int(a) for a in sys.argv[1:]] or [1, 16, 256, 1024])
@@ -0,0 +1,56 @@
+"""
+Result reuse with the caching runner: a sweep of jobs, most of which have
+already been run with the same arguments. Results come from the job
+database, or from an :py:class:`LRUCache` of encoded results in front of
+the database; either way they are decoded for every job. The database is
+filled by a first run, which is not timed.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/prov_cache.py [n_jobs [n_keys [size]]]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from noodles import schedule_hint, gather, serial
+from noodles.prov.cache import LRUCache
+from noodles.run.run_with_prov import run_parallel_opt
+
+
+@schedule_hint(store=True)
+def load(i, size):
+    return [float(i)] * size
+
+
+def sweep(n_jobs, n_keys, size):
+    return gather(*[load(i % n_keys, size) for i in range(n_jobs)])
+
+
+def main(n_jobs, n_keys, size):
+    print("{:>8} {:>8} {:>10} {:>10}".format(
+        "database", "cache", "time (s)", "hit rate"))
+
+    for database in ['journal', 'SQLite']:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache')
+            run_parallel_opt(sweep(n_keys, n_keys, size), 4, serial.base,
+                             path, database=database)
+
+            for cache in [None, LRUCache(2**28)]:
+                start = time.perf_counter()
+                run_parallel_opt(sweep(n_jobs, n_keys, size), 4, serial.base,
+                                 path, database=database, cache=cache)
+                elapsed = time.perf_counter() - start
+
+                print("{:>8} {:>8} {:>10.3f} {:>10}".format(
+                    database, 'lru' if cache else 'none', elapsed,
+                    "{:.3f}".format(cache.hit_rate) if cache else '-'))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 10000)
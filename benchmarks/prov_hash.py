@@ -0,0 +1,82 @@
+"""
+Computing provenance keys of jobs with large arguments. We compare hashing
+the text of `json.dumps` (what `prov_key` used to do) with feeding the hash
+while walking the encoded message, with MD5 and BLAKE2b, and with taking the
+`bytes` argument out of the message so that it is hashed as raw bytes.
+Time and peak memory (from `tracemalloc`, in a separate run) are for the
+hashing only; the job is encoded beforehand.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/prov_hash.py [n_megabytes]
+"""
+
+import sys
+import time
+import json
+import random
+import hashlib
+import tracemalloc
+
+from noodles import schedule, serial
+from noodles.prov.key import prov_key
+from noodles.serial.buffer import out_of_band
+
+
+@schedule
+def process(data):
+    return len(data)
+
+
+def old_prov_key(job_msg):
+    m = hashlib.md5()
+    for obj in [job_msg['data']['function'], job_msg['data']['arguments'],
+                job_msg['data']['hints']['version']]:
+        m.update(json.dumps(obj, sort_keys=True).encode())
+    return m.hexdigest()
+
+
+def measure(f):
+    start = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - start
+
+    # memory is traced in a second run, tracing slows things down
+    tracemalloc.start()
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(n_megabytes):
+    registry = serial.base()
+    size = n_megabytes * 2**20
+    jobs = [
+        ('floats', [random.random() for _ in range(size // 24)]),
+        ('bytes', random.randbytes(size))]
+
+    print("{:>8} {:>16} {:>10} {:>10}".format(
+        "argument", "method", "time (s)", "peak (MB)"))
+    for name, data in jobs:
+        node = process(data)._workflow.root_node
+        job_msg = registry.deep_encode(node)
+        with out_of_band() as buffers:
+            oob_msg = registry.deep_encode(node)
+
+        methods = [
+            ('json.dumps', lambda: old_prov_key(job_msg)),
+            ('stream md5', lambda: prov_key(job_msg)),
+            ('stream blake2b', lambda: prov_key(job_msg, hash='blake2b'))]
+        if buffers:
+            methods.append(
+                ('raw buffer', lambda: prov_key(oob_msg, buffers=buffers)))
+
+        for method, f in methods:
+            elapsed, peak = measure(f)
+            print("{:>8} {:>16} {:>10.3f} {:>10.1f}".format(
+                name, method, elapsed, peak / 2**20))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,76 @@
+"""
+Peak memory of a long pipeline, with and without releasing results. Each of
+`n` items goes through three stages; the first two produce a 10 kB buffer,
+the last one reduces it to a number, and all numbers are summed at the end.
+With `Scheduler(release=True)` a buffer is dropped as soon as the next stage
+has run; otherwise all of them are kept until the end of the run. Jobs run
+in the order they become ready, so all buffers of the first stage exist at
+the same time in either mode. Each mode runs in a fresh process,
+since the peak RSS of a process never goes down.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/release_memory.py [n]
+"""
+
+import os
+import sys
+import time
+import resource
+import subprocess
+
+from noodles import schedule, gather, get_workflow
+from noodles.run.scheduler import Scheduler
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
+
+
+@schedule
+def produce(i):
+    return bytes(10000)
+
+
+@schedule
+def transform(data):
+    return data + b'x'
+
+
+@schedule
+def reduce(data):
+    return len(data)
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+def pipeline(n):
+    return total(gather(*[reduce(transform(produce(i))) for i in range(n)]))
+
+
+def measure(n, release):
+    wf = get_workflow(pipeline(n))
+    start = time.perf_counter()
+    result = Scheduler(release=release).run(Queue() >> worker, wf)
+    elapsed = time.perf_counter() - start
+    assert result == n * 10001
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("{:>8} {:>8} {:>10.3f} {:>14.1f}".format(
+        "release" if release else "keep", 4 * n + 2, elapsed, peak / 1024))
+
+
+def main(n):
+    print("{:>8} {:>8} {:>10} {:>14}".format(
+        "mode", "nodes", "time (s)", "peak RSS (MB)"), flush=True)
+    for mode in ['keep', 'release']:
+        subprocess.check_call(
+            [sys.executable, os.path.abspath(__file__), str(n), mode])
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 25000
+    if len(sys.argv) > 2:
+        measure(n, sys.argv[2] == 'release')
+    else:
+        main(n)
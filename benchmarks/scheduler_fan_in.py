@@ -0,0 +1,64 @@
+"""
+Scheduler micro-benchmark: a single `gather` over many independent jobs.
+
+Every result that comes back is inserted into the gather node. The scheduler
+used to rescan all arguments of the gather node after each insertion to see
+if it was ready, making this workflow quadratic in the number of jobs. Now
+the number of pending arguments is counted once and decremented on every
+insertion.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/scheduler_fan_in.py [n ...]
+"""
+
+import sys
+import time
+
+from noodles import schedule, gather, get_workflow
+from noodles.run.scheduler import Scheduler
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
+from noodles.workflow import is_node_ready
+
+
+@schedule
+def value(x):
+    return x
+
+
+def fan_in(n):
+    return get_workflow(gather(*[value(i) for i in range(n)]))
+
+
+def run(wf):
+    return Scheduler().run(Queue() >> worker, wf)
+
+
+def rescan_estimate(wf, n, samples=100):
+    """Time `is_node_ready` on the gather node; the old scheduler did this
+    once for every incoming result."""
+    node = wf.root_node
+    start = time.perf_counter()
+    for _ in range(samples):
+        is_node_ready(node)
+    return (time.perf_counter() - start) / samples * n
+
+
+def main(sizes):
+    print("{:>8} {:>10} {:>10} {:>14}".format(
+        "nodes", "build (s)", "run (s)", "rescan est (s)"))
+    for n in sizes:
+        start = time.perf_counter()
+        wf = fan_in(n)
+        built = time.perf_counter()
+        result = run(wf)
+        done = time.perf_counter()
+        assert result == list(range(n))
+
+        print("{:>8} {:>10.3f} {:>10.3f} {:>14.1f}".format(
+            n + 1, built - start, done - built, rescan_estimate(wf, n)))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,72 @@
+"""
+Throughput of the SQLite job database, as used by the caching runners in
+:py:mod:`noodles.run.run_with_sqlite`. Every job takes a look-up by prov
+key; a miss registers the job, stamps its start and stores its result, a hit
+retrieves the stored result. Writes are committed in groups by a background
+thread, so the time for the misses includes waiting for the last commit.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/sqlite_cache.py [n_jobs]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from noodles.prov.sqlite import JobDB
+from noodles.run.job_keeper import JobKeeper
+
+
+def job_msg(i):
+    return {'data': {'function': 'benchmarks.sqlite_cache.work',
+                     'arguments': [[{'kind': 'regular', 'name': 'x'}, i]],
+                     'hints': {'version': '1'}}}
+
+
+def prov(i):
+    return '{:032x}'.format(i)
+
+
+def misses(db, n_jobs):
+    running = JobKeeper()
+    for key in range(n_jobs):
+        p = prov(key)
+        if db.job_exists(p):
+            db.get_result_or_attach(key, p, running)
+            continue
+
+        db.new_job(key, p, job_msg(key))
+        db.add_time_stamp(key, 'start')
+        db.store_result(key, key)
+    db.flush()
+
+
+def hits(db, n_jobs):
+    running = JobKeeper()
+    for key in range(n_jobs):
+        p = prov(key)
+        if db.job_exists(p):
+            status, _, result = db.get_result_or_attach(key, p, running)
+            assert status == 'retrieved' and result == key
+
+
+def main(n_jobs):
+    print("{:>8} {:>8} {:>10} {:>10}".format(
+        "lookup", "jobs", "time (s)", "jobs / s"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.db')
+        for name, run in [('miss', misses), ('hit', hits)]:
+            with JobDB(path) as db:
+                start = time.perf_counter()
+                run(db, n_jobs)
+                elapsed = time.perf_counter() - start
+
+            print("{:>8} {:>8} {:>10.3f} {:>10.1f}".format(
+                name, n_jobs, elapsed, n_jobs / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,40 @@
+"""
+Thread pool overhead on many trivial jobs: `run_parallel` with the shared
+job queue of :py:func:`thread_pool`, against the per-thread deques of
+:py:func:`work_stealing_pool`. The jobs do next to nothing, so this measures
+the cost of getting a job to a thread and its result back to the scheduler.
+Times include building the workflow, which is the same for both.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/work_stealing.py [n_jobs [n_threads]]
+"""
+
+import sys
+import time
+
+from noodles import schedule, gather, run_parallel
+
+
+@schedule
+def value(x):
+    return x
+
+
+def main(n_jobs, n_threads):
+    print("{:>14} {:>8} {:>10} {:>10}".format(
+        "engine", "jobs", "time (s)", "jobs / s"))
+    for engine in ['queue', 'work_stealing']:
+        start = time.perf_counter()
+        result = run_parallel(
+            gather(*[value(i) for i in range(n_jobs)]), n_threads,
+            engine=engine)
+        elapsed = time.perf_counter() - start
+        assert result == list(range(n_jobs))
+        print("{:>14} {:>8} {:>10.3f} {:>10.1f}".format(
+            engine, n_jobs, elapsed, n_jobs / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
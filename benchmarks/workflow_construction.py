@@ -0,0 +1,64 @@
+"""
+Graph-construction benchmark: time to build a workflow (including the first
+access to its `nodes` and `links`) for chains, binary reduction trees and
+wide gathers. With workflows sharing structure in :py:func:`from_call`, the
+time per node should stay flat as the size grows; when every call copied the
+nodes of its arguments, chains and trees grew as `O(n d)`.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/workflow_construction.py [n ...]
+"""
+
+import sys
+import time
+
+from noodles import schedule, gather, get_workflow
+
+
+@schedule
+def value(x):
+    return x
+
+
+@schedule
+def add(a, b):
+    return a + b
+
+
+def chain(n):
+    x = value(0)
+    for i in range(n - 1):
+        x = add(x, 1)
+    return x
+
+
+def tree(n):
+    level = [value(i) for i in range(n // 2 + 1)]
+    while len(level) > 1:
+        pairs = zip(level[0::2], level[1::2])
+        rest = [level[-1]] if len(level) % 2 else []
+        level = [add(a, b) for a, b in pairs] + rest
+    return level[0]
+
+
+def wide(n):
+    return gather(*[value(i) for i in range(n - 1)])
+
+
+def main(sizes):
+    print("{:>6} {:>8} {:>10} {:>12}".format(
+        "shape", "nodes", "time (s)", "us / node"))
+    for name, build in [('chain', chain), ('tree', tree), ('gather', wide)]:
+        for n in sizes:
+            start = time.perf_counter()
+            wf = get_workflow(build(n))
+            nodes = len(wf.nodes)
+            assert len(wf.links) == nodes
+            elapsed = time.perf_counter() - start
+            print("{:>6} {:>8} {:>10.3f} {:>12.1f}".format(
+                name, nodes, elapsed, elapsed / nodes * 1e6))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 4000, 16000])
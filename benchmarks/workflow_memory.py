@@ -0,0 +1,51 @@
+"""
+Memory used per node by a parameter-sweep workflow, for the default
+dict-of-sets layout and the array backed :py:class:`CompactWorkflow`.
+
+Run from the repository root::
+
+    > PYTHONPATH=. python benchmarks/workflow_memory.py [n]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from noodles import schedule, gather, get_workflow
+from noodles.workflow import compact_workflow
+
+
+@schedule
+def simulate(x, y, method='fast'):
+    return x * y
+
+
+def sweep(n):
+    return gather(*[simulate(i, 0.5) for i in range(n)])
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    wf = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, len(wf.nodes)
+
+
+def main(n):
+    layouts = [
+        ('dict', lambda: get_workflow(sweep(n))),
+        ('compact', lambda: compact_workflow(get_workflow(sweep(n))))]
+
+    print("{:>8} {:>10} {:>12} {:>10}".format(
+        "layout", "nodes", "total (MB)", "B / node"))
+    for name, build in layouts:
+        size, nodes = measure(build)
+        print("{:>8} {:>10} {:>12.1f} {:>10.0f}".format(
+            name, nodes, size / 2**20, size / nodes))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
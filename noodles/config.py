@@ -5,6 +5,10 @@ config = {
     # The functioning of the DelayedObject and Storable classes depend
     # on deep-copying arguments to scheduled functions.
     'call_by_value': True,
+
+    # prov_hash: hash function for provenance keys, see `noodles.prov.key`.
+    # Changing this invalidates the keys in existing job databases.
+    'prov_hash': 'md5',
 }
 
 
@@ -10,6 +10,7 @@ import sys
 import inspect
 
 from ..workflow import (from_call, get_workflow)
+from ..workflow.arguments import (argument_spec)
 from .maybe import (maybe)
 
 from noodles.config import config
@@ -41,6 +42,13 @@ def scheduled_function(f, hints=None):
             f, args, kwargs, deepcopy(hints),
             call_by_value=config['call_by_value']))
 
+    # cache the signature of `f`, so that it is available to `from_call`
+    # and to the worker decoding jobs for this function.
+    try:
+        argument_spec(f)
+    except (ValueError, TypeError):
+        pass
+
     # add *(scheduled)* to the beginning of the docstring.
     if hasattr(wrapped, '__doc__') and wrapped.__doc__ is not None:
         wrapped.__doc__ = "*(scheduled)* " + wrapped.__doc__
@@ -159,8 +167,7 @@ def update_hints(obj, data):
 
     The hints are modified, in place, on the node. All workflows that contain
     the node are affected."""
-    root = obj._workflow.root
-    obj._workflow.nodes[root].hints.update(data)
+    obj._workflow.root_node.hints.update(data)
 
 
 def result(obj):
@@ -189,6 +196,8 @@ class PromisedObject:
     this future object and schedule methods that were called by the user
     as if nothing weird is going on.
     """
+    __is_workflow__ = True
+
     def __init__(self, workflow):
         self._workflow = workflow
 
@@ -2,6 +2,8 @@ from .functions import (lift)
 
 
 class Escalator:
+    __always_copy__ = True
+
     def __deepcopy__(self, memo):
         return lift(self)
 
@@ -1,4 +1,31 @@
-from .prov import (JobDB)
 from .key import (prov_key)
+from ..utility import (look_up)
 
-__all__ = ['prov_key', 'JobDB']
+try:
+    from .prov import (JobDB)
+except ImportError:
+    pass
+
+databases = {
+    'tinydb': 'noodles.prov.prov.JobDB',
+    'sqlite': 'noodles.prov.sqlite.JobDB',
+    'journal': 'noodles.prov.journal.JobDB'}
+
+
+def open_job_db(database, path, blob_dir=None):
+    """Open a job database. The `database` is one of 'TinyDB' (the
+    default for the runners in :py:mod:`noodles.run.run_with_prov`),
+    'SQLite' or 'journal' (see :py:mod:`noodles.prov.journal`), or the full
+    name of a class taking the path as argument.
+
+    If `blob_dir` is given, large results are kept in a content-addressed
+    store in that directory, see :py:mod:`noodles.prov.blobs`."""
+    cls = look_up(databases.get(database.lower(), database))
+    if blob_dir is None:
+        return cls(path)
+
+    from .blobs import (BlobStore, BlobResults)
+    return BlobResults(cls(path), BlobStore(blob_dir))
+
+
+__all__ = ['prov_key', 'JobDB', 'open_job_db']
@@ -0,0 +1,259 @@
+"""
+Content-addressed result store
+==============================
+
+Job databases store the encoded result of every job in the record of that
+job. When many jobs give the same large result, it is stored many times
+over. The :py:class:`BlobStore` keeps data by its hash in stead: a file
+named by the BLAKE2b hash of its content, in a subdirectory named by the
+first two characters of the hash. Storing the same data twice finds the
+existing file.
+
+Every blob has a reference count, kept in a small SQLite database next to
+the blobs. A blob is deleted once its count drops to zero, see
+:py:meth:`BlobStore.release`; :py:meth:`BlobStore.collect` also removes
+files that are not referenced, like those left by a run that was killed.
+Several processes may share a store: a reference is counted before its
+file is written, and deleting files is done in a transaction on the
+reference counts, so a blob that is being stored is never deleted.
+
+Large blobs are read through `mmap`, so that the data is decoded straight
+from the page cache, without reading it into a `bytes` object first.
+
+:py:class:`BlobResults` puts a blob store in front of a job database: large
+results are stored as a blob, and the job record refers to the blob by its
+id.
+"""
+
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import tempfile
+from threading import Lock
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+class BlobStore:
+    """Stores data by the hash of its content; see the module documentation.
+
+    :param path:
+        Directory for the blobs; it is created if it doesn't exist.
+
+    :param mmap_size:
+        Blobs of at least this many bytes are read through `mmap`.
+    """
+    def __init__(self, path, mmap_size=1 << 20):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.lock = Lock()
+
+        os.makedirs(path, exist_ok=True)
+        self.db = sqlite3.connect(
+            os.path.join(path, 'refs.db'), check_same_thread=False,
+            isolation_level=None)
+        self.db.execute(
+            'create table if not exists "refs" ('
+            '"blob" text primary key, "count" integer not null);')
+
+    def blob_path(self, blob_id):
+        return os.path.join(self.path, blob_id[:2], blob_id[2:])
+
+    def put(self, data):
+        """Store `data`, adding a reference to it.
+
+        :returns: the id of the blob.
+        :rtype: str
+        """
+        blob_id = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self.blob_path(blob_id)
+
+        with self.lock:
+            # count the reference first; from then on, no other process
+            # deletes the blob
+            self.db.execute(
+                'insert into "refs" values (?, 1) on conflict ("blob") '
+                'do update set "count" = "count" + 1;', (blob_id,))
+
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+
+        return blob_id
+
+    def get(self, blob_id):
+        """Returns the data of a blob: a `bytes` object, or a read-only
+        `mmap` for large blobs."""
+        with open(self.blob_path(blob_id), 'rb') as f:
+            if os.fstat(f.fileno()).st_size < self.mmap_size:
+                return f.read()
+
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_text(self, blob_id):
+        """Returns the data of a blob decoded as UTF-8."""
+        data = self.get(blob_id)
+        try:
+            return str(data, 'utf-8')
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    def refcount(self, blob_id):
+        row = self.db.execute(
+            'select "count" from "refs" where "blob" = ?;',
+            (blob_id,)).fetchone()
+        return row[0] if row else 0
+
+    def release(self, blob_id):
+        """Remove a reference to a blob, deleting it if there are no
+        references left."""
+        with self.lock, self._transaction():
+            self.db.execute(
+                'update "refs" set "count" = "count" - 1 where "blob" = ?;',
+                (blob_id,))
+            if self.refcount(blob_id) <= 0:
+                self._delete(blob_id)
+
+    def _transaction(self):
+        """Take the write lock on the reference counts until the end of the
+        `with` block; a `put` in another process waits for it."""
+        self.db.execute('begin immediate;')
+        return _Commit(self.db)
+
+    def _delete(self, blob_id):
+        self.db.execute('delete from "refs" where "blob" = ?;', (blob_id,))
+        try:
+            os.remove(self.blob_path(blob_id))
+        except FileNotFoundError:
+            pass
+
+    def collect(self, min_age=60):
+        """Delete blobs without references, and files that are not
+        referenced at all, like those left by an interrupted write. The
+        latter are only removed if they haven't been changed for `min_age`
+        seconds, so that a write in progress is left alone.
+
+        :returns: the number of files removed.
+        """
+        removed = 0
+        with self.lock, self._transaction():
+            before = time.time() - min_age
+            counts = dict(self.db.execute('select * from "refs";'))
+            for blob_id, n in counts.items():
+                if n <= 0:
+                    self._delete(blob_id)
+                    removed += 1
+
+            for shard in os.listdir(self.path):
+                shard_path = os.path.join(self.path, shard)
+                if len(shard) != 2 or not os.path.isdir(shard_path):
+                    continue
+
+                for name in os.listdir(shard_path):
+                    if shard + name in counts:
+                        continue
+
+                    path = os.path.join(shard_path, name)
+                    try:
+                        if os.stat(path).st_mtime < before:
+                            os.remove(path)
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+
+        return removed
+
+    def close(self):
+        self.db.close()
+
+
+class _Commit:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, e_type, e_value, e_tb):
+        self.db.execute('rollback;' if e_type else 'commit;')
+
+
+def larger_than(obj, size):
+    """Estimate whether `obj`, encoded as JSON, takes at least `size`
+    bytes. This stops walking `obj` as soon as it does, so it costs little
+    compared to encoding, also for large objects."""
+    total = 0
+    stack = [obj]
+    while stack:
+        x = stack.pop()
+        if isinstance(x, str):
+            total += len(x) + 2
+        elif isinstance(x, dict):
+            total += 4 * len(x) + 2
+            stack.extend(x.keys())
+            stack.extend(x.values())
+        elif isinstance(x, (list, tuple)):
+            total += 2 * len(x) + 2
+            if total < size:
+                stack.extend(x)
+        else:
+            total += len(str(x))
+
+        if total >= size:
+            return True
+
+    return False
+
+
+class BlobResults:
+    """Wraps a job database, storing results of about `min_size` bytes
+    or more (encoded as JSON, see :py:func:`larger_than`) in a
+    :py:class:`BlobStore`. The job record gets a reference to the blob in
+    stead of the result. Other methods are those of the job database."""
+    def __init__(self, db, blobs, min_size=4096):
+        self.db = db
+        self.blobs = blobs
+        self.min_size = min_size
+        self.new_keys = set()
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def new_job(self, key, prov, job_msg):
+        self.new_keys.add(key)
+        return self.db.new_job(key, prov, job_msg)
+
+    def store_result(self, key, result):
+        # only jobs in the database get a result; don't store a blob, and
+        # add a reference to it, for any other job.
+        if key in self.new_keys:
+            self.new_keys.discard(key)
+            if larger_than(result, self.min_size):
+                result = {'_noodles_blob': self.blobs.put(
+                    json.dumps(result).encode())}
+
+        return self.db.store_result(key, result)
+
+    def get_result_or_attach(self, key, prov, running):
+        status, other_key, result = self.db.get_result_or_attach(
+            key, prov, running)
+
+        if status == 'retrieved' and isinstance(result, dict) \
+                and '_noodles_blob' in result:
+            result = json.loads(self.blobs.get_text(result['_noodles_blob']))
+
+        return status, other_key, result
+
+    def close(self):
+        self.blobs.close()
+        if hasattr(self.db, 'close'):
+            self.db.close()
@@ -0,0 +1,106 @@
+"""
+Result cache
+============
+
+Looking up a job in the job database means one or two queries, and reading
+the stored result. In a parameter sweep, the same job can come up many
+times; the :py:class:`LRUCache` keeps the most recently used entries in
+memory, up to a given number of bytes.
+
+The runners in :py:mod:`noodles.run.run_with_prov` keep a `(status, record)`
+pair in the cache, by prov key. The status is 'running' for a job that was
+scheduled, so that a duplicate can be attached to it without first asking
+the database whether the job exists, and 'done' for a job with a result;
+the record is then the encoded result, as stored in the database. Only
+finding a 'done' entry counts as a hit; a 'running' one counts as pending,
+since the job still has to be attached in the database. The size
+of an entry is estimated by the size of this record as JSON. Results are
+decoded anew for every job that gets them, so that a job changing its
+argument doesn't change the result seen by later jobs.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+def encoded_size(obj):
+    """The number of bytes of `obj` encoded as JSON."""
+    return len(json.dumps(obj))
+
+
+class LRUCache:
+    """Size bounded mapping, forgetting the least recently used items first.
+
+    :param max_bytes:
+        Largest total size of the items in the cache.
+
+    The cache counts hits, misses and evictions; see :py:meth:`stats`.
+    Items that were found, but that the caller can't use yet, are counted
+    as `pending` instead of hits; see :py:meth:`get`.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.items = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.pending = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None, hit=None):
+        """Look up `key`. If `hit` is given, it tells whether the value
+        found counts as a hit; if not, the lookup is counted as pending."""
+        with self.lock:
+            try:
+                value, _ = self.items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self.items.move_to_end(key)
+            if hit is None or hit(value):
+                self.hits += 1
+            else:
+                self.pending += 1
+            return value
+
+    def put(self, key, value, size):
+        """Add an item of `size` bytes. Items that are larger than the
+        whole cache are not stored."""
+        with self.lock:
+            if key in self.items:
+                self.bytes -= self.items.pop(key)[1]
+
+            if size > self.max_bytes:
+                return
+
+            self.items[key] = (value, size)
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                _, (_, old_size) = self.items.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses + self.pending
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'items': len(self.items), 'bytes': self.bytes,
+                'hits': self.hits, 'misses': self.misses,
+                'pending': self.pending, 'evictions': self.evictions,
+                'hit_rate': self.hit_rate}
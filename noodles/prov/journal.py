@@ -0,0 +1,187 @@
+"""
+Journal job database
+====================
+
+A job database that only ever appends to its file: every new job, result,
+time stamp and removal is written as a line of JSON. When the file is
+opened, the journal is read once to build an index in memory, giving the
+place in the file of each job and its result by prov key. From then on,
+looking up a job doesn't depend on the size of the history, and no write
+rewrites what is already there.
+
+Keys and links are only meaningful during a run, so they are indexed in
+memory only. The result of a job is read back from the file when it is
+asked for.
+
+If a previous run was killed in the middle of writing a line, that line is
+cut off when the journal is opened.
+"""
+
+from threading import Lock
+from collections import defaultdict
+import time
+import os
+import sys
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+
+def time_stamp():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time()))
+
+
+class JobEntry:
+    """A job in the index. The result is given by its place in the
+    journal; `key` and `link` are only set for jobs of the current run."""
+    __slots__ = ('key', 'link', 'result', 'attached')
+
+    def __init__(self, key=None):
+        self.key = key
+        self.link = None
+        self.result = None
+        self.attached = []
+
+
+class JobDB:
+    """Keeps a journal of jobs, with a MD5 hash that encodes the function
+    name, version, and all arguments to the function. This has the same
+    interface as the TinyDB version in :py:mod:`noodles.prov.prov`."""
+    def __init__(self, path):
+        self.lock = Lock()
+        self.jobs = {}
+        self.provs = {}
+        self.links = defaultdict(set)
+
+        size = self.replay(path)
+        self.file = open(path, 'ab')
+        self.file.truncate(size)
+        self.size = size
+        self.reader = open(path, 'rb')
+
+    def replay(self, path):
+        """Build the index from the journal at `path`, returning the size
+        of the part that could be read."""
+        if not os.path.exists(path):
+            return 0
+
+        offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+
+                try:
+                    rec = json.loads(line.decode())
+                except ValueError:
+                    break
+
+                if 'job' in rec:
+                    self.jobs[rec['job']] = JobEntry()
+                elif 'result' in rec and rec['result'] in self.jobs:
+                    self.jobs[rec['result']].result = offset
+                elif 'remove' in rec:
+                    self.jobs.pop(rec['remove'], None)
+
+                offset += len(line)
+
+        return offset
+
+    def append(self, rec):
+        """Write a record to the journal, returning its place."""
+        offset = self.size
+        line = json.dumps(rec).encode() + b'\n'
+        self.file.write(line)
+        self.file.flush()
+        self.size += len(line)
+        return offset
+
+    def read_result(self, offset):
+        self.reader.seek(offset)
+        return json.loads(self.reader.readline().decode())['value']
+
+    def close(self):
+        self.file.close()
+        self.reader.close()
+
+    def get_result_or_attach(self, key, prov, running):
+        with self.lock:
+            rec = self.jobs.get(prov)
+
+            # removed since `job_exists` saw it; run the job anew
+            if rec is None:
+                return 'broken', None, None
+
+            if rec.result is not None:
+                return 'retrieved', rec.key, self.read_result(rec.result)
+
+            job_running = rec.key is not None and rec.key in running
+            wf_running = rec.link in getattr(running, 'workflows', {})
+
+            if job_running or wf_running:
+                rec.attached.append(key)
+                return 'attached', rec.key, None
+
+            print("WARNING: unfinished job in database. Removing it and "
+                  " rerunning.", file=sys.stderr)
+            self.append({'remove': prov})
+            del self.jobs[prov]
+            self.provs.pop(rec.key, None)
+            self.links[rec.link].discard(rec.key)
+            return 'broken', None, None
+
+    def job_exists(self, prov):
+        with self.lock:
+            return prov in self.jobs
+
+    def store_result(self, key, result):
+        with self.lock:
+            prov = self.provs.get(key)
+            if prov is None:
+                return
+
+            rec = self.jobs[prov]
+            self.links[rec.link].discard(key)
+            rec.link = None
+            self.append({'time': prov, 'what': 'done', 'at': time_stamp()})
+            rec.result = self.append({'result': prov, 'value': result})
+
+            attached, rec.attached = rec.attached, []
+            return attached
+
+    def new_job(self, key, prov, job_msg):
+        with self.lock:
+            self.append({
+                'job': prov,
+                'key': key,
+                'at': time_stamp(),
+                'version': job_msg['data']['hints'].get('version'),
+                'function': job_msg['data']['function'],
+                'arguments': job_msg['data']['arguments']})
+            self.jobs[prov] = JobEntry(key)
+            self.provs[key] = prov
+
+        return key, prov
+
+    def add_link(self, key, ppn):
+        with self.lock:
+            prov = self.provs.get(key)
+            if prov is None:
+                return
+
+            rec = self.jobs[prov]
+            self.links[rec.link].discard(key)
+            self.links[ppn].add(key)
+            rec.link = ppn
+
+    def get_linked_jobs(self, ppn):
+        with self.lock:
+            return list(self.links.get(ppn, ()))
+
+    def add_time_stamp(self, key, name):
+        with self.lock:
+            prov = self.provs.get(key)
+            if prov is not None:
+                self.append({'time': prov, 'what': name, 'at': time_stamp()})
@@ -1,26 +1,165 @@
+"""
+Provenance keys
+===============
+
+A job is identified by a hash of its encoded message. The message is fed to
+the hash function as the text that `json.dumps(obj, sort_keys=True)` would
+give, but without building that text first: :py:func:`update_object_hash`
+walks the structure, and hands the text to the hash in chunks. Long strings,
+like base64 encoded arrays, are hashed piece by piece, and lists of plain
+numbers are written by `json` a slice at a time.
+
+Binary buffers that were taken out of the message with
+:py:func:`noodles.serial.buffer.out_of_band` are hashed as raw bytes, after
+the message.
+
+The hash function is chosen by name: 'md5' (the default, see
+`noodles.config`), 'blake2b', or 'xxhash' if the `xxhash` module is
+installed. Keys made with different hash functions don't match, so changing
+this means starting with an empty cache.
+"""
+
 import hashlib
+import json
+from json.encoder import encode_basestring_ascii
+
+from ..config import config
+from ..serial.buffer import out_of_band
+from ..serial.shared_memory import no_segments
 
 try:
-    import ujson as json
+    import xxhash
 except ImportError:
-    import json
+    xxhash = None
+
+chunk_size = 1 << 16
+
+_plain_types = {int, float, bool, type(None)}
+
+
+def hash_function(name):
+    """Returns a new hash object for the hash function `name`."""
+    if name == 'md5':
+        return hashlib.md5()
+    if name == 'blake2b':
+        return hashlib.blake2b(digest_size=16)
+    if name == 'xxhash':
+        if xxhash is None:
+            raise ImportError("The 'xxhash' module is needed to use xxhash "
+                              "for provenance keys.")
+        return xxhash.xxh3_128()
+
+    raise ValueError("Unknown hash function: {}".format(name))
+
+
+class HashWriter:
+    """Collects text and feeds it to the hash `m` in chunks."""
+    def __init__(self, m):
+        self.m = m
+        self.parts = []
+        self.size = 0
+
+    def write(self, s):
+        self.parts.append(s)
+        self.size += len(s)
+        if self.size >= chunk_size:
+            self.flush()
+
+    def flush(self):
+        self.m.update(''.join(self.parts).encode())
+        self.parts = []
+        self.size = 0
+
+    def write_long_string(self, s):
+        self.write('"')
+        self.flush()
+        for i in range(0, len(s), chunk_size):
+            self.m.update(encode_basestring_ascii(
+                s[i:i + chunk_size])[1:-1].encode())
+        self.write('"')
+
+
+def _is_plain(values):
+    return all(type(v) in _plain_types or
+               (type(v) is str and len(v) < chunk_size)
+               for v in values)
+
+
+def _key_text(key):
+    # dictionary keys are converted as `json.dumps` does
+    if isinstance(key, str):
+        return key
+    return json.dumps(key)
+
+
+def _write_object(w, obj):
+    t = type(obj)
+
+    if t is str:
+        if len(obj) < chunk_size:
+            w.write(encode_basestring_ascii(obj))
+        else:
+            w.write_long_string(obj)
+
+    elif isinstance(obj, dict):
+        if len(obj) < 64 and _is_plain(obj.values()):
+            w.write(json.dumps(obj, sort_keys=True))
+            return
+
+        w.write('{')
+        for i, (k, v) in enumerate(sorted(obj.items())):
+            if i:
+                w.write(', ')
+            w.write(encode_basestring_ascii(_key_text(k)))
+            w.write(': ')
+            _write_object(w, v)
+        w.write('}')
+
+    elif isinstance(obj, (list, tuple)):
+        if _is_plain(obj):
+            w.write('[')
+            for i in range(0, len(obj), 4096):
+                if i:
+                    w.write(', ')
+                w.write(json.dumps(list(obj[i:i + 4096]))[1:-1])
+            w.write(']')
+            return
+
+        w.write('[')
+        for i, v in enumerate(obj):
+            if i:
+                w.write(', ')
+            _write_object(w, v)
+        w.write(']')
+
+    else:
+        w.write(json.dumps(obj))
 
 
 def update_object_hash(m, obj):
-    r = json.dumps(obj, sort_keys=True)
-    m.update(r.encode())
+    """Feed `obj` to the hash `m`, as the text of
+    `json.dumps(obj, sort_keys=True)`."""
+    w = HashWriter(m)
+    _write_object(w, obj)
+    w.flush()
     return m
 
 
-def prov_key(job_msg, extra=None):
-    """Retrieves a MD5 sum from a function call. This takes into account the
+def prov_key(job_msg, extra=None, buffers=None, hash=None):
+    """Retrieves a hash from a function call. This takes into account the
     name of the function, the arguments and possibly a version number of the
     function, if that is given in the hints.
     This version can also be auto-generated by generating an MD5 hash from the
     function source. However, the source-code may not always be reachable, or
     the result may depend on an external process which has its own
-    versioning."""
-    m = hashlib.md5()
+    versioning.
+
+    :param buffers:
+        Out-of-band buffers of the message, hashed as raw bytes.
+
+    :param hash:
+        Name of the hash function; by default `config['prov_hash']`."""
+    m = hash_function(hash or config['prov_hash'])
     update_object_hash(m, job_msg['data']['function'])
     update_object_hash(m, job_msg['data']['arguments'])
 
@@ -30,4 +169,19 @@ def prov_key(job_msg, extra=None):
     if extra is not None:
         update_object_hash(m, extra)
 
+    for buf in buffers or ():
+        view = memoryview(buf)
+        m.update(str(view.nbytes).encode())
+        m.update(view)
+
     return m.hexdigest()
+
+
+def job_prov(registry, job, extra=None, hash=None):
+    """Encode `job` with `registry`, taking binary buffers out of the
+    message, so that they are hashed directly. Returns the message and its
+    prov key."""
+    with out_of_band() as buffers, no_segments():
+        job_msg = registry.deep_encode(job)
+
+    return job_msg, prov_key(job_msg, extra, buffers, hash)
@@ -1,6 +1,11 @@
 import sqlite3
+import atexit
+import queue
+import threading
+from contextlib import nullcontext
 from threading import Lock
 from collections import (namedtuple, defaultdict)
+from itertools import count
 # from ..utility import on
 import time
 import sys
@@ -26,6 +31,9 @@ schema = '''
                     on delete cascade,
         "time"      datetime default current_timestamp,
         "what"      text );
+
+    create index if not exists "jobs_link" on "jobs"("link");
+    create index if not exists "timestamps_job" on "timestamps"("job");
 '''
 
 JobEntry = namedtuple(
@@ -41,83 +49,254 @@ def time_stamp():
     return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time()))
 
 
+def connect(path):
+    connection = sqlite3.connect(
+        path, check_same_thread=False, isolation_level=None)
+    connection.execute('pragma journal_mode = wal;')
+    connection.execute('pragma synchronous = normal;')
+    connection.execute('pragma foreign_keys = on;')
+    return connection
+
+
 class JobDB:
     """Keeps a database of jobs, with a MD5 hash that encodes the function
-    name, version, and all arguments to the function.
+    name, version, and all arguments to the function. This has the same
+    interface as the TinyDB version in :py:mod:`noodles.prov.prov`.
+
+    The database is kept in WAL mode, so that reading doesn't wait for
+    writing. All writes are queued, and done by a background thread, which
+    commits everything that piled up in a single transaction. Until a write
+    is committed, the jobs of the current run are kept in memory, and
+    looked up there first. Call :py:meth:`close` (or use the database as a
+    context manager) to wait for the writes to finish; this is also done
+    when the interpreter exits.
+
+    :param path:
+        Path to the database file, or `':memory:'`.
+
+    :param batch_size:
+        Largest number of writes committed in one transaction.
     """
-    def __init__(self, path):
+    def __init__(self, path, batch_size=10000):
         self.duplicates = defaultdict(list)
-        self.connection = sqlite3.connect(path, check_same_thread=False)
-
-        self.cur = self.connection.cursor()
-        self.cur.executescript(schema)
+        self.batch_size = batch_size
         self.lock = Lock()
 
-    def add_job(self, prov, job_msg, running):
+        # an in-memory database only exists for the connection that made it
+        self.connection = connect(path)
+        self.reader = self.connection if path == ':memory:' \
+            else connect(path)
+        self.connection.executescript(schema)
+        self.db_lock = Lock() if self.reader is self.connection else None
+
+        max_id, = self.connection.execute(
+            'select max("id") from "jobs";').fetchone()
+        self.ids = count((max_id or 0) + 1)
+
+        # jobs of this run, by key, and the keys by prov and link
+        self.rows = {}
+        self.keys = {}
+        self.links = defaultdict(set)
+
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+        self.closed = False
+        atexit.register(self.close)
+
+    def _write(self):
+        while True:
+            batch = [self.writes.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.writes.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [w for w in batch if w is not None]
+            with self.db_lock or nullcontext():
+                self.connection.execute('begin;')
+                for sql, args, _ in writes:
+                    try:
+                        self.connection.execute(sql, args)
+                    except sqlite3.Error as exc:
+                        print("WARNING: could not write to job database: "
+                              "{}".format(exc), file=sys.stderr)
+                self.connection.execute('commit;')
+
+            self._forget([key for _, _, key in writes if key is not None])
+            for _ in batch:
+                self.writes.task_done()
+
+            if batch[-1] is None:
+                return
+
+    def _forget(self, keys):
+        """Drop finished jobs from memory once their result is committed;
+        from then on they're found in the database."""
         with self.lock:
-            self.cur.execute('select * from "jobs" where "prov" = ?;', (prov,))
-            row = self.cur.fetchone()
+            for key in keys:
+                row = self.rows.get(key)
+                if row is None or row['result'] is None:
+                    continue
 
-            # if no record is found, register the job and return the db id
-            if row is None:
-                self.cur.execute(
-                    'insert into "jobs" ("prov", "version", "function", '
-                    '"arguments") values (?, ?, ?, ?)',
-                    (prov, job_msg['data']['hints'].get('version'),
-                     json.dumps(job_msg['data']['function']),
-                     json.dumps(job_msg['data']['arguments'])))
+                del self.rows[key]
+                if self.keys.get(row['prov']) == key:
+                    del self.keys[row['prov']]
+
+    def _queue(self, sql, args, done=None):
+        self.writes.put((sql, args, done))
+
+    def _query(self, sql, args):
+        with self.db_lock or nullcontext():
+            return self.reader.execute(sql, args).fetchone()
+
+    def _find(self, prov):
+        """Find the job with `prov`, giving the row and the key of the job
+        if it belongs to this run."""
+        key = self.keys.get(prov)
+        if key is not None:
+            return key, self.rows[key]
+
+        row = self._query(
+            'select "id", "link", "result" from "jobs" where "prov" = ?;',
+            (prov,))
+        if row is None:
+            return None, None
+
+        return None, {'id': row[0], 'prov': prov, 'link': row[1],
+                      'result': row[2]}
 
-                return 'registered', self.cur.lastrowid, None
+    def flush(self):
+        """Wait for all queued writes to be committed."""
+        self.writes.join()
 
-            rec = JobEntry(row)
+    def close(self):
+        if self.closed:
+            return
 
-            if rec.result is not None:
-                return 'retrieved', rec.id, rec.result
+        self.closed = True
+        atexit.unregister(self.close)
+        self.writes.put(None)
+        self.writer.join()
+        if self.reader is not self.connection:
+            self.reader.close()
+        self.connection.close()
 
-            job_running = rec.key in running
-            wf_running = rec.link in running.workflows
+    def __enter__(self):
+        return self
+
+    def __exit__(self, e_type, e_value, e_tb):
+        self.close()
+
+    def get_result_or_attach(self, key, prov, running):
+        with self.lock:
+            rec_key, rec = self._find(prov)
+
+            # removed since `job_exists` saw it; run the job anew
+            if rec is None:
+                return 'broken', None, None
+
+            if rec['result'] is not None:
+                return 'retrieved', rec_key, json.loads(rec['result'])
+
+            # jobs from an earlier run can't be running, and their links
+            # are ids of objects that no longer exist
+            job_running = rec_key is not None and rec_key in running
+            wf_running = rec_key is not None and \
+                rec['link'] in getattr(running, 'workflows', {})
 
             if job_running or wf_running:
-                self.duplicates[rec.id].append(rec.key)
-                return 'attached', rec.id, None
+                self.duplicates[rec_key].append(key)
+                return 'attached', rec_key, None
 
             print("WARNING: unfinished job in database. Removing it and "
                   " rerunning.", file=sys.stderr)
-            self.cur.execute(
-                'delete from "jobs" where "id" = ?;', rec.id)
+            self._remove(rec_key, rec)
+            self._queue('delete from "jobs" where "id" = ?;', (rec['id'],))
             return 'broken', None, None
 
+    def _remove(self, key, row):
+        if key is None:
+            return
+
+        del self.rows[key]
+        del self.keys[row['prov']]
+        self.links[row['link']].discard(key)
+
     def job_exists(self, prov):
         with self.lock:
-            self.cur.execute('select * from "jobs" where "prov" = ?;', (prov,))
-            rec = self.cur.fetchone()
-            return rec is not None
+            return self._find(prov)[1] is not None
+
+    def add_job(self, prov, job_msg, running, key=None):
+        """Register a job, unless it is already in the database; then
+        the job is attached to the running one, or its result retrieved,
+        see :py:meth:`get_result_or_attach`."""
+        if not self.job_exists(prov):
+            self.new_job(key, prov, job_msg)
+            return 'registered', key, None
 
-    def store_result(self, db_id, result):
+        return self.get_result_or_attach(key, prov, running)
+
+    def new_job(self, key, prov, job_msg):
         with self.lock:
-            self.add_time_stamp(db_id, 'done')
-            self.cur.execute(
-                'update "jobs" set "result" = ? where "id" = ?;',
-                (result, db_id))
-            # self.cur.execute('select "duplicate" from "duplicates" where
-            # "primary" = ?;', db_id)
-            # duplicates = self.cur.fetchall()
-            return self.duplicates[db_id]
-
-    def add_link(self, db_id, ppn):
+            db_id = next(self.ids)
+            self.rows[key] = {
+                'id': db_id, 'prov': prov, 'link': None, 'result': None}
+            self.keys[prov] = key
+
+            self._queue(
+                'insert into "jobs" ("id", "prov", "version", "function", '
+                '"arguments") values (?, ?, ?, ?, ?);',
+                (db_id, prov, job_msg['data']['hints'].get('version'),
+                 json.dumps(job_msg['data']['function']),
+                 json.dumps(job_msg['data']['arguments'])))
+            self._add_time_stamp(db_id, 'schedule')
+
+        return key, prov
+
+    def store_result(self, key, result):
+        with self.lock:
+            row = self.rows.get(key)
+            if row is None:
+                return []
+
+            self.links[row['link']].discard(key)
+            row['link'] = None
+            row['result'] = json.dumps(result)
+
+            self._add_time_stamp(row['id'], 'done')
+            self._queue(
+                'update "jobs" set "result" = ?, "link" = null '
+                'where "id" = ?;', (row['result'], row['id']), done=key)
+            return self.duplicates.pop(key, [])
+
+    def add_link(self, key, ppn):
         with self.lock:
-            self.cur.execute(
-                'update "jobs" set "link" = ? where "id" = ?', (ppn, db_id))
+            row = self.rows.get(key)
+            if row is None:
+                return
+
+            self.links[row['link']].discard(key)
+            self.links[ppn].add(key)
+            row['link'] = ppn
+            self._queue(
+                'update "jobs" set "link" = ? where "id" = ?;',
+                (ppn, row['id']))
 
     def get_linked_jobs(self, ppn):
+        # links are Python object ids, so they only mean something to the
+        # current run; there's no need to look in the database.
         with self.lock:
-            self.cur.execute(
-                'select "id" from "jobs" where "link" = ?', (ppn,))
-            return self.cur.fetchall()
+            return list(self.links.get(ppn, ()))
 
-    def add_time_stamp(self, db_id, name):
+    def add_time_stamp(self, key, name):
         with self.lock:
-            self.cur.execute(
-                'insert into "timestamps" ("job", "what")'
-                'values (?, ?)',
-                (db_id, name))
+            row = self.rows.get(key)
+            if row is not None:
+                self._add_time_stamp(row['id'], name)
+
+    def _add_time_stamp(self, db_id, name):
+        self._queue(
+            'insert into "timestamps" ("job", "time", "what") '
+            'values (?, ?, ?);', (db_id, time_stamp(), name))
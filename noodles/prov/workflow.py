@@ -1,6 +1,7 @@
 from ..workflow import (Workflow, is_node_ready, Empty)
 from ..workflow.arguments import (serialize_arguments, ref_argument)
 from ..serial import (Registry)
+from ..serial.shared_memory import (no_segments)
 from .key import (prov_key)
 
 
@@ -41,28 +42,30 @@ def set_global_provenance(wf: Workflow, registry: Registry):
     with the resulting key."""
     stack = [wf.root]
 
-    while stack:
-        i = stack.pop()
-        n = wf.nodes[i]
+    # the messages are only hashed; they don't need shared memory
+    with no_segments():
+        while stack:
+            i = stack.pop()
+            n = wf.nodes[i]
 
-        if n.prov:
-            continue
+            if n.prov:
+                continue
 
-        if is_node_ready(n):
-            job_msg = registry.deep_encode(n)
-            n.prov = prov_key(job_msg)
-            continue
+            if is_node_ready(n):
+                job_msg = registry.deep_encode(n)
+                n.prov = prov_key(job_msg)
+                continue
 
-        deps = wf.inverse_links[i]
-        todo = [j for j in deps if not wf.nodes[j].prov]
+            deps = wf.inverse_links[i]
+            todo = [j for j in deps if not wf.nodes[j].prov]
 
-        if not todo:
-            link_dict = dict(links(wf, i, deps))
-            link_prov = registry.deep_encode(
-                [link_dict[arg] for arg in empty_args(n)])
-            job_msg = registry.deep_encode(n)
-            n.prov = prov_key(job_msg, link_prov)
-            continue
+            if not todo:
+                link_dict = dict(links(wf, i, deps))
+                link_prov = registry.deep_encode(
+                    [link_dict[arg] for arg in empty_args(n)])
+                job_msg = registry.deep_encode(n)
+                n.prov = prov_key(job_msg, link_prov)
+                continue
 
-        stack.append(i)
-        stack.extend(deps)
+            stack.append(i)
+            stack.extend(deps)
@@ -0,0 +1,280 @@
+"""
+Asynchronous runner
+===================
+
+The other runners connect the scheduler to its workers with threads and
+queues. This runner drives the same :py:class:`Scheduler` from an `asyncio`
+event loop in stead:
+
+* Jobs calling a coroutine function (an `async def` decorated with
+  `@schedule`) are run as tasks on the event loop. Thousands of I/O bound
+  jobs can be waiting at the same time, without a thread for each.
+* Other jobs go to worker processes, if there are any. These are started
+  with `python -m noodles.worker online`, and we talk to them over
+  `asyncio` subprocess pipes, using the JSON lines protocol. Each job goes
+  to the worker with the fewest jobs in flight.
+* Without worker processes, other jobs are run on a thread pool.
+
+Use :py:func:`run_async` from normal code, or await
+:py:func:`run_workflow` from inside a running event loop.
+"""
+
+import asyncio
+import inspect
+import sys
+from asyncio.subprocess import PIPE
+from concurrent.futures import ThreadPoolExecutor
+
+from ..workflow import get_workflow
+from ..utility import object_name
+from ..interface import JobException
+from ..serial.shared_memory import (segment_owner)
+from .messages import ResultMessage
+from .scheduler import Scheduler
+from .worker import (run_job, result_message)
+
+
+async def run_job_async(key, job):
+    """Await a job calling a coroutine function, returning a
+    :py:class:`ResultMessage`; the counterpart of :py:func:`run_job`."""
+    try:
+        return result_message(key, job, await job.apply())
+
+    except Exception:
+        exc_info = sys.exc_info()
+        return ResultMessage(key, 'error', None, JobException(*exc_info))
+
+
+class AsyncProcessWorker:
+    """A worker process, started with `python -m noodles.worker online`,
+    connected through `asyncio` subprocess pipes.
+
+    :param registry:
+        The serial registry.
+
+    :param n_threads:
+        The number of jobs the worker runs at the same time.
+
+    The worker is started by :py:meth:`start`, after which :py:meth:`send`
+    writes jobs to it, and results are put on a queue as they come in.
+    """
+    def __init__(self, registry, n_threads=1, verbose=False,
+                 init=None, finish=None):
+        self.registry = registry
+        self.jobs = set()
+        self.cmd = [sys.executable, "-m", "noodles.worker", "online",
+                    "-registry", object_name(registry)]
+        if n_threads > 1:
+            self.cmd.extend(["-n", str(n_threads)])
+        if verbose:
+            self.cmd.append("-verbose")
+        if init:
+            self.cmd.extend(["-init", object_name(init)])
+        if finish:
+            self.cmd.extend(["-finish", object_name(finish)])
+
+    @property
+    def load(self):
+        """The number of jobs in flight."""
+        return len(self.jobs)
+
+    async def start(self, results):
+        """Start the worker process; results are put on the `asyncio.Queue`
+        `results`."""
+        self.reg = self.registry()
+        # results are sent one per line, and may be large
+        self.process = await asyncio.create_subprocess_exec(
+            *self.cmd, stdin=PIPE, stdout=PIPE, limit=2**32)
+        self.reader = asyncio.ensure_future(self.read(results))
+
+    def send(self, msg):
+        self.jobs.add(msg.key)
+        # shared memory segments created for this job are released by
+        # the JobKeeper once the job is done.
+        with segment_owner(msg.key):
+            line = self.reg.to_json(msg)
+
+        self.process.stdin.write(line.encode() + b'\n')
+
+    async def drain(self):
+        """Wait until the pipe to the worker can take more jobs."""
+        try:
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # the worker died; `read` reports its jobs as aborted
+            pass
+
+    async def read(self, results):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+
+            msg = self.reg.from_json(line.decode())
+            if msg.status in ('done', 'error'):
+                self.jobs.discard(msg.key)
+            results.put_nowait(msg)
+
+        for key in list(self.jobs):
+            results.put_nowait(ResultMessage(
+                key, 'aborted', None, 'worker process exited.'))
+
+    async def close(self):
+        """Close the input of the worker, and wait for it to exit."""
+        self.process.stdin.close()
+        await self.process.wait()
+        await self.reader
+
+
+class AsyncDispatcher:
+    """Sink for the scheduler: sends each job to be run as a task, by a
+    worker process or on the thread pool; see the module documentation."""
+    def __init__(self, results, workers, executor):
+        self.results = results
+        self.workers = workers
+        self.executor = executor
+        self.loop = asyncio.get_running_loop()
+        self.tasks = set()
+
+    def send(self, msg):
+        key, job = msg
+
+        if inspect.iscoroutinefunction(job.foo):
+            task = self.loop.create_task(self.run_task(key, job))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        elif self.workers:
+            min(self.workers, key=lambda w: w.load).send(msg)
+
+        else:
+            future = self.loop.run_in_executor(
+                self.executor, run_job, key, job)
+            future.add_done_callback(
+                lambda f: self.results.put_nowait(self.job_result(key, f)))
+
+    @staticmethod
+    def job_result(key, future):
+        """The result of a job run on the thread pool. `run_job` only
+        catches an `Exception`; anything else would get lost in the
+        callback, and leave the scheduler waiting."""
+        try:
+            return future.result()
+
+        except BaseException as exc:
+            return ResultMessage(key, 'error', None, JobException(
+                type(exc), exc, exc.__traceback__))
+
+    async def drain(self):
+        """Wait until all worker processes can take more jobs, so that the
+        scheduler doesn't fill up the pipes faster than the workers read
+        them."""
+        for worker in self.workers:
+            await worker.drain()
+
+    async def run_task(self, key, job):
+        self.results.put_nowait(await run_job_async(key, job))
+
+    def cancel(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+
+async def run_workflow(wf, workers=(), n_threads=None, scheduler=None):
+    """Run a workflow from inside a running event loop.
+
+    :param wf:
+        The workflow.
+    :type wf: `Workflow` or `PromisedObject`
+
+    :param workers:
+        A list of :py:class:`AsyncProcessWorker` objects.
+
+    :param n_threads:
+        The number of threads for jobs that are not coroutines, if there
+        are no worker processes. Defaults to the `ThreadPoolExecutor`
+        default.
+
+    :param scheduler:
+        The :py:class:`Scheduler`, if you need to set any options.
+
+    :returns: the result of evaluating the workflow
+    :rtype: any
+    """
+    master = get_workflow(wf)
+    scheduler = scheduler or Scheduler()
+    results = asyncio.Queue()
+    executor = ThreadPoolExecutor(n_threads)
+
+    for worker in workers:
+        await worker.start(results)
+
+    dispatcher = AsyncDispatcher(results, list(workers), executor)
+
+    try:
+        scheduler.start(master, dispatcher)
+        while True:
+            await dispatcher.drain()
+            done, result = scheduler.process(
+                await results.get(), master, dispatcher)
+            if done:
+                return result
+
+    finally:
+        dispatcher.cancel()
+        for worker in workers:
+            await worker.close()
+        executor.shutdown(wait=False)
+
+
+def run_async(wf, n_processes=0, registry=None, n_threads=None,
+              verbose=False, init=None, finish=None, deref=False):
+    """Run a workflow on an `asyncio` event loop. Jobs calling coroutine
+    functions run concurrently on the loop itself; other jobs run in
+    `n_processes` worker processes, or on a thread pool if `n_processes`
+    is zero.
+
+    :param wf:
+        The workflow.
+    :type wf: `Workflow` or `PromisedObject`
+
+    :param n_processes:
+        Number of worker processes to start.
+
+    :param registry:
+        The serial registry; needed if `n_processes` is not zero.
+
+    :param n_threads:
+        Number of threads: in each worker process, or in the thread pool
+        if there are no worker processes.
+
+    :param verbose:
+        Request verbose output on worker side
+
+    :param init:
+        An init function that needs to be run in each process before other jobs
+        can be run. This should be a scheduled function returning True on
+        success.
+
+    :param finish:
+        A function that wraps up when the worker closes down.
+
+    :param deref:
+        Set this to True to pass the result through one more encoding and
+        decoding step with object derefencing turned on.
+    :type deref: bool
+
+    :returns: the result of evaluating the workflow
+    :rtype: any
+    """
+    workers = [
+        AsyncProcessWorker(registry, n_threads or 1, verbose, init, finish)
+        for _ in range(n_processes)]
+
+    result = asyncio.run(run_workflow(
+        wf, workers, n_threads=None if workers else n_threads))
+
+    if deref:
+        return registry().dereference(result, host='localhost')
+    else:
+        return result
@@ -0,0 +1,230 @@
+"""
+Batch runner
+============
+
+Runs jobs through `python -m noodles.worker batch`, the way a job array on a
+cluster queue would: the jobs that become ready together are written to a
+spool file, a worker process reads that file, runs the jobs and writes the
+results to an output file, which is read back once the process is done. No
+pipe is kept open between the scheduler and the workers.
+
+Here the worker processes are started locally, with `subprocess`; this is
+useful to test a workflow (and its serialisation) before submitting it to a
+queue.
+"""
+
+import os
+import sys
+import queue
+import tempfile
+import threading
+from subprocess import Popen
+
+from ..workflow import get_workflow
+from ..utility import object_name
+from ..serial.shared_memory import (segment_owner)
+from .connection import Connection
+from .queue import Queue
+from .messages import (ResultMessage)
+from .scheduler import Scheduler
+
+from .remote.io import (
+    MsgPackObjectReader, MsgPackObjectWriter,
+    JSONObjectReader, JSONObjectWriter,
+    FramedObjectReader, FramedObjectWriter)
+
+
+def write_batch(registry, path, messages, use_msgpack=False, framed=False):
+    """Write job messages to the spool file `path`, in the format read by
+    `python -m noodles.worker batch`."""
+    with open(path, 'wb' if framed or use_msgpack else 'w') as fo:
+        if framed:
+            writer = FramedObjectWriter(registry, fo)
+        elif use_msgpack:
+            writer = MsgPackObjectWriter(registry, fo)
+        else:
+            writer = JSONObjectWriter(registry, fo)
+
+        for msg in messages:
+            # shared memory segments created for this job are released by
+            # the JobKeeper once the job is done.
+            with segment_owner(getattr(msg, 'key', None)):
+                writer.send(msg)
+
+
+def read_batch(registry, path, use_msgpack=False, framed=False):
+    """Read the messages from the output file `path` of a batch worker."""
+    with open(path, 'rb' if framed or use_msgpack else 'r') as fi:
+        if framed:
+            return list(FramedObjectReader(registry, fi))
+        elif use_msgpack:
+            return list(MsgPackObjectReader(registry, fi))
+        else:
+            return list(JSONObjectReader(registry, fi))
+
+
+def batch_worker(registry, spool_dir, n_processes=1, batch_size=None,
+                 linger=0.05, n_threads=1, verbose=False,
+                 init=None, finish=None, use_msgpack=False, framed=False):
+    """Start a worker that runs jobs in batches; see :py:func:`run_batch`
+    for the arguments.
+
+    Jobs that arrive within `linger` seconds of each other are collected;
+    this group is split over `n_processes` batches (of at most `batch_size`
+    jobs each), and every batch is run by a new worker process as soon as
+    fewer than `n_processes` are running. If a worker process doesn't give
+    a result for a job, that job is reported as 'aborted'."""
+    jobs = Queue()
+    results = Queue()
+    slots = threading.Semaphore(n_processes)
+    count = 0
+
+    cmd = [sys.executable, "-m", "noodles.worker", "batch",
+           "-registry", object_name(registry)]
+    if n_threads > 1:
+        cmd.extend(["-n", str(n_threads)])
+    if framed:
+        cmd.append("-framed")
+    elif use_msgpack:
+        cmd.append("-msgpack")
+    if verbose:
+        cmd.append("-verbose")
+    if init:
+        cmd.extend(["-init", object_name(init)])
+    if finish:
+        cmd.extend(["-finish", object_name(finish)])
+
+    def collect():
+        """Get the next group of jobs that arrive together."""
+        group = [jobs.Q.get()]
+        while True:
+            try:
+                group.append(jobs.Q.get(timeout=linger))
+            except queue.Empty:
+                return group
+
+    def split(group):
+        size = -(-len(group) // n_processes)
+        if batch_size:
+            size = min(size, batch_size)
+
+        return [group[i:i + size] for i in range(0, len(group), size)]
+
+    def run(messages, path):
+        sink = results.sink()
+        reg = registry()
+
+        p = Popen(cmd + ["-input", path + ".in", "-output", path + ".out"])
+        p.wait()
+        slots.release()
+
+        output = []
+        if os.path.exists(path + ".out"):
+            output = read_batch(reg, path + ".out", use_msgpack, framed)
+            os.remove(path + ".in")
+            os.remove(path + ".out")
+
+        done = set()
+        for msg in output:
+            done.add(msg.key)
+            sink.send(msg)
+
+        for msg in messages:
+            if msg.key not in done:
+                sink.send(ResultMessage(
+                    msg.key, 'aborted', None,
+                    "batch worker {} exited with code {}"
+                    .format(path, p.returncode)))
+
+    def dispatch():
+        nonlocal count
+        reg = registry()
+
+        while True:
+            for messages in split(collect()):
+                path = os.path.join(spool_dir, "batch-{:06}".format(count))
+                count += 1
+
+                write_batch(reg, path + ".in", messages, use_msgpack, framed)
+                slots.acquire()
+                t = threading.Thread(target=run, args=(messages, path))
+                t.daemon = True
+                t.start()
+
+    t = threading.Thread(target=dispatch)
+    t.daemon = True
+    t.start()
+
+    return Connection(results.source, jobs.sink)
+
+
+def run_batch(wf, registry, n_processes=1, batch_size=None, spool_dir=None,
+              n_threads=1, verbose=False, init=None, finish=None,
+              deref=False, use_msgpack=False, framed=False):
+    """Run the workflow by writing ready jobs to spool files, and running
+    each file with `python -m noodles.worker batch` in a new process.
+
+    :param wf:
+        The workflow.
+    :type wf: `Workflow` or `PromisedObject`
+
+    :param registry:
+        The serial registry.
+
+    :param n_processes:
+        Number of worker processes running at the same time.
+
+    :param batch_size:
+        The maximum number of jobs in a single batch.
+
+    :param spool_dir:
+        Directory for the batch files. Files are removed once their results
+        are read; those of failed batches stay behind. By default a
+        temporary directory is used, which is removed afterwards.
+
+    :param n_threads:
+        Number of jobs each process runs at the same time.
+
+    :param verbose:
+        Request verbose output on worker side
+
+    :param init:
+        An init function that needs to be run in each process before other jobs
+        can be run. This should be a scheduled function returning True on
+        success.
+
+    :param finish:
+        A function that wraps up when the worker closes down.
+
+    :param deref:
+        Set this to True to pass the result through one more encoding and
+        decoding step with object derefencing turned on.
+    :type deref: bool
+
+    :param use_msgpack:
+        Write the batch files using MessagePack.
+
+    :param framed:
+        Write the batch files using the binary framing protocol,
+        see :py:mod:`noodles.run.remote.io`.
+
+    :returns: the result of evaluating the workflow
+    :rtype: any
+    """
+    tmp = tempfile.TemporaryDirectory() if spool_dir is None else None
+
+    try:
+        worker = batch_worker(
+            registry, spool_dir or tmp.name,
+            n_processes=n_processes, batch_size=batch_size,
+            n_threads=n_threads, verbose=verbose, init=init, finish=finish,
+            use_msgpack=use_msgpack, framed=framed)
+        result = Scheduler().run(worker, get_workflow(wf))
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    if deref:
+        return registry().dereference(result, host='localhost')
+    else:
+        return result
@@ -7,7 +7,7 @@ class Connection(object):
     some object, probably a worker. In this case the `source` is a
     coroutine generating results, while the sink needs to be fed jobs.
     """
-    def __init__(self, source, sink, aux=None):
+    def __init__(self, source, sink, aux=None, capacity=None):
         """Connection constructor
 
         :param source:
@@ -17,10 +17,19 @@ class Connection(object):
         :param sink:
             The signal sink coroutine
         :type sink: sink coroutine
+
+        :param aux:
+            An auxiliary function, to be run in a separate thread.
+
+        :param capacity:
+            The number of jobs the worker behind this connection should
+            hold at any time, or `None` if it doesn't say.
+        :type capacity: int
         """
         self.source = source
         self.sink = sink
         self.aux = aux
+        self.capacity = capacity
         self.online = True
 
     def setup(self):
@@ -1,9 +1,10 @@
 import threading
+from collections import deque
 
 from ..workflow import get_workflow
 from .queue import Queue
 from .connection import Connection
-from .protect import CatchExceptions
+from .protect import (CatchExceptions, source_branch)
 from .haploid import (push, patch)
 from ..utility import unzip_dict
 from .scheduler import Scheduler
@@ -114,6 +115,113 @@ def hybrid_threaded_worker(selector, workers):
     return Connection(results.source, dispatch_job)
 
 
+def balanced_threaded_worker(workers, capacity=None):
+    """Runs a set of workers, sending each job to the least loaded worker.
+
+    :param workers:
+        A dictionary of workers.
+
+    :param capacity:
+        The number of jobs each worker may hold at the same time, either as
+        a single number, or as a dictionary with the same keys as `workers`.
+        If not given, we use the `capacity` that the worker connections
+        declare, defaulting to 1.
+
+    :returns:
+        A connection for the scheduler.
+    :rtype: Connection
+
+    Every worker gets credit for `capacity` jobs. A job is sent to the worker
+    with the lowest load relative to its capacity; if no worker has credit
+    left, the job waits in a queue. When a result comes back, it is matched
+    by its key to the worker that ran it, the credit is returned, and the
+    next waiting job is sent out. A capacity larger than the number of jobs
+    a worker can run at once keeps the next job waiting in the pipe, so
+    that short jobs don't leave the worker idle for a round trip.
+
+    Sending a job is done in a separate thread for each worker, so that a
+    large message going into one worker doesn't hold up the others.
+    """
+    if capacity is None:
+        capacity = {k: w.capacity or 1 for k, w in workers.items()}
+    elif not isinstance(capacity, dict):
+        capacity = {k: capacity for k in workers}
+
+    results = Queue()
+    outbox = {k: Queue() for k in workers}
+    outbox_sink = {k: q.sink() for k, q in outbox.items()}
+
+    lock = threading.Lock()
+    load = {k: 0 for k in workers}
+    owner = {}
+    waiting = deque()
+
+    def dispatch():
+        """Send waiting jobs to workers with credit left; call with
+        `lock` held."""
+        while waiting:
+            free = [k for k in workers if load[k] < capacity[k]]
+            if not free:
+                return
+
+            worker = min(free, key=lambda k: load[k] / capacity[k])
+            msg = waiting.popleft()
+            load[worker] += 1
+            owner[msg.key] = worker
+            outbox_sink[worker].send(msg)
+
+    def return_credit(key, status, result, err):
+        if status not in ('done', 'error'):
+            return
+
+        with lock:
+            worker = owner.pop(key, None)
+            if worker is not None:
+                load[worker] -= 1
+                dispatch()
+
+    catch = {
+        k: CatchExceptions(results.sink)
+        for k, w in workers.items()
+    }
+
+    result_source = {
+        k: w.source >> catch[k].result_source >> source_branch(return_credit)
+        for k, w in workers.items()
+    }
+
+    job_sink = {
+        k: catch[k].job_sink >> w.sink
+        for k, w in workers.items()
+    }
+
+    @push
+    def dispatch_job():
+        while True:
+            msg = yield
+            with lock:
+                waiting.append(msg)
+                dispatch()
+
+    for key, worker in workers.items():
+        for source, sink in [(result_source[key], results.sink),
+                             (outbox[key].source, job_sink[key])]:
+            t = threading.Thread(
+                target=catch[key](patch),
+                args=(source, sink))
+            t.daemon = True
+            t.start()
+
+        if worker.aux:
+            t_aux = threading.Thread(
+                target=catch[key](worker.aux),
+                args=(),
+                daemon=True)
+            t_aux.start()
+
+    return Connection(results.source, dispatch_job)
+
+
 def run_hybrid(wf, selector, workers):
     """
     Returns the result of evaluating the workflow; runs through several
@@ -1,31 +1,84 @@
-import uuid
 import time
 import json
 import sys
+import random
 
+from itertools import count
+from collections import deque
 from threading import Lock
 from .haploid import (coroutine)
 from .messages import (JobMessage)
+from ..serial.shared_memory import (release_segments)
+
+
+def job_keys():
+    """Returns an iterator of compact job keys. Each key is a 64-bit integer,
+    made of a random 23-bit prefix for this run and a 40-bit counter. The
+    keys are positive, so that they fit in a signed integer column of a
+    database, and the prefix keeps them apart from the keys of other runs
+    that are stored in the same job database.
+
+    The iterator is an :py:func:`itertools.count`, so it is safe to take
+    keys from it in several threads at once."""
+    return count(random.getrandbits(23) << 40)
 
 
 class JobKeeper(dict):
-    def __init__(self, keep=False):
+    """Keeps track of the jobs that were sent out by the scheduler.
+
+    :param keep:
+        Keep jobs around after they are done.
+
+    :param keys:
+        An iterator giving a new key for every job. By default these are
+        given by :py:func:`job_keys`; pass `itertools.count()` to number
+        jobs from zero.
+
+    :param log_size:
+        Keep only the last `log_size` entries of the log of each job.
+
+    :param log_file:
+        A text file to write the log to, as JSON lines with the key, time
+        and status of each entry, in stead of keeping it in memory.
+
+    Every job has a `log` with a `(time, status, value, err)` tuple for each
+    message received about it. For a long run with `keep=True`, these logs
+    can take a lot of memory; `log_size` and `log_file` bound it.
+    """
+    def __init__(self, keep=False, keys=None, log_size=None, log_file=None):
         super(JobKeeper, self).__init__()
         self.keep = keep
+        self.keys = job_keys() if keys is None else keys
+        self.log_size = log_size
+        self.log_file = log_file
         self.lock = Lock()
         self.workflows = {}
 
+    def add_log(self, key, job, status, value=None, err=None):
+        """Add an entry to the log of a job; call with `lock` held."""
+        now = time.time()
+        if self.log_file is not None:
+            print(json.dumps({'key': key, 'time': now, 'status': status}),
+                  file=self.log_file)
+        else:
+            job.log.append((now, status, value, err))
+
     def register(self, job):
         with self.lock:
-            key = str(uuid.uuid4())
+            key = next(self.keys)
             job.db_id = None
-            job.log = []
-            job.log.append((time.time(), 'register', None, None))
+            job.log = [] if self.log_size is None \
+                else deque(maxlen=self.log_size)
+            self.add_log(key, job, 'register')
             self[key] = job
 
         return JobMessage(key, job.node)
 
     def __delitem__(self, key):
+        # shared memory segments that were sent with this job are no longer
+        # needed, see `noodles.serial.shared_memory`.
+        release_segments(key)
+
         if not self.keep:
             super(JobKeeper, self).__delitem__(key)
 
@@ -51,14 +104,14 @@ class JobKeeper(dict):
                 if key not in self:
                     continue
 
-                job = self[key]
-                job.log.append((time.time(), status, value, err))
+                self.add_log(key, self[key], status, value, err)
 
 
 class JobTimer(dict):
-    def __init__(self, timing_file, registry=None):
+    def __init__(self, timing_file, registry=None, keys=None):
         super(JobTimer, self).__init__()
         self.workflows = {}
+        self.keys = job_keys() if keys is None else keys
 
         if isinstance(timing_file, str):
             self.fo = open(timing_file, 'w')
@@ -68,7 +121,7 @@ class JobTimer(dict):
             self.owner = False
 
     def register(self, job):
-        key = str(uuid.uuid4())
+        key = next(self.keys)
         job.sched_time = time.time()
         self[key] = job
         return JobMessage(key, job.node)
@@ -0,0 +1,134 @@
+"""
+Priority scheduling
+===================
+
+The :py:class:`Scheduler` sends out jobs in the order in which they become
+ready, and the workers take them first come, first served. On a deep
+workflow with some long running stages, this can leave most workers idle
+near the end of a run, waiting for a chain of jobs that could have been
+started earlier.
+
+The :py:class:`PriorityScheduler` gives every node a rank: its own cost,
+plus the largest rank among the nodes that need its result (see
+:py:func:`upward_rank`). This is the length of the longest path from the
+node to the end of the workflow. Ready jobs are kept in a priority queue,
+and only `n_slots` jobs are sent out at a time; whenever a result comes
+back, the job with the highest rank goes next. Set `n_slots` to the number
+of jobs the workers can run at the same time.
+
+The cost of a node is its `cost` hint (see :py:func:`schedule_hint`), if
+there is one. Otherwise it is the average run time of earlier calls to the
+same function, as measured by the scheduler; these times are kept in
+`history`, which can be passed on to the next run. Functions without hint
+or history get `default_cost`.
+"""
+
+import heapq
+import time
+from itertools import count
+
+from ..utility import object_name
+from ..workflow import (upward_rank, is_workflow)
+from .scheduler import (Scheduler, BatchJob)
+
+
+class PriorityScheduler(Scheduler):
+    """Scheduler sending out the ready job with the highest upward rank
+    first; see the module documentation.
+
+    :param n_slots:
+        The number of jobs to have running at the same time.
+
+    :param history:
+        A `dict` giving the average run time of calls to a function, by
+        the name of the function. This is updated during the run.
+
+    :param default_cost:
+        Cost of a node without `cost` hint or history.
+
+    Other arguments are passed to :py:class:`Scheduler`.
+    """
+    def __init__(self, n_slots, history=None, default_cost=1.0, **kwargs):
+        super(PriorityScheduler, self).__init__(**kwargs)
+        self.n_slots = n_slots
+        self.history = {} if history is None else history
+        self.default_cost = default_cost
+        self.names = {}
+        self.ranks = {}
+        self.ready = []
+        self.order = count()
+        self.started = {}
+        self.calls = {}
+
+    def name(self, node):
+        try:
+            return self.names[node.foo]
+        except KeyError:
+            name = self.names[node.foo] = object_name(node.foo)
+            return name
+
+    def cost(self, node):
+        if node.hints and 'cost' in node.hints:
+            return node.hints['cost']
+
+        return self.history.get(self.name(node), self.default_cost)
+
+    def rank(self, job):
+        if isinstance(job, BatchJob):
+            return max(self.rank(j) for j in job.jobs)
+
+        return self.ranks[id(job.workflow)][job.node_id]
+
+    def add_workflow(self, wf, target, node, sink):
+        if wf is target:
+            offset = 0
+        else:
+            offset = self.ranks[id(target)][node] \
+                - self.cost(target.nodes[node])
+
+        nodes = wf.nodes
+        self.ranks[id(wf)] = upward_rank(
+            wf.links, lambda n: self.cost(nodes[n]), offset)
+        super(PriorityScheduler, self).add_workflow(wf, target, node, sink)
+
+    def dispatch(self, job, sink):
+        """Put the job in the priority queue; it is sent out by
+        :py:meth:`flush` once there is a free slot."""
+        heapq.heappush(self.ready, (-self.rank(job), next(self.order), job))
+
+    def flush(self, sink):
+        super(PriorityScheduler, self).flush(sink)
+
+        # once there has been an error, we only wait for running jobs
+        while self.ready and len(self.started) < self.n_slots \
+                and not self.graceful_exit:
+            _, _, job = heapq.heappop(self.ready)
+            msg = self.jobs.register(job)
+            self.in_flight += 1
+            self.started[msg.key] = time.perf_counter()
+            sink.send(msg)
+
+    def unpack(self, key, status, result, err_msg):
+        elapsed = time.perf_counter() - self.started.pop(key)
+        jobs = super(PriorityScheduler, self).unpack(
+            key, status, result, err_msg)
+
+        if status == 'done' and len(jobs) == 1:
+            self.add_history(jobs[0][0].node, elapsed)
+
+        # a workflow is done once its root has a result; if that result is
+        # another workflow, it takes the place of the node in the parent
+        # workflow, unless this is the master workflow.
+        for (wf, n), _, value, _ in jobs:
+            if n == wf.root and not (
+                    is_workflow(value) and
+                    self.dynamic_links[id(wf)].target is wf):
+                self.ranks.pop(id(wf), None)
+
+        return jobs
+
+    def add_history(self, node, elapsed):
+        name = self.name(node)
+        n = self.calls[name] = self.calls.get(name, 0) + 1
+        average = self.history.get(name, elapsed)
+        self.history[name] = average + (elapsed - average) / n
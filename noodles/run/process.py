@@ -4,19 +4,20 @@ from subprocess import Popen, PIPE
 import threading
 
 import os
-import random
 from ..workflow import get_workflow
 # from ..logger import log
 from .connection import Connection
 from ..utility import object_name
 from .scheduler import Scheduler
 # from .protect import CatchExceptions
-from .hybrid import hybrid_threaded_worker
+from .hybrid import balanced_threaded_worker
 from .haploid import (pull, push)
+from ..serial.shared_memory import (segment_owner)
 
 from .remote.io import (
     MsgPackObjectReader, MsgPackObjectWriter,
-    JSONObjectReader, JSONObjectWriter)
+    JSONObjectReader, JSONObjectWriter,
+    FramedObjectReader, FramedObjectWriter)
 
 try:
     import msgpack  # noqa
@@ -26,12 +27,33 @@ except ImportError:
 
 
 def process_worker(registry, verbose=False, jobdirs=False,
-                   init=None, finish=None, status=True, use_msgpack=False):
+                   init=None, finish=None, status=True, use_msgpack=False,
+                   framed=False, n_threads=1, capacity=None):
+    """Start a worker in a new Python process; see :py:func:`run_process`
+    for the arguments. With `framed=True` the binary framing protocol is used
+    to communicate with the worker, so that NumPy arrays and other large
+    buffers are sent without base64 encoding. This needs a registry that
+    supports out-of-band buffers, like
+    :py:func:`noodles.serial.numpy.arrays_to_buffers`. Since the worker runs
+    on the same host, arrays may also be passed through shared memory, with
+    :py:func:`noodles.serial.numpy.arrays_to_shared_memory`.
+
+    With `n_threads` larger than one, the worker process runs that many jobs
+    at the same time on a pool of threads.
+
+    The returned connection declares a `capacity`: the number of jobs the
+    scheduler may have in flight on this worker. By default this is twice
+    `n_threads`, so that the next job is already waiting in the pipe when a
+    thread finishes."""
     name = "process-" + str(uuid.uuid4())
 
     cmd = ["/bin/bash", os.getcwd() + "/worker.sh", sys.prefix, "online",
            "-name", name, "-registry", object_name(registry)]
-    if use_msgpack:
+    if n_threads > 1:
+        cmd.extend(["-n", str(n_threads)])
+    if framed:
+        cmd.append("-framed")
+    elif use_msgpack:
         assert has_msgpack
         cmd.append("-msgpack")
     if verbose:
@@ -60,26 +82,39 @@ def process_worker(registry, verbose=False, jobdirs=False,
     @push
     def send_job():
         reg = registry()
-        if use_msgpack:
-            yield from MsgPackObjectWriter(reg, p.stdin.buffer)
+        if framed:
+            writer = FramedObjectWriter(reg, p.stdin.buffer)
+        elif use_msgpack:
+            writer = MsgPackObjectWriter(reg, p.stdin.buffer)
         else:
-            yield from JSONObjectWriter(reg, p.stdin)
+            writer = JSONObjectWriter(reg, p.stdin)
+
+        while True:
+            msg = yield
+            # shared memory segments created for this job are released by
+            # the JobKeeper once the job is done.
+            with segment_owner(getattr(msg, 'key', None)):
+                writer.send(msg)
 
     @pull
     def get_result():
         reg = registry()
-        if use_msgpack:
+        if framed:
+            yield from FramedObjectReader(reg, p.stdout.buffer)
+        elif use_msgpack:
             newin = os.fdopen(p.stdout.fileno(), 'rb', buffering=0)
             yield from MsgPackObjectReader(reg, newin)
         else:
             yield from JSONObjectReader(reg, p.stdout)
 
-    return Connection(get_result, send_job, aux=read_stderr)
+    return Connection(get_result, send_job, aux=read_stderr,
+                      capacity=capacity or 2 * n_threads)
 
 
 def run_process(wf, n_processes, registry,
                 verbose=False, jobdirs=False,
-                init=None, finish=None, deref=False, use_msgpack=False):
+                init=None, finish=None, deref=False, use_msgpack=False,
+                framed=False, n_threads=1, capacity=None):
     """Run the workflow using a number of new python processes. Use this
     runner to test the workflow in a situation where data serial
     is needed.
@@ -113,21 +148,32 @@ def run_process(wf, n_processes, registry,
         decoding step with object derefencing turned on.
     :type deref: bool
 
+    :param use_msgpack:
+        Communicate with the workers using MessagePack.
+
+    :param framed:
+        Communicate with the workers using the binary framing protocol,
+        see :py:mod:`noodles.run.remote.io`.
+
+    :param n_threads:
+        Number of jobs each process runs at the same time.
+
+    :param capacity:
+        Number of jobs sent ahead to each process. Jobs go to the process
+        with the fewest jobs in flight; see
+        :py:func:`noodles.run.hybrid.balanced_threaded_worker`.
+
     :returns: the result of evaluating the workflow
     :rtype: any
     """
     workers = {}
     for i in range(n_processes):
         new_worker = process_worker(registry, verbose, jobdirs, init, finish,
-                                    use_msgpack=use_msgpack)
+                                    use_msgpack=use_msgpack, framed=framed,
+                                    n_threads=n_threads, capacity=capacity)
         workers['worker {0:2}'.format(i)] = new_worker
 
-    worker_names = list(workers.keys())
-
-    def random_selector(job):
-        return random.choice(worker_names)
-
-    master_worker = hybrid_threaded_worker(random_selector, workers)
+    master_worker = balanced_threaded_worker(workers)
     result = Scheduler().run(master_worker, get_workflow(wf))
 
     if deref:
@@ -0,0 +1,149 @@
+"""
+Process pool runner
+===================
+
+Runs jobs on a :py:class:`concurrent.futures.ProcessPoolExecutor`. In
+contrast to :py:func:`run_process`, this doesn't need `worker.sh`, or a
+serialisation registry: jobs and results are pickled (protocol 5) and go
+through the pipes of the pool as raw bytes.
+
+Scheduled functions are found under their name as the decorated function,
+which pickle refuses to stand in for the original. Nodes are therefore
+pickled the way :py:class:`noodles.serial.base.SerNode` stores them: the
+decorated function is looked up by name and unwrapped on the other side.
+"""
+
+import copyreg
+import io
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from ..workflow import (get_workflow, FunctionNode, NodeData)
+from ..workflow.arguments import (serialize_arguments, ref_argument)
+from ..interface import PromisedObject
+from ..utility import (object_name, look_up, unwrap)
+from .connection import Connection
+from .queue import Queue
+from .haploid import push
+from .messages import ResultMessage
+from .scheduler import Scheduler
+from .worker import run_job
+
+_functions = {}
+
+
+def _importable_function(foo):
+    """Returns the object found under the name of `foo`, if that is the
+    scheduled (decorated) version of `foo`; otherwise `foo` itself."""
+    try:
+        return _functions[foo]
+    except KeyError:
+        pass
+    except TypeError:
+        return foo
+
+    try:
+        obj = look_up(object_name(foo))
+    except (AttributeError, ImportError, ValueError):
+        obj = foo
+
+    _functions[foo] = obj if obj is not foo and unwrap(obj) is foo else foo
+    return _functions[foo]
+
+
+def reduce_node(node):
+    # unlike `FunctionNode.data`, we keep `Empty` arguments, so that nodes
+    # in a workflow returned by a job are still waiting for their input.
+    arguments = [(address, ref_argument(node.bound_args, address))
+                 for address in serialize_arguments(node.bound_args,
+                                                    node.spec)]
+    return FunctionNode.from_node_data, (NodeData(
+        _importable_function(node.foo), arguments, node.hints),)
+
+
+def reduce_promise(obj):
+    return PromisedObject, (get_workflow(obj),)
+
+
+class JobPickler(pickle.Pickler):
+    """Pickles :py:class:`FunctionNode` objects by their node data, and
+    :py:class:`PromisedObject` by its workflow; the latter would otherwise
+    turn every attribute pickle asks for into a new workflow."""
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[FunctionNode] = reduce_node
+    dispatch_table[PromisedObject] = reduce_promise
+
+
+def dumps(obj):
+    f = io.BytesIO()
+    JobPickler(f, protocol=5).dump(obj)
+    return f.getvalue()
+
+
+def run_pickled_job(data):
+    """Run a pickled job in a worker process, returning the pickled
+    result."""
+    key, job = pickle.loads(data)
+    return dumps(run_job(key, job))
+
+
+def executor_worker(executor):
+    """Connection that submits jobs to `executor`, normally a
+    `ProcessPoolExecutor`. The executor is not shut down afterwards.
+
+    If a job can't be run, because the worker process died or the result
+    could not be pickled, the job is reported as 'aborted'."""
+    results = Queue()
+
+    def collect(key, future):
+        try:
+            msg = pickle.loads(future.result())
+        except Exception as exc:
+            msg = ResultMessage(key, 'aborted', None, exc)
+
+        results.Q.put(msg)
+
+    @push
+    def submit_job():
+        while True:
+            key, job = yield
+            future = executor.submit(run_pickled_job, dumps((key, job)))
+            future.add_done_callback(
+                lambda f, key=key: collect(key, f))
+
+    return Connection(results.source, submit_job)
+
+
+def run_process_pool(wf, n_workers=None, registry=None, deref=False,
+                     mp_context=None):
+    """Run the workflow on a pool of worker processes.
+
+    :param wf:
+        The workflow.
+    :type wf: `Workflow` or `PromisedObject`
+
+    :param n_workers:
+        Number of processes in the pool; by default the number of CPUs.
+
+    :param registry:
+        The serial registry; only needed with `deref`, since the jobs
+        themselves are pickled.
+
+    :param deref:
+        Set this to True to pass the result through one more encoding and
+        decoding step with object derefencing turned on.
+    :type deref: bool
+
+    :param mp_context:
+        The `multiprocessing` context to start the processes with.
+
+    :returns: the result of evaluating the workflow
+    :rtype: any
+    """
+    with ProcessPoolExecutor(n_workers, mp_context=mp_context) as executor:
+        result = Scheduler().run(executor_worker(executor), get_workflow(wf))
+
+    if deref:
+        return registry().dereference(result, host='localhost')
+    else:
+        return result
@@ -1,9 +1,20 @@
 """
 Manage IO between remote worker/pilot job, and the scheduler. Here there are
-two options: use json, or msgpack.
+three options: use json, msgpack, or a binary framing protocol.
+
+The framed protocol sends every message as a header, a JSON document and a
+number of raw binary buffers. The header gives the length of the JSON
+document and the number of buffers, followed by the length of each buffer,
+all as little-endian unsigned 64-bit integers. Serialisers that support it
+(see :py:mod:`noodles.serial.buffer`) put their data in the buffers, so that
+large arrays are written to and read from the pipe directly, without base64
+encoding.
 """
 
+import struct
+
 from ..coroutine import coroutine
+from ...serial.buffer import (out_of_band)
 
 try:
     import msgpack
@@ -14,7 +25,7 @@ except ImportError:
 def MsgPackObjectReader(registry, fi, deref=False):
     yield from msgpack.Unpacker(
         fi, object_hook=lambda o: registry.decode(o, deref),
-        encoding='utf-8')
+        raw=False)
 
 
 @coroutine
@@ -38,3 +49,65 @@ def JSONObjectWriter(registry, fo, host=None):
         # obj_msg = registry.to_json(obj, host=host)
         # print(obj_msg, file=sys.stderr)
         print(registry.to_json(obj, host=host), file=fo, flush=True)
+
+
+_frame_header = struct.Struct('<QQ')
+_frame_size = struct.Struct('<Q')
+
+
+def _read_into(fi, buffer):
+    """Fill `buffer` from binary stream `fi`; returns False if the stream
+    ends before any data is read."""
+    view = memoryview(buffer)
+    n = 0
+    while n < len(view):
+        m = fi.readinto(view[n:])
+        if not m:
+            if n == 0:
+                return False
+            raise EOFError("Stream ended in the middle of a message.")
+        n += m
+
+    return True
+
+
+def FramedObjectReader(registry, fi, deref=False):
+    """Read messages in the framed protocol from binary stream `fi`."""
+    header = bytearray(_frame_header.size)
+    while _read_into(fi, header):
+        length, n_buffers = _frame_header.unpack(header)
+
+        sizes = bytearray(_frame_size.size * n_buffers)
+        _read_into(fi, sizes)
+
+        data = bytearray(length)
+        _read_into(fi, data)
+
+        buffers = []
+        for (size,) in _frame_size.iter_unpack(sizes):
+            buffer = bytearray(size)
+            _read_into(fi, buffer)
+            buffers.append(buffer)
+
+        with out_of_band(buffers):
+            obj = registry.from_json(data.decode(), deref=deref)
+
+        yield obj
+
+
+@coroutine
+def FramedObjectWriter(registry, fo, host=None):
+    """Write messages in the framed protocol to binary stream `fo`."""
+    while True:
+        obj = yield
+
+        with out_of_band() as buffers:
+            data = registry.to_json(obj, host=host).encode()
+
+        fo.write(_frame_header.pack(len(data), len(buffers)))
+        for buffer in buffers:
+            fo.write(_frame_size.pack(buffer.nbytes))
+        fo.write(data)
+        for buffer in buffers:
+            fo.write(buffer)
+        fo.flush()
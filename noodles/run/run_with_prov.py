@@ -10,14 +10,17 @@ from .worker import (worker, run_job)
 from .job_keeper import (JobKeeper)
 
 from ..workflow import (get_workflow, is_workflow)
-from ..prov import (JobDB)
-from ..prov.key import (prov_key)
+from ..prov import (open_job_db)
+from ..prov.cache import (encoded_size)
+from ..prov.key import (job_prov)
+from ..serial.shared_memory import (no_segments)
 
 from itertools import (repeat)
 import threading
 
 
-def run_single(wf, registry, jobdb_file, display=None):
+def run_single(wf, registry, jobdb_file, display=None,
+               database='TinyDB', blob_dir=None):
     """Run a workflow in a single thread. This is the absolute minimal
     runner, consisting of a single queue for jobs and a worker running
     jobs every time a result is pulled.
@@ -25,7 +28,7 @@ def run_single(wf, registry, jobdb_file, display=None):
     This version integrates with the JobDB.
     """
     registry = registry()
-    db = JobDB(jobdb_file)
+    db = open_job_db(database, jobdb_file, blob_dir)
 
     def decode_result(key, obj):
         return ResultMessage(key, 'retrieved', registry.deep_decode(obj), None)
@@ -33,8 +36,7 @@ def run_single(wf, registry, jobdb_file, display=None):
     @pull
     def pass_job(source):
         for key, job in source():
-            job_msg = registry.deep_encode(job)
-            prov = prov_key(job_msg)
+            job_msg, prov = job_prov(registry, job)
 
             if db.job_exists(prov):
                 status, _, result = db.get_result_or_attach(
@@ -47,11 +49,12 @@ def run_single(wf, registry, jobdb_file, display=None):
 
             db.new_job(key, prov, job_msg)
             result = run_job(key, job)
-            result_msg = registry.deep_encode(result.value)
+            with no_segments():
+                result_msg = registry.deep_encode(result.value)
             db.store_result(key, result_msg)
             yield result
 
-    S = Scheduler()
+    S = Scheduler(batch=False)
     W = Queue() >> pass_job
 
     return S.run(W, get_workflow(wf))
@@ -74,11 +77,14 @@ def print_result(key, status, result, msg):
 
 
 def schedule_job(results, registry, db,
-                 job_keeper=None, pred=lambda job: True):
+                 job_keeper=None, pred=lambda job: True, cache=None):
     """Schedule a job, providing there is no result for it in the database yet.
 
     First the database checks if there is a previous job that is identical to
-    the current one. If this is the case, the result is 'retrieved'.
+    the current one. If this is the case, the result is 'retrieved'. If a
+    :py:class:`LRUCache` is given, the status and encoded result of jobs are
+    kept there, and looked up before going to the database; see
+    :py:mod:`noodles.prov.cache`.
 
     If there is no result, but the job description is in the database, either
     the job is still running, or it was tried before but Noodles crashed.
@@ -87,6 +93,11 @@ def schedule_job(results, registry, db,
     In the second case, the record of the previous job is deleted and the new
     job is scheduled.
     """
+    def new_job(key, prov, job_msg):
+        db.new_job(key, prov, job_msg)
+        if cache is not None:
+            cache.put(prov, ('running', None), len(prov))
+
     @push
     def schedule_f(job_sink_):
         job_sink = job_sink_()
@@ -96,25 +107,40 @@ def schedule_job(results, registry, db,
             key, job = yield
 
             if pred(job):
-                job_msg = registry.deep_encode(job)
-                prov = prov_key(job_msg)
+                job_msg, prov = job_prov(registry, job)
+                # `store_result_deep` finds the prov key here
+                job.prov = prov
+
+                cached = None
+                if cache is not None:
+                    # a running job still needs the database to attach to
+                    cached, result = cache.get(
+                        prov, (None, None), hit=lambda e: e[0] == 'done')
+                    if cached == 'done':
+                        result_sink.send((
+                            key, 'retrieved',
+                            registry.deep_decode(result, deref=True), None))
+                        continue
 
-                if db.job_exists(prov):
+                if cached == 'running' or db.job_exists(prov):
                     status, other_key, result = db.get_result_or_attach(
                         key, prov, job_keeper)
                     if status == 'retrieved':
-                        result_sink.send(
-                            (key, 'retrieved',
-                             registry.deep_decode(result, deref=True), None))
+                        if cache is not None:
+                            cache.put(prov, ('done', result),
+                                      encoded_size(result))
+                        result_sink.send((
+                            key, 'retrieved',
+                            registry.deep_decode(result, deref=True), None))
                         continue
                     elif status == 'attached':
                         continue
                     elif status == 'broken':
-                        db.new_job(key, prov, job_msg)
+                        new_job(key, prov, job_msg)
                         job_sink.send((key, job))
 
                 else:
-                    db.new_job(key, prov, job_msg)
+                    new_job(key, prov, job_msg)
                     job_sink.send((key, job))
 
             else:
@@ -123,15 +149,27 @@ def schedule_job(results, registry, db,
     return schedule_f
 
 
-def store_result_deep(registry, db, job_keeper=None, pred=lambda job: True):
+def store_result_deep(registry, db, job_keeper=None, pred=lambda job: True,
+                      cache=None):
     """When the result is known, we can insert it in the database. This is
     only done if the result is not a workflow. If the result is a workflow,
     a 'link' is added in the database, identifying the workflow by the Python
     `id` of the workflow object. When this workflow is finished the final
-    result is inserted in the database."""
+    result is inserted in the database. The result is also put in the
+    `cache`, if one is given, under the prov key that :py:func:`schedule_job`
+    found for the job."""
     def store_result(key, result, msg):
-        result_msg = registry.deep_encode(result)
+        # the database keeps the data itself, not a shared memory segment
+        with no_segments():
+            result_msg = registry.deep_encode(result)
         attached = db.store_result(key, result_msg)
+
+        # jobs linked to a workflow may already be gone from the keeper
+        job = job_keeper.get(key) if cache is not None else None
+        if job is not None and job.node.prov is not None:
+            cache.put(job.node.prov, ('done', result_msg),
+                      encoded_size(result_msg))
+
         if attached:
             for akey in attached:
                 yield ResultMessage(akey, 'attached', result, msg)
@@ -142,7 +180,9 @@ def store_result_deep(registry, db, job_keeper=None, pred=lambda job: True):
             wf, n = job_keeper[key]
             job = wf.nodes[n]
 
-            if pred(job):
+            # a retrieved result is in the database already, and no other
+            # job can be attached to it
+            if pred(job) and status != 'retrieved':
                 if is_workflow(result):
                     db.add_link(key, id(get_workflow(result)))
                 else:
@@ -164,17 +204,18 @@ def store_result_deep(registry, db, job_keeper=None, pred=lambda job: True):
     return f
 
 
-def run_parallel(wf, n_threads, registry, jobdb_file, job_keeper=None):
+def run_parallel(wf, n_threads, registry, jobdb_file, job_keeper=None,
+                 database='TinyDB', cache=None, blob_dir=None):
     """Run a workflow in `n_threads` parallel threads. Now we replaced the
     single worker with a thread-pool of workers.
 
     This version works with the JobDB to cache results."""
     registry = registry()
-    db = JobDB(jobdb_file)
+    db = open_job_db(database, jobdb_file, blob_dir)
 
     if job_keeper is None:
         job_keeper = JobKeeper()
-    S = Scheduler(job_keeper=job_keeper)
+    S = Scheduler(job_keeper=job_keeper, batch=False)
 
     jobs = Queue()
     results = Queue()
@@ -195,26 +236,28 @@ def run_parallel(wf, n_threads, registry, jobdb_file, job_keeper=None):
         >> start_job(db) \
         >> branch(log_job_start >> LogQ.sink) \
         >> thread_pool(*repeat(worker, n_threads), results=results) \
-        >> store_result_deep(registry, db, job_keeper) \
+        >> store_result_deep(registry, db, job_keeper, cache=cache) \
         >> branch(LogQ.sink)
 
-    j_snk = schedule_job(results, registry, db, job_keeper) >> jobs.sink
+    j_snk = schedule_job(results, registry, db, job_keeper, cache=cache) \
+        >> jobs.sink
 
     return S.run(Connection(r_src, j_snk), get_workflow(wf))
 
 
 def create_prov_worker(
         worker, results, registry, jobdb_file, job_keeper,
-        pred=lambda x: True, log_q=None):
+        pred=lambda x: True, log_q=None, database='TinyDB', cache=None,
+        blob_dir=None):
     registry = registry()
-    db = JobDB(jobdb_file)
+    db = open_job_db(database, jobdb_file, blob_dir)
 
     jobs = Queue()
 
     r_src = jobs.source \
         >> start_job(db) \
         >> worker \
-        >> store_result_deep(registry, db, job_keeper, pred)
+        >> store_result_deep(registry, db, job_keeper, pred, cache)
 
     @push_map
     def log_job_sched(key, job):
@@ -222,19 +265,21 @@ def create_prov_worker(
 
     j_snk = broadcast(
         log_job_sched >> log_q.sink,
-        schedule_job(results, registry, db, job_keeper, pred) >> jobs.sink)
+        schedule_job(results, registry, db, job_keeper, pred, cache)
+        >> jobs.sink)
 
     return Connection(r_src, j_snk)
 
 
 def prov_wrap_connection(
         worker, results, registry, jobdb_file, job_keeper,
-        pred=lambda x: True, log_q=None):
+        pred=lambda x: True, log_q=None, database='TinyDB', cache=None,
+        blob_dir=None):
     registry = registry()
-    db = JobDB(jobdb_file)
+    db = open_job_db(database, jobdb_file, blob_dir)
 
     r_src = worker.source \
-        >> store_result_deep(registry, db, job_keeper, pred)
+        >> store_result_deep(registry, db, job_keeper, pred, cache)
 
     @push_map
     def log_job_sched(key, job):
@@ -242,13 +287,15 @@ def prov_wrap_connection(
 
     j_snk = broadcast(
         log_job_sched >> log_q.sink,
-        schedule_job(results, registry, db, job_keeper, pred) >> worker.sink)
+        schedule_job(results, registry, db, job_keeper, pred, cache)
+        >> worker.sink)
 
     return Connection(r_src, j_snk)
 
 
 def run_parallel_opt(wf, n_threads, registry, jobdb_file,
-                     job_keeper=None, display=None, cache_all=False):
+                     job_keeper=None, display=None, cache_all=False,
+                     database='TinyDB', cache=None, blob_dir=None):
     """Run a workflow in `n_threads` parallel threads. Now we replaced the
     single worker with a thread-pool of workers.
 
@@ -275,10 +322,27 @@ def run_parallel_opt(wf, n_threads, registry, jobdb_file,
     :param display:
         The display routine to display activity. If not given, we won't report
         on any activity.
+
+    :param cache_all:
+        Store all jobs, not only those hinted with 'store'.
+
+    :param database:
+        The database backend, see :py:func:`noodles.prov.open_job_db`. The
+        'journal' backend is indexed and only appends to its file, so it
+        stays fast as the cache grows.
+
+    :param cache:
+        A :py:class:`noodles.prov.cache.LRUCache` for the status and
+        results of jobs, in front of the database. Results computed in this
+        run are added to the cache as they come in.
+
+    :param blob_dir:
+        Directory for a content-addressed store of large results, see
+        :py:mod:`noodles.prov.blobs`. Identical results are stored once.
     """
     if job_keeper is None:
         job_keeper = JobKeeper()
-    S = Scheduler(job_keeper=job_keeper)
+    S = Scheduler(job_keeper=job_keeper, batch=False)
 
     results = Queue()
 
@@ -307,5 +371,5 @@ def run_parallel_opt(wf, n_threads, registry, jobdb_file,
     return S.run(
         create_prov_worker(
             parallel_worker, results, registry, jobdb_file, job_keeper,
-            pred, LogQ),
+            pred, LogQ, database, cache, blob_dir),
         get_workflow(wf))
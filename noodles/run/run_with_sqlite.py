@@ -11,7 +11,8 @@ from .job_keeper import (JobKeeper)
 
 from ..workflow import (get_workflow, is_workflow)
 from ..prov.sqlite import (JobDB)
-from ..prov.key import (prov_key)
+from ..prov.key import (job_prov)
+from ..serial.shared_memory import (no_segments)
 
 from itertools import (repeat)
 import threading
@@ -33,8 +34,7 @@ def run_single(wf, registry, jobdb_file, display=None):
     @pull
     def pass_job(source):
         for key, job in source():
-            job_msg = registry.deep_encode(job)
-            prov = prov_key(job_msg)
+            job_msg, prov = job_prov(registry, job)
 
             if db.job_exists(prov):
                 status, _, result = db.get_result_or_attach(
@@ -47,14 +47,16 @@ def run_single(wf, registry, jobdb_file, display=None):
 
             db.new_job(key, prov, job_msg)
             result = run_job(key, job)
-            result_msg = registry.deep_encode(result.value)
+            with no_segments():
+                result_msg = registry.deep_encode(result.value)
             db.store_result(key, result_msg)
             yield result
 
-    S = Scheduler()
+    S = Scheduler(batch=False)
     W = Queue() >> pass_job
 
-    return S.run(W, get_workflow(wf))
+    with db:
+        return S.run(W, get_workflow(wf))
 
 
 def start_job(db):
@@ -96,8 +98,7 @@ def schedule_job(results, registry, db,
             key, job = yield
 
             if pred(job):
-                job_msg = registry.deep_encode(job)
-                prov = prov_key(job_msg)
+                job_msg, prov = job_prov(registry, job)
 
                 if db.job_exists(prov):
                     status, other_key, result = db.get_result_or_attach(
@@ -130,7 +131,9 @@ def store_result_deep(registry, db, job_keeper=None, pred=lambda job: True):
     `id` of the workflow object. When this workflow is finished the final
     result is inserted in the database."""
     def store_result(key, result, msg):
-        result_msg = registry.deep_encode(result)
+        # the database keeps the data itself, not a shared memory segment
+        with no_segments():
+            result_msg = registry.deep_encode(result)
         attached = db.store_result(key, result_msg)
         if attached:
             for akey in attached:
@@ -174,7 +177,7 @@ def run_parallel(wf, n_threads, registry, jobdb_file, job_keeper=None):
 
     if job_keeper is None:
         job_keeper = JobKeeper()
-    S = Scheduler(job_keeper=job_keeper)
+    S = Scheduler(job_keeper=job_keeper, batch=False)
 
     jobs = Queue()
     results = Queue()
@@ -200,7 +203,8 @@ def run_parallel(wf, n_threads, registry, jobdb_file, job_keeper=None):
 
     j_snk = schedule_job(results, registry, db, job_keeper) >> jobs.sink
 
-    return S.run(Connection(r_src, j_snk), get_workflow(wf))
+    with db:
+        return S.run(Connection(r_src, j_snk), get_workflow(wf))
 
 
 def create_prov_worker(
@@ -278,7 +282,7 @@ def run_parallel_opt(wf, n_threads, registry, jobdb_file,
     """
     if job_keeper is None:
         job_keeper = JobKeeper()
-    S = Scheduler(job_keeper=job_keeper)
+    S = Scheduler(job_keeper=job_keeper, batch=False)
 
     results = Queue()
 
@@ -1,7 +1,9 @@
 from .queue import (Queue)
 from .scheduler import (Scheduler)
+from .priority import (PriorityScheduler)
 from .haploid import (push_map, sink_map, branch, patch)
 from .thread_pool import (thread_pool)
+from .work_stealing import (work_stealing_pool)
 from .worker import (worker)
 from ..workflow import (get_workflow)
 from .job_keeper import (JobTimer)
@@ -20,11 +22,22 @@ def run_single(wf):
     return S.run(W, get_workflow(wf))
 
 
-def run_parallel(wf, n_threads):
+def run_parallel(wf, n_threads, engine='queue', priority=False):
     """Run a workflow in `n_threads` parallel threads. Now we replaced the
-    single worker with a thread-pool of workers."""
-    S = Scheduler()
-    W = Queue() >> thread_pool(*repeat(worker, n_threads))
+    single worker with a thread-pool of workers.
+
+    With `engine='work_stealing'` the threads keep their own job queues, see
+    :py:mod:`noodles.run.work_stealing`; this has less overhead per job.
+
+    With `priority=True` jobs on the critical path go first, see
+    :py:mod:`noodles.run.priority`."""
+    S = PriorityScheduler(n_threads) if priority else Scheduler()
+    if engine == 'work_stealing':
+        W = work_stealing_pool(n_threads)
+    elif engine == 'queue':
+        W = Queue() >> thread_pool(*repeat(worker, n_threads))
+    else:
+        raise ValueError("Unknown engine: {}".format(engine))
 
     return S.run(W, get_workflow(wf))
 
@@ -1,9 +1,11 @@
 from .connection import (Connection)
 from .job_keeper import (JobKeeper)
+from .worker import (batch_node)
 
 from ..workflow import (
     is_workflow, get_workflow, insert_result,
-    is_node_ready, Workflow)
+    count_pending, Workflow)
+from ..workflow.arguments import (set_argument, Empty)
 from ..interface import (JobException)
 import sys
 
@@ -21,6 +23,14 @@ class Job:
         return self.workflow.nodes[self.node_id]
 
 
+class BatchJob:
+    """A group of jobs, sent to a worker as a single job. The result is a
+    list with a :py:class:`ResultMessage` for each job."""
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.node = batch_node([job.node for job in jobs])
+
+
 class DynamicLink:
     def __init__(self, source, target, node):
         self.source = source
@@ -44,8 +54,28 @@ class Scheduler:
     Schedules jobs, recieves results, then schedules more jobs as they
     become ready to compute. This class communicates with a pool of workers
     by means of coroutines.
+
+    Calls to very small functions can be grouped into batches, to save the
+    cost of sending a message for each call. Ready jobs for a function with
+    a `batch` hint (see :py:func:`schedule_hint`) are held back until there
+    are `batch` of them, and are then sent out as one :py:class:`BatchJob`.
+    A smaller batch is sent once the scheduler runs out of other ready work:
+    when a result makes no other jobs ready, or no jobs are running, so that
+    workers don't wait for a batch to fill up. Setting `batch` on the
+    scheduler does this for every function without a hint; `batch=False`
+    turns batching off altogether, hints included. The runners that cache
+    results do this, since they look up and store each call on its own.
+
+    With `release=True`, a node lets go of its result once it has been
+    passed on to all nodes that need it, and of the arguments it received
+    from other nodes once it has run. This way a long sweep only holds the
+    results that are still needed. Only the result of the root node is
+    kept, so :py:func:`result` can't be used on other promised objects
+    after the run. Nothing is released if the job keeper is told to `keep`
+    its jobs.
     """
-    def __init__(self, verbose=False, error_handler=None, job_keeper=None):
+    def __init__(self, verbose=False, error_handler=None, job_keeper=None,
+                 batch=None, release=False):
         if job_keeper is None:
             self.jobs = JobKeeper()
         else:
@@ -57,6 +87,14 @@ class Scheduler:
         self.key_map = {}
         self.verbose = verbose
         self.handle_error = error_handler
+        self.batch = batch
+        self.batches = {}
+        # jobs sent out that have no result yet, and jobs sent out since
+        # the last `flush`; the job keeper may keep jobs that are done.
+        self.in_flight = 0
+        self.sent = 0
+        self.release = release and not getattr(self.jobs, 'keep', False)
+        self.received = {}
 
     def run(self, connection: Connection, master: Workflow):
         """Run a workflow.
@@ -72,23 +110,43 @@ class Scheduler:
         """
         # initiate worker slave army and take up reins ...
         source, sink = connection.setup()
+        self.start(master, sink)
 
-        # schedule work
+        # process results
+        for msg in source:
+            done, result = self.process(msg, master, sink)
+            if done:
+                return result
+
+        print("Seventh circle of HELL")
+
+    def start(self, master, sink):
+        """Schedule the jobs that are ready at the start of a run."""
+        self.graceful_exit = False
         self.add_workflow(master, master, master.root, sink)
-        graceful_exit = False
+        self.flush(sink)
 
-        # process results
-        for job_key, status, result, err_msg in source:
-            if status == 'aborted':
-                print("Got a fatal error: exiting.",
-                      file=sys.stderr, flush=True)
-                sys.exit()
+    def process(self, msg, master, sink):
+        """Process a result message from a worker, scheduling the jobs that
+        become ready as a consequence. Returns a tuple `(done, result)`,
+        where `done` is True once the run is over.
+
+        This holds all the logic of :py:meth:`run`, so that other loops
+        (like the one in :py:mod:`noodles.run.asynchronous`) can drive the
+        scheduler."""
+        job_key, status, result, err_msg = msg
+        if status == 'aborted':
+            print("Got a fatal error: exiting.",
+                  file=sys.stderr, flush=True)
+            sys.exit()
 
-            wf, n = self.jobs[job_key]
+        for (wf, n), status, result, err_msg in \
+                self.unpack(job_key, status, result, err_msg):
             if status == 'error':
-                if self.handle_error and isinstance(err_msg, JobException):
+                if self.handle_error and \
+                        isinstance(err_msg, JobException):
                     if self.handle_error(wf.nodes[n], *err_msg):
-                        graceful_exit = True
+                        self.graceful_exit = True
                     else:
                         err_msg.reraise()
 
@@ -103,13 +161,19 @@ class Scheduler:
                             "Exception raised: {}".format(err_msg))
 
             if self.verbose:
-                print("sched result [{0}]: ".format(self.key_map[job_key]),
+                print("sched result [{0}]: ".format(
+                          self.key_map[job_key]),
                       result,
                       file=sys.stderr, flush=True)
 
-            del self.jobs[job_key]
-            if len(self.jobs) == 0 and graceful_exit:
-                return
+            # the node has run, so it no longer needs its arguments; this
+            # is the node that ran, also if it returned a workflow or is the
+            # root of a child workflow.
+            if self.release:
+                self.release_arguments(wf.nodes[n])
+
+            if self.in_flight == 0 and self.graceful_exit:
+                return True, None
 
             # if this result is the root of a workflow, pop to parent
             # we do this before scheduling a child workflow, as to
@@ -126,25 +190,99 @@ class Scheduler:
                 continue
 
             # insert the result in the nodes that need it
-            wf.nodes[n].result = result
+            node = wf.nodes[n]
+            if not self.release or n == wf.root:
+                node.result = result
+
             for (tgt, address) in wf.links[n]:
-                insert_result(wf.nodes[tgt], address, result)
-                if is_node_ready(wf.nodes[tgt]) and not graceful_exit:
+                pending = insert_result(wf.nodes[tgt], address, result)
+                if self.release:
+                    self.received.setdefault(
+                        id(wf.nodes[tgt]), []).append(address)
+                if pending == 0 and not self.graceful_exit:
                     self.schedule(Job(workflow=wf, node_id=tgt), sink)
 
             # see if we're done
             if wf == master and n == master.root:
-                return result
+                return True, result
 
-        print("Seventh circle of HELL")
+        self.flush(sink)
+        return False, None
+
+    def release_arguments(self, node):
+        """Reset the arguments that `node` received from other nodes to
+        `Empty`, so that the values can be freed. This also leaves the node
+        as it was before the run."""
+        for address in self.received.pop(id(node), ()):
+            set_argument(node.bound_args, address, Empty)
+
+    def unpack(self, key, status, result, err_msg):
+        """Remove the job `key` from the job keeper, giving a list of
+        `(job, status, result, err_msg)` for the job, or for each of the
+        jobs in a :py:class:`BatchJob`."""
+        job = self.jobs[key]
+        del self.jobs[key]
+        self.in_flight -= 1
+
+        if not isinstance(job, BatchJob):
+            return [(job, status, result, err_msg)]
+
+        if status != 'done':
+            return [(j, status, None, err_msg) for j in job.jobs]
+
+        return [(j, r.status, r.value, r.msg)
+                for j, r in zip(job.jobs, result)]
 
     def schedule(self, job, sink):
+        hints = job.node.hints
+        if self.batch is False:
+            size = None
+        else:
+            size = hints.get('batch', self.batch) if hints else self.batch
+
+        if not size or size < 2:
+            self.sent += 1
+            self.dispatch(job, sink)
+            return
+
+        group = self.batches.setdefault(job.node.foo, [])
+        group.append(job)
+        if len(group) >= size:
+            del self.batches[job.node.foo]
+            self.send_batch(group, sink)
+
+    def send_batch(self, jobs, sink):
+        self.sent += 1
+        if len(jobs) == 1:
+            self.dispatch(jobs[0], sink)
+        else:
+            self.dispatch(BatchJob(jobs), sink)
+
+    def dispatch(self, job, sink):
+        """Register a job (or :py:class:`BatchJob`) and send it out."""
+        self.in_flight += 1
         sink.send(self.jobs.register(job))
 
+    def flush(self, sink):
+        """Send out all jobs that are held back to form a batch, if no other
+        jobs were sent out since the last call, or none are running. As long
+        as other jobs keep the workers busy, more jobs may join a batch."""
+        if self.sent == 0 or self.in_flight == 0:
+            batches, self.batches = self.batches, {}
+            for jobs in batches.values():
+                self.send_batch(jobs, sink)
+
+        self.sent = 0
+
     def add_workflow(self, wf, target, node, sink):
+        """Add a workflow to the scheduler. The number of pending arguments
+        is counted once for each node; from then on `insert_result` keeps
+        track, so a node is known to be ready as soon as its count drops
+        to zero."""
         self.dynamic_links[id(wf)] = DynamicLink(
             source=wf, target=target, node=node)
 
         for n in wf.nodes:
-            if is_node_ready(wf.nodes[n]):
+            wf.nodes[n].pending = count_pending(wf.nodes[n])
+            if wf.nodes[n].pending == 0:
                 self.schedule(Job(workflow=wf, node_id=n), sink)
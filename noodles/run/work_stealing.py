@@ -0,0 +1,105 @@
+"""
+Work-stealing thread pool
+=========================
+
+The :py:func:`thread_pool` lets all threads pull jobs from one `Queue`, and
+push results into another; every job and result takes the locks of both
+queues and of a :py:class:`CatchExceptions` object. For many small jobs,
+these locks are the bottleneck.
+
+Here each thread has its own `deque` of jobs. New jobs are handed out to the
+threads in turn, and a thread that runs out of work takes jobs from the
+other end of another thread's deque. A semaphore counts the jobs waiting,
+so that idle threads sleep. Results are appended to a single `deque`; the
+scheduler takes all that have piled up in one go, and threads only wake it
+up when it is actually waiting. Appending to and popping from a `deque` is
+atomic, so none of this needs a lock of its own.
+"""
+
+import threading
+from collections import deque
+
+from .connection import Connection
+from .haploid import (push, pull)
+from .messages import ResultMessage
+from .worker import run_job
+from ..interface import JobException
+
+
+def work_stealing_pool(n_threads):
+    """Start `n_threads` threads running jobs; see the module documentation.
+
+    :returns:
+        A connection for the scheduler.
+    :rtype: Connection
+    """
+    jobs = [deque() for _ in range(n_threads)]
+    available = threading.Semaphore(0)
+    results = deque()
+    ready = threading.Event()
+    waiting = False
+
+    def work(i):
+        own = jobs[i]
+        others = jobs[i + 1:] + jobs[:i]
+
+        while True:
+            available.acquire()
+            try:
+                key, job = own.popleft()
+            except IndexError:
+                key, job = steal(others)
+
+            results.append(run(key, job))
+            if waiting:
+                ready.set()
+
+    def run(key, job):
+        # `run_job` only catches an `Exception`; anything else would stop
+        # the thread, and the scheduler would wait for this job forever.
+        try:
+            return run_job(key, job)
+        except BaseException as exc:
+            return ResultMessage(key, 'error', None, JobException(
+                type(exc), exc, exc.__traceback__))
+
+    def steal(others):
+        # the semaphore guarantees there is a job for us in one of the
+        # deques, but other threads may get to it first; keep looking.
+        while True:
+            for victim in others:
+                try:
+                    return victim.pop()
+                except IndexError:
+                    pass
+
+    @push
+    def send_job():
+        i = 0
+        while True:
+            msg = yield
+            jobs[i].append(msg)
+            available.release()
+            i = (i + 1) % n_threads
+
+    @pull
+    def get_result():
+        nonlocal waiting
+        while True:
+            while results:
+                yield results.popleft()
+
+            # set `waiting` before looking at `results` again; a thread
+            # appends a result before it looks at `waiting`, so one of us
+            # will notice the other.
+            ready.clear()
+            waiting = True
+            if not results:
+                ready.wait()
+            waiting = False
+
+    for i in range(n_threads):
+        t = threading.Thread(target=work, args=(i,), daemon=True)
+        t.start()
+
+    return Connection(get_result, send_job)
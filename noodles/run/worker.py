@@ -2,6 +2,11 @@ from .haploid import (pull_map)
 from .messages import (ResultMessage)
 from ..interface import (AnnotatedValue, JobException)
 from ..utility import (object_name)
+from ..workflow.model import (FunctionNode)
+from ..workflow.arguments import (argument_spec)
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import inspect
 import sys
 
 
@@ -16,27 +21,72 @@ def run_job(key, job):
     object with 'error' status. If the job requests return-value
     annotation, a two-tuple is expected; this tuple is then
     unpacked, the first being the result, the second part is
-    sent on in the error message slot."""
-    try:
-        if job.hints and 'annotated' in job.hints:
-            result = job.apply()
-            if isinstance(result, tuple) and len(result) == 2:
-                value, msg = result
-                return ResultMessage(key, 'done', value, msg)
-            else:
-                raise TypeError("You promised annotation in call "
-                                "to function {} but return value "
-                                "is incompatible with 2-tuple."
-                                .format(object_name(job.foo)))
+    sent on in the error message slot.
 
-        else:
-            result = job.apply()
-            if isinstance(result, AnnotatedValue):
-                value, message = result
-                return ResultMessage(key, 'done', value, message)
+    If the job calls a coroutine function, the coroutine is run to
+    completion in a new event loop, see :py:func:`run_coroutine`. The
+    asynchronous runner (see :py:mod:`noodles.run.asynchronous`) runs these
+    concurrently in stead.
+    """
+    try:
+        result = job.apply()
+        if inspect.iscoroutine(result):
+            result = run_coroutine(result)
 
-            return ResultMessage(key, 'done', result, None)
+        return result_message(key, job, result)
 
     except Exception:
         exc_info = sys.exc_info()
         return ResultMessage(key, 'error', None, JobException(*exc_info))
+
+
+def run_coroutine(coro):
+    """Run `coro` to completion in a new event loop. If this thread already
+    runs an event loop (say, in a Jupyter notebook), we can't start another
+    one here, so the new loop gets a thread of its own."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def result_message(key, job, result):
+    """Wrap the value returned by a job in a :py:class:`ResultMessage`,
+    unpacking annotations."""
+    if job.hints and 'annotated' in job.hints:
+        if isinstance(result, tuple) and len(result) == 2:
+            value, msg = result
+            return ResultMessage(key, 'done', value, msg)
+        else:
+            raise TypeError("You promised annotation in call "
+                            "to function {} but return value "
+                            "is incompatible with 2-tuple."
+                            .format(object_name(job.foo)))
+
+    if isinstance(result, AnnotatedValue):
+        value, message = result
+        return ResultMessage(key, 'done', value, message)
+
+    return ResultMessage(key, 'done', result, None)
+
+
+def apply_batch(nodes):
+    """Run a batch of jobs in one go, returning a list of results in the
+    form of :py:class:`ResultMessage` objects, keyed by their index in the
+    batch."""
+    return [run_job(i, node) for i, node in enumerate(nodes)]
+
+
+def batch_node(nodes):
+    """Create a single node that runs all `nodes` through
+    :py:func:`apply_batch`. The hints of the first node are copied, so that
+    the batch is sent to the same worker the nodes would go to."""
+    hints = dict(nodes[0].hints or {})
+    hints.pop('annotated', None)
+
+    spec = argument_spec(apply_batch)
+    return FunctionNode(
+        apply_batch, spec.signature.bind(nodes), hints, spec=spec)
@@ -138,7 +138,7 @@ class DynamicPool(Connection):
                     with w.lock:  # Worker lock ~~~~~~~~~~~~~~~~~~~~~
                         if len(w.jobs) < w.max:
                             w.sink.send((key, job))
-                            w.jobs.append(key)
+                            w.jobs.add(key)
                             break
                     # lock end ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
                 else:
@@ -152,7 +152,7 @@ class DynamicPool(Connection):
         c = XenonInteractiveWorker(self.XeS, job_config)
         w = RemoteWorker(
             job_config.name, threading.Lock(),
-            job_config.n_threads, [],
+            job_config.n_threads, set(),
             *c.setup())
 
         with self.lock:
@@ -164,7 +164,7 @@ class DynamicPool(Connection):
                 while len(w.jobs) < w.max and not self.job_queue.empty():
                     key, job = next(job_source)
                     w.sink.send((key, job))
-                    w.jobs.append(key)
+                    w.jobs.add(key)
             # lock end ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
         def activate(_):
@@ -181,11 +181,11 @@ class DynamicPool(Connection):
 
                 # do bookkeeping and submit a new job to the worker
                 with w.lock:  # Worker lock ~~~~~~~~~~~~~~~~~~~~~
-                    w.jobs.remove(result.key)
+                    w.jobs.discard(result.key)
                 populate(job_source)
                 # lock end ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-            for key in w.jobs:
+            for key in list(w.jobs):
                 sink.send(ResultMessage(
                     key, 'aborted', None, 'connection to remote worker lost.'))
 
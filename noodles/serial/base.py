@@ -1,15 +1,19 @@
 from .registry import (Registry, Serialiser)
 from .reasonable import (Reasonable, SerReasonableObject)
+from .buffer import (SerBytes)
 from ..interface import (PromisedObject)
 from ..utility import (object_name, look_up, importable)
 from ..workflow import (Workflow, NodeData, FunctionNode, ArgumentAddress,
-                        ArgumentKind, reset_workflow, get_workflow)
+                        ArgumentKind, reset_workflow, get_workflow,
+                        CompactWorkflow, intern_address)
 from ..storable import (Storable)
 # from .as_dict import (AsDict)
 # from enum import Enum
 from inspect import isfunction, ismethod
+from types import MethodType
 # from collections import namedtuple
 from itertools import count
+from array import array
 # import json
 # import sys
 
@@ -69,26 +73,61 @@ def _remap_links(remap, links):
 
 
 class SerWorkflow(Serialiser):
+    """Serialises a :py:class:`Workflow`. Node ids are remapped to a dense
+    range of integers. A :py:class:`CompactWorkflow` already has dense ids,
+    and is marked as such, so that it is decoded to the compact layout."""
     def __init__(self):
         super(SerWorkflow, self).__init__(Workflow)
 
     def encode(self, obj, make_rec):
+        if isinstance(obj, CompactWorkflow):
+            return make_rec({'root': obj.root,
+                             'nodes': obj.nodes.values(),
+                             'links': [{'node': i,
+                                        'to': [{'node': node,
+                                                'address': address}
+                                               for node, address in target]}
+                                       for i, target in obj.links.items()],
+                             'compact': True})
+
         remap = dict(zip(obj.nodes.keys(), count()))
         return make_rec({'root': remap[obj.root],
                          'nodes': list(obj.nodes.values()),
                          'links': _remap_links(remap, obj.links)})
 
     def decode(self, cls, data):
-        root = data['root']
+        if data.get('compact'):
+            return reset_workflow(self._decode_compact(data))
 
+        root = data['root']
         nodes = dict(zip(count(), data['nodes']))
 
-        links = {l['node']: {(target['node'], target['address'])
+        links = {l['node']: {(target['node'],
+                              intern_address(target['address']))
                              for target in l['to']}
                  for l in data['links']}
 
         return reset_workflow(Workflow(root, nodes, links))
 
+    @staticmethod
+    def _decode_compact(data):
+        n = len(data['nodes'])
+        to = [()] * n
+        for l in data['links']:
+            to[l['node']] = l['to']
+
+        offsets = array('q', [0])
+        targets = array('q')
+        addresses = []
+        for i in range(n):
+            for target in to[i]:
+                targets.append(target['node'])
+                addresses.append(intern_address(target['address']))
+            offsets.append(len(targets))
+
+        return CompactWorkflow(
+            data['root'], data['nodes'], offsets, targets, addresses)
+
 
 class SerPromisedObject(Serialiser):
     def __init__(self):
@@ -163,7 +202,38 @@ class SerNode(Serialiser):
         return FunctionNode.from_node_data(NodeData(**data))
 
 
+_hooked_types = {}
+
+
+def _may_be_hooked(obj):
+    """Quick test whether `_noodles_hook` could return anything other than
+    `None` for `obj`. The hook only applies to functions, methods and
+    other objects that have a `__name__`. Whether the class of `obj` gives
+    its instances a `__name__` (or any attribute, through `__getattr__`) is
+    decided once per type; only the instance `__dict__` is checked every
+    time."""
+    cls = type(obj)
+    try:
+        hooked = _hooked_types[cls]
+    except KeyError:
+        hooked = _hooked_types[cls] = issubclass(cls, MethodType) or any(
+            name in vars(base)
+            for base in cls.__mro__ if base is not object
+            for name in ('__name__', '__member_of__', '__getattr__')) or \
+            isfunction(getattr(cls, '__getattribute__', None))
+
+    if hooked:
+        return True
+
+    members = getattr(obj, '__dict__', None)
+    return members is not None and \
+        ('__name__' in members or '__member_of__' in members)
+
+
 def _noodles_hook(obj):
+    if not _may_be_hooked(obj):
+        return None
+
     if '__member_of__' in dir(obj) and obj.__member_of__:
         return '<method>'
 
@@ -191,7 +261,9 @@ def registry():
             ArgumentAddress: SerNamedTuple(ArgumentAddress),
             Workflow: SerWorkflow(),
             Storable: SerStorable(Storable),
-            PromisedObject: SerPromisedObject()
+            PromisedObject: SerPromisedObject(),
+            bytes: SerBytes(bytes),
+            bytearray: SerBytes(bytearray)
         },
         hooks={
             '<method>': SerMethod(),
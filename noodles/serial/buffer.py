@@ -0,0 +1,124 @@
+"""
+Out-of-band buffers
+===================
+
+Large binary objects (NumPy arrays, `bytes`, pickle protocol 5 buffers) are
+expensive to put in a JSON record: they need to be base64 encoded, which
+makes them a third larger, and are copied several times on the way. When a
+message is written with a binary framing protocol (see
+:py:func:`noodles.run.remote.io.FramedObjectWriter`), these buffers can be
+sent as separate frames after the message itself.
+
+Serialisers take part in this by calling :py:func:`add_buffer` while
+encoding. If the encoding happens inside an :py:func:`out_of_band` context,
+the buffer is appended to the list of that context and its index is
+returned, to be stored in the record. Otherwise :py:func:`add_buffer`
+returns `None`, and the serialiser should store the data in-band. When
+decoding, :py:func:`get_buffer` retrieves the buffer by index.
+
+The context is kept per thread, so that several threads may encode and
+decode messages at the same time.
+"""
+
+from contextlib import contextmanager
+import threading
+import base64
+
+from .registry import (Serialiser, Registry)
+
+_state = threading.local()
+
+
+@contextmanager
+def out_of_band(buffers=None):
+    """Context in which serialisers may store buffers out-of-band.
+
+    :param buffers:
+        List of buffers. When encoding, pass an empty list; it will be
+        filled with the buffers that were taken out of the message. When
+        decoding, pass the buffers that were received with the message.
+    :type buffers: list
+
+    :returns:
+        The list of buffers.
+    """
+    if buffers is None:
+        buffers = []
+
+    previous = getattr(_state, 'buffers', None)
+    _state.buffers = buffers
+    try:
+        yield buffers
+    finally:
+        _state.buffers = previous
+
+
+def is_out_of_band():
+    """Returns True if we're inside an :py:func:`out_of_band` context."""
+    return getattr(_state, 'buffers', None) is not None
+
+
+def add_buffer(data):
+    """Store a buffer out-of-band, if possible.
+
+    :param data:
+        An object supporting the buffer protocol. It is not copied, so the
+        object should not be changed until the message is written.
+
+    :returns:
+        The index of the buffer, or `None` if we're not inside an
+        :py:func:`out_of_band` context.
+    :rtype: int
+    """
+    buffers = getattr(_state, 'buffers', None)
+    if buffers is None:
+        return None
+
+    view = memoryview(data)
+    buffers.append(view.cast('B') if view.nbytes else memoryview(b''))
+    return len(buffers) - 1
+
+
+def get_buffer(index):
+    """Retrieve the buffer stored at `index` by :py:func:`add_buffer`.
+
+    :raises RuntimeError: if we're not inside an :py:func:`out_of_band`
+        context.
+    """
+    buffers = getattr(_state, 'buffers', None)
+    if buffers is None:
+        raise RuntimeError(
+            "Out-of-band buffer {} requested, but no buffers were received "
+            "with this message.".format(index))
+
+    return buffers[index]
+
+
+class SerBytes(Serialiser):
+    """Serialises `bytes` and `bytearray`; out-of-band if possible,
+    otherwise base64 encoded."""
+    def __init__(self, cls=bytes):
+        super(SerBytes, self).__init__(cls)
+
+    def encode(self, obj, make_rec):
+        index = add_buffer(obj)
+        if index is not None:
+            return make_rec({'buffer': index})
+
+        return make_rec({'base64': base64.b64encode(obj).decode('ascii')})
+
+    def decode(self, cls, data):
+        if 'buffer' in data:
+            return cls(get_buffer(data['buffer']))
+
+        return cls(base64.b64decode(data['base64'].encode('ascii')))
+
+
+def registry():
+    """Returns a serialisation registry for `bytes` and `bytearray`."""
+    return Registry(
+        types={
+            bytes: SerBytes(bytes),
+            bytearray: SerBytes(bytearray)
+        }
+    )
@@ -1,4 +1,7 @@
 from .registry import (Serialiser, Registry)
+from .buffer import (add_buffer, get_buffer, SerBytes)
+from .shared_memory import (
+    create_segment, attach_segment, segments_enabled, SharedArray)
 from ..utility import look_up
 import numpy
 import uuid
@@ -24,6 +27,104 @@ class SerNumpyArray(Serialiser):
         return numpy.load(fi)
 
 
+def dtype_descr(dtype):
+    """Describe `dtype` in a form that survives encoding as JSON, keeping
+    the fields of structured types."""
+    return numpy.lib.format.dtype_to_descr(dtype)
+
+
+def _fields_from_json(descr):
+    if isinstance(descr, str):
+        return descr
+
+    # JSON turns the tuples of a description into lists
+    return [tuple([tuple(name) if isinstance(name, list) else name,
+                   _fields_from_json(field)] + rest)
+            for name, field, *rest in descr]
+
+
+def descr_dtype(descr):
+    """Inverse of :py:func:`dtype_descr`."""
+    return numpy.lib.format.descr_to_dtype(_fields_from_json(descr))
+
+
+class SerNumpyArrayToBuffer(SerNumpyArray):
+    """Sends the array data as an out-of-band buffer, if the message is
+    written with a framing protocol; see :py:mod:`noodles.serial.buffer`.
+    Otherwise, and for arrays of Python objects, this falls back to the
+    in-band encoding of :py:class:`SerNumpyArray`."""
+    def encode(self, obj, make_rec):
+        if obj.dtype.hasobject:
+            return super(SerNumpyArrayToBuffer, self).encode(obj, make_rec)
+
+        fortran = obj.flags.f_contiguous and not obj.flags.c_contiguous
+        data = obj.T if fortran else numpy.ascontiguousarray(obj)
+        # a memoryview can't be made of every dtype (datetime64, for one)
+        index = add_buffer(data.reshape(-1).view(numpy.uint8))
+        if index is None:
+            return super(SerNumpyArrayToBuffer, self).encode(obj, make_rec)
+
+        return make_rec({
+            'dtype': dtype_descr(obj.dtype),
+            'shape': list(obj.shape),
+            'fortran': fortran,
+            'buffer': index})
+
+    def decode(self, cls, data):
+        if not isinstance(data, dict):
+            return super(SerNumpyArrayToBuffer, self).decode(cls, data)
+
+        a = numpy.frombuffer(get_buffer(data['buffer']),
+                             dtype=descr_dtype(data['dtype']))
+        if data['fortran']:
+            return a.reshape(data['shape'][::-1]).T
+
+        return a.reshape(data['shape'])
+
+
+class SerNumpyArrayToSharedMemory(SerNumpyArrayToBuffer):
+    """Copies the array to a shared memory segment, and only sends the name
+    of the segment. The receiving side maps the segment without copying;
+    see :py:mod:`noodles.serial.shared_memory`. This only works if sender
+    and receiver run on the same host. Arrays of Python objects, and arrays
+    encoded in a :py:func:`~noodles.serial.shared_memory.no_segments`
+    context, are encoded as in
+    :py:class:`SerNumpyArrayToBuffer`."""
+    def encode(self, obj, make_rec):
+        if obj.dtype.hasobject or not segments_enabled():
+            return super(SerNumpyArrayToSharedMemory, self).encode(
+                obj, make_rec)
+
+        fortran = obj.flags.f_contiguous and not obj.flags.c_contiguous
+        segment = create_segment(obj.nbytes)
+        target = numpy.ndarray(obj.shape, dtype=obj.dtype,
+                               buffer=segment.buf,
+                               order='F' if fortran else 'C')
+        target[...] = obj
+        del target
+        segment.close()
+
+        return make_rec({
+            'dtype': dtype_descr(obj.dtype),
+            'shape': list(obj.shape),
+            'fortran': fortran,
+            'segment': segment.name})
+
+    def decode(self, cls, data):
+        if not isinstance(data, dict) or 'segment' not in data:
+            return super(SerNumpyArrayToSharedMemory, self).decode(cls, data)
+
+        dtype = descr_dtype(data['dtype'])
+        shape = data['shape']
+        strides = None
+        if data['fortran']:
+            strides = tuple(numpy.cumprod([dtype.itemsize] + shape[:-1]))
+
+        return numpy.asarray(SharedArray(
+            attach_segment(data['segment']), shape, dtype.str, strides,
+            dtype.descr))
+
+
 class SerNumpyArrayToFile(Serialiser):
     def __init__(self, file_prefix=None):
         super(SerNumpyArrayToFile, self).__init__(numpy.ndarray)
@@ -129,6 +230,38 @@ def arrays_to_string(file_prefix=None):
     )
 
 
+def arrays_to_buffers():
+    """Returns a serialisation registry that sends NumPy arrays (and `bytes`)
+    as out-of-band buffers when used with the framed protocol, and as base64
+    strings otherwise."""
+    return Registry(
+        types={
+            numpy.ndarray: SerNumpyArrayToBuffer(),
+            bytes: SerBytes(bytes),
+            bytearray: SerBytes(bytearray)
+        },
+        hooks={
+            '<ufunc>': SerUFunc()
+        },
+        hook_fn=_numpy_hook
+    )
+
+
+def arrays_to_shared_memory():
+    """Returns a serialisation registry that passes NumPy arrays through
+    shared memory segments. Use this with workers on the same host, for
+    instance with :py:func:`noodles.run.process.run_process`."""
+    return Registry(
+        types={
+            numpy.ndarray: SerNumpyArrayToSharedMemory()
+        },
+        hooks={
+            '<ufunc>': SerUFunc()
+        },
+        hook_fn=_numpy_hook
+    )
+
+
 def arrays_to_hdf5(filename="cache.hdf5"):
     return Registry(
         types={
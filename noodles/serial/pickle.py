@@ -1,4 +1,5 @@
 from .registry import (Serialiser, Registry)
+from .buffer import (add_buffer, get_buffer, is_out_of_band)
 
 import base64
 import pickle
@@ -13,9 +14,36 @@ class PickleString(Serialiser):
         return make_rec(data)
 
     def decode(self, cls, data):
+        return pickle.loads(base64.b64decode(data.encode('ascii')))
+
+
+class PickleBuffers(PickleString):
+    """Pickles with protocol 5. Objects that support out-of-band pickling
+    (like NumPy arrays) hand their data to the framing protocol as separate
+    buffers, see :py:mod:`noodles.serial.buffer`. Outside a framed message
+    this gives the same records as :py:class:`PickleString`."""
+    def encode(self, obj, make_rec):
+        if not is_out_of_band():
+            return super(PickleBuffers, self).encode(obj, make_rec)
+
+        buffers = []
+        data = base64.b64encode(pickle.dumps(
+            obj, protocol=5, buffer_callback=buffers.append)).decode('ascii')
+
+        if not buffers:
+            return make_rec(data)
+
+        return make_rec({
+            'pickle': data,
+            'buffers': [add_buffer(b.raw()) for b in buffers]})
+
+    def decode(self, cls, data):
+        if not isinstance(data, dict):
+            return super(PickleBuffers, self).decode(cls, data)
+
         return pickle.loads(
-            base64.b64decode(data.encode('ascii')),
-            protocol=4)
+            base64.b64decode(data['pickle'].encode('ascii')),
+            buffers=[get_buffer(i) for i in data['buffers']])
 
 
 def registry():
@@ -23,7 +51,8 @@ def registry():
 
     This registry can be used to bolt-on other registries and keep the
     pickle as the default. The objects are first pickled to a byte-array,
-    which is subsequently encoded with base64."""
+    which is subsequently encoded with base64. In a framed message, large
+    buffers are sent out-of-band using pickle protocol 5."""
     return Registry(
-        default=PickleString(object)
+        default=PickleBuffers(object)
     )
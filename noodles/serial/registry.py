@@ -1,6 +1,5 @@
-from queue import Queue
-from ..utility import (
-    object_name, look_up, deep_map, inverse_deep_map)
+from collections import deque
+from ..utility import (object_name, look_up)
 
 import noodles
 
@@ -27,6 +26,10 @@ def _chain_fn(a, b):
     return f
 
 
+# types that `Registry.encode` passes unchanged, without recursion
+_plain_types = frozenset([str, int, float, bool, type(None)])
+
+
 class RefObject:
     """Placeholder object to delay decoding a serialised object
     until needed by a worker."""
@@ -54,6 +57,11 @@ class Registry(object):
     overrides and augments the Serialisers present. The `hook` functions
     are being chained, such that the right-hand registry takes precedence.
     The default serialiser is inherrited from the left-hand argument.
+
+    The result of looking up a type is cached, together with the qualified
+    name of the type. The cache is cleared whenever a serialiser is added
+    with `__setitem__`; a Registry created with `+` starts with an empty
+    cache.
     """
     def __init__(self, parent=None, types=None, hooks=None, hook_fn=None,
                  default=None):
@@ -83,6 +91,7 @@ class Registry(object):
             The default fall-back for the new Registry.
         :type default: `Serialiser`"""
         self._sers = parent._sers.copy() if parent else {}
+        self._cache = {}
 
         if types:
             for k, v in types.items():
@@ -122,23 +131,37 @@ class Registry(object):
     def __getitem__(self, key):
         """Searches the most fitting serialiser based on the inheritance tree
         of the given class. We search this tree breadth-first."""
-        q = Queue()  # use a queue for breadth-first decent
+        return self._lookup(key)[1]
+
+    def _lookup(self, key):
+        """Returns the qualified name of class `key` together with its
+        serialiser, from the cache if possible."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
 
-        q.put(key)
-        while not q.empty():
-            cls = q.get()
+        q = deque([key])  # use a queue for breadth-first decent
+        ser = None
+
+        while q:
+            cls = q.popleft()
             m_n = object_name(cls)
 
             if m_n in self._sers:
-                return self._sers[m_n]
+                ser = self._sers[m_n]
+                break
             else:
-                for base in cls.__bases__:
-                    q.put(base)
+                q.extend(cls.__bases__)
+
+        result = self._cache[key] = (object_name(key), ser)
+        return result
 
     def __setitem__(self, cls, value):
         """Sets a new Serialiser for the given class."""
         m_n = object_name(cls)
         self._sers[m_n] = value
+        self._cache.clear()
 
     def encode(self, obj, host=None):
         """Encode an object using the serialisers available
@@ -167,7 +190,10 @@ class Registry(object):
             return obj.rec
 
         hook = self._hook(obj) if self._hook else None
-        typename = hook if hook else object_name(type(obj))
+        if hook:
+            typename, enc = hook, self._sers[hook]
+        else:
+            typename, enc = self._lookup(type(obj))
 
         def make_rec(data, ref=None, files=None):
             rec = {'_noodles': noodles.__version__,
@@ -183,12 +209,7 @@ class Registry(object):
 
             return rec
 
-        if hook:
-            return self._sers[hook].encode(obj, make_rec)
-
-        enc = self[type(obj)]
-        result = enc.encode(obj, make_rec)
-        return result
+        return enc.encode(obj, make_rec)
 
     def decode(self, rec, deref=False):
         """Decode a record to return an object that could be considered
@@ -222,11 +243,57 @@ class Registry(object):
         cls = look_up(typename)
         return self[cls].decode(cls, rec['data'])
 
+    def _encoder(self, host=None):
+        """Returns a function that encodes an object recursively, giving the
+        same result as `deep_map` with `self.encode`. Objects of the types
+        that `encode` passes unchanged are handled in place, without a call
+        to `encode`, so that the object is walked only once."""
+        encode = self.encode
+        plain = _plain_types
+
+        def walk(obj):
+            t = type(obj)
+            if t in plain:
+                return obj
+
+            if t is not dict and t is not list:
+                obj = encode(obj, host)
+
+            if isinstance(obj, dict):
+                return {k: v if type(v) in plain else walk(v)
+                        for k, v in obj.items()}
+
+            if isinstance(obj, (list, tuple)):
+                return [v if type(v) in plain else walk(v) for v in obj]
+
+            return obj
+
+        return walk
+
+    def _decoder(self, deref=False):
+        """Returns a function that decodes a record recursively, giving the
+        same result as `inverse_deep_map` with `self.decode`. As in
+        :py:meth:`_encoder`, plain values are passed without a call."""
+        decode = self.decode
+        plain = _plain_types
+
+        def walk(rec):
+            if isinstance(rec, dict):
+                return decode({k: v if type(v) in plain else walk(v)
+                               for k, v in rec.items()}, deref)
+
+            if isinstance(rec, list):
+                return [v if type(v) in plain else walk(v) for v in rec]
+
+            return rec
+
+        return walk
+
     def deep_encode(self, obj, host=None):
-        return deep_map(lambda o: self.encode(o, host), obj)
+        return self._encoder(host)(obj)
 
     def deep_decode(self, rec, deref=False):
-        return inverse_deep_map(lambda r: self.decode(r, deref), rec)
+        return self._decoder(deref)(rec)
 
     def to_json(self, obj, host=None, indent=None):
         """Recursively encode `obj` and convert it to a JSON string.
@@ -238,13 +305,23 @@ class Registry(object):
             hostname where this object is being encoded.
         :type host: str"""
         if indent:
-            return json.dumps(deep_map(lambda o: self.encode(o, host), obj),
-                              indent=indent)
+            return json.dumps(self._encoder(host)(obj), indent=indent)
         else:
-            return json.dumps(deep_map(lambda o: self.encode(o, host), obj))
+            return json.dumps(self._encoder(host)(obj))
 
     def to_msgpack(self, obj, host=None):
-        return msgpack.packb(deep_map(lambda o: self.encode(o, host), obj))
+        """Recursively encode `obj` and convert it to msgpack. The registry
+        is called from the `default` hook of the packer, only for objects
+        that msgpack doesn't know. With `strict_types`, subclasses of the
+        basic types (including `tuple`) also reach the registry, as they
+        do in `deep_encode`."""
+        def default(o):
+            result = self.encode(o, host)
+            if type(result) is tuple:
+                return list(result)
+            return result
+
+        return msgpack.packb(obj, default=default, strict_types=True)
 
     def from_json(self, data, deref=False):
         """Decode the string from JSON to return the original object (if
@@ -0,0 +1,141 @@
+"""
+Shared memory segments
+======================
+
+When the scheduler and its workers run on the same host, large arrays can be
+passed through `multiprocessing.shared_memory` in stead of through the pipe.
+The sending side copies the data into a new segment, and only sends the name
+of the segment. The receiving side maps the segment, and unlinks its name
+right away: the mapping stays valid for as long as the receiver needs it,
+and the memory is returned to the system once the last mapping is closed.
+
+If a message never reaches its receiver (say, the worker died), the segment
+would stay around. To prevent that, segments created while encoding a job
+are recorded under the key of that job (see :py:func:`segment_owner`), and
+the :py:class:`JobKeeper` calls :py:func:`release_segments` when the job is
+done. Segments created outside of such a context, like the results sent by
+a worker, are released when the process that created them exits. A worker
+only exits once the scheduler has read all of its results.
+
+Segments are unregistered from the `multiprocessing` resource tracker by
+their creator; their lifetime is managed as described above, not by the
+process that happened to create them.
+
+Messages that are only encoded to compute a hash, or to be stored in a job
+database, should not refer to a segment at all; encode them in a
+:py:func:`no_segments` context.
+"""
+
+from contextlib import contextmanager
+import threading
+import atexit
+import ctypes
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+    from multiprocessing import resource_tracker
+    has_shared_memory = True
+except ImportError:
+    has_shared_memory = False
+
+_state = threading.local()
+_segments = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def segment_owner(key):
+    """Segments created within this context are recorded under `key`, to be
+    released with :py:func:`release_segments`."""
+    previous = getattr(_state, 'owner', None)
+    _state.owner = key
+    try:
+        yield
+    finally:
+        _state.owner = previous
+
+
+@contextmanager
+def no_segments():
+    """Within this context, serialisers don't create shared memory
+    segments, but store their data in another way."""
+    previous = getattr(_state, 'disabled', False)
+    _state.disabled = True
+    try:
+        yield
+    finally:
+        _state.disabled = previous
+
+
+def segments_enabled():
+    """Returns False inside a :py:func:`no_segments` context."""
+    return has_shared_memory and not getattr(_state, 'disabled', False)
+
+
+def release_segments(key):
+    """Unlink any segments recorded under `key` that were not yet unlinked
+    by their receiver."""
+    if not _segments:
+        return
+
+    with _lock:
+        names = _segments.pop(key, ())
+
+    for name in names:
+        try:
+            segment = SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+
+        segment.close()
+        segment.unlink()
+
+
+def _untrack(segment):
+    resource_tracker.unregister(segment._name, 'shared_memory')
+
+
+def create_segment(size):
+    """Create a new shared memory segment of at least `size` bytes."""
+    segment = SharedMemory(create=True, size=max(size, 1))
+    _untrack(segment)
+
+    # segments without an owner are recorded under `None`, and released
+    # when this process exits.
+    owner = getattr(_state, 'owner', None)
+    with _lock:
+        _segments.setdefault(owner, []).append(segment.name)
+
+    return segment
+
+
+atexit.register(release_segments, None)
+
+
+def attach_segment(name):
+    """Map the segment `name` and unlink it, so that it is freed as soon as
+    the returned object (and any other mapping) is closed."""
+    segment = SharedMemory(name=name)
+    segment.unlink()
+    return segment
+
+
+class SharedArray:
+    """Exposes (part of) a shared memory segment through the NumPy array
+    interface. Passing this to `numpy.asarray` gives an array that keeps the
+    segment mapped for as long as it lives. The `descr` gives the fields of
+    a structured type, in the form of `numpy.dtype.descr`."""
+    def __init__(self, segment, shape, typestr, strides=None, descr=None):
+        self.segment = segment
+        self._pointer = ctypes.c_char.from_buffer(segment.buf)
+        self.__array_interface__ = {
+            'shape': tuple(shape),
+            'typestr': typestr,
+            'descr': descr or [('', typestr)],
+            'strides': strides,
+            'data': (ctypes.addressof(self._pointer), False),
+            'version': 3}
+
+    def __del__(self):
+        del self._pointer
+        self.segment.close()
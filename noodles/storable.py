@@ -23,6 +23,10 @@ def from_dict(cls, **kwargs):
 
 
 class Storable:
+    # deep-copying may turn a Storable into a promise, so we do so even
+    # for functions with `pass_by='readonly'`.
+    __always_copy__ = True
+
     def as_dict(self):
         """Converts the object to a `dict` containing the members
         of the object by name.
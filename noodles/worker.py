@@ -9,12 +9,20 @@ scheduler to dispatch jobs remotely, using
 There are several modes in which the worker generates results. For all
 of these modes, the rule is **one object per line**.
 
-:batch-mode: Give a single job as a JSON string on the command line. The
-    result is printed to stdout, again as a JSON object.
+:batch-mode: Read jobs from a spool file, run them, and write the results
+    to an output file. This is meant for job arrays on a cluster queue,
+    where every element of the array picks up its own chunk of jobs.
 
     .. code-block:: bash
 
-        > python3.5 -m noodles.worker -batch "{'job': ...}"
+        > python3.5 -m noodles.worker batch -registry <registry> \
+            -input jobs-{index}.in -output jobs-{index}.out
+
+    A `{index}` in the file names is replaced by the value of `-index`,
+    which defaults to the job-array index set by Slurm, PBS, SGE or LSF.
+    The results are first written to `<output>.part`, and renamed once all
+    jobs are done, so that an output file is always complete. The file
+    format is set with `-msgpack` or `-framed`, as in online mode.
 
 :online-mode: Recieve worker commands as JSON objects through stdin and
     send out results to stdout.
@@ -22,12 +30,21 @@ of these modes, the rule is **one object per line**.
     .. code-block:: bash
 
         > python3.5 -m noodles.worker -online [-use <worker>]
+
+    With `-n N` the worker runs up to N jobs at the same time on a pool of
+    threads, writing back results as they complete.
+
+    With `-msgpack` the messages are MessagePack encoded. With `-framed`
+    the binary framing protocol of :py:mod:`noodles.run.remote.io` is used,
+    sending large buffers (NumPy arrays, `bytes`) as raw data after each
+    message.
 """
 
 import argparse
 import sys
 import uuid
 from contextlib import redirect_stdout
+from threading import (Thread, Lock)
 
 import os
 from .utility import (look_up)
@@ -46,73 +63,171 @@ from .run.messages import (
 
 from .run.remote.io import (
     MsgPackObjectReader, MsgPackObjectWriter,
-    JSONObjectReader, JSONObjectWriter)
+    JSONObjectReader, JSONObjectWriter,
+    FramedObjectReader, FramedObjectWriter)
+
+
+_array_index_variables = [
+    'SLURM_ARRAY_TASK_ID', 'PBS_ARRAYID', 'PBS_ARRAY_INDEX', 'SGE_TASK_ID',
+    'LSB_JOBINDEX']
+
+
+def _array_index():
+    """The index of this job in a job array, as given by the queueing
+    system, or `None`."""
+    for var in _array_index_variables:
+        if var in os.environ:
+            return os.environ[var]
+
+    return None
 
 
 def run_batch_mode(args):
-    print("Batch mode is not yet implemented")
+    index = args.index if args.index is not None else _array_index()
+    input_file = args.input.format(index=index)
+    output_file = args.output.format(index=index)
+    binary = 'b' if args.framed or args.msgpack else ''
+
+    registry = look_up(args.registry)()
+
+    with open(input_file, 'r' + binary) as fi, \
+            open(output_file + '.part', 'w' + binary) as fo:
+        if args.framed:
+            input_stream = FramedObjectReader(registry, fi, deref=True)
+            output_stream = FramedObjectWriter(registry, fo, host=args.name)
+        elif args.msgpack:
+            input_stream = MsgPackObjectReader(registry, fi, deref=True)
+            output_stream = MsgPackObjectWriter(registry, fo, host=args.name)
+        else:
+            input_stream = JSONObjectReader(registry, fi, deref=True)
+            output_stream = JSONObjectWriter(registry, fo, host=args.name)
+
+        _run_jobs(args, input_stream, output_stream)
+
+    os.replace(output_file + '.part', output_file)
+
+
+def _job_messages(input_stream):
+    """Filter the input stream for jobs, giving (key, job) pairs."""
+    for msg in input_stream:
+        if isinstance(msg, JobMessage):
+            yield tuple(msg)
+        elif isinstance(msg, tuple):
+            yield msg
+
+
+def _run_job(args, key, job):
+    """Run a single job; output from the job is sent to stderr."""
+    if args.jobdirs:
+        # make a directory
+        os.mkdir("noodles-{0}".format(key))
+        # enter it
+        os.chdir("noodles-{0}".format(key))
+
+    if args.verbose:
+        print("worker: ",
+              job.foo.__name__,
+              job.bound_args.args,
+              job.bound_args.kwargs,
+              file=sys.stderr, flush=True)
+
+    with redirect_stdout(sys.stderr):
+        result = run_job(key, job)
+
+    if args.verbose:
+        print("result: ", result, file=sys.stderr, flush=True)
+
+    if args.jobdirs:
+        # parent directory
+        os.chdir("..")
+
+    return result
+
+
+def _run_threaded(args, jobs, output_stream):
+    """Run jobs on `args.n` threads. Reading a job and writing a result are
+    each guarded by a lock; results are written as soon as they are done.
+    The standard output is redirected once for the whole run, since
+    `redirect_stdout` replaces `sys.stdout` for all threads."""
+    input_lock = Lock()
+    output_lock = Lock()
+
+    def work():
+        while True:
+            with input_lock:
+                item = next(jobs, None)
+
+            if item is None:
+                return
+
+            key, job = item
+            result = _run_job(args, key, job)
+
+            with output_lock:
+                output_stream.send(result)
+
+    with redirect_stdout(sys.stderr):
+        threads = [Thread(target=work) for _ in range(args.n)]
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
 
 
 def run_online_mode(args):
-    if args.n == 1:
-        registry = look_up(args.registry)()
-        finish = None
-
-        if args.msgpack:
-            newin = os.fdopen(sys.stdin.fileno(), 'rb', buffering=0)
-            input_stream = MsgPackObjectReader(
-                registry, newin, deref=True)
-            output_stream = MsgPackObjectWriter(
-                registry, sys.stdout.buffer, host=args.name)
-        else:
-            input_stream = JSONObjectReader(
-                registry, sys.stdin, deref=True)
-            output_stream = JSONObjectWriter(
-                registry, sys.stdout, host=args.name)
+    registry = look_up(args.registry)()
 
-        # run the init function if it is given
-        if args.init:
-            with redirect_stdout(sys.stderr):
-                look_up(args.init)()
+    if args.framed:
+        input_stream = FramedObjectReader(
+            registry, sys.stdin.buffer, deref=True)
+        output_stream = FramedObjectWriter(
+            registry, sys.stdout.buffer, host=args.name)
+    elif args.msgpack:
+        newin = os.fdopen(sys.stdin.fileno(), 'rb', buffering=0)
+        input_stream = MsgPackObjectReader(
+            registry, newin, deref=True)
+        output_stream = MsgPackObjectWriter(
+            registry, sys.stdout.buffer, host=args.name)
+    else:
+        input_stream = JSONObjectReader(
+            registry, sys.stdin, deref=True)
+        output_stream = JSONObjectWriter(
+            registry, sys.stdout, host=args.name)
 
-        if args.finish:
-            finish = look_up(args.finish)
+    _run_jobs(args, input_stream, output_stream)
 
-        for msg in input_stream:
-            if isinstance(msg, JobMessage):
-                key, job = msg
-            elif isinstance(msg, tuple):
-                key, job = msg
-            else:
-                continue
 
-            if args.jobdirs:
-                # make a directory
-                os.mkdir("noodles-{0}".format(key.hex))
-                # enter it
-                os.chdir("noodles-{0}".format(key.hex))
+def _run_jobs(args, input_stream, output_stream):
+    """Run the jobs from `input_stream`, sending results to `output_stream`,
+    with the init and finish functions given in `args`."""
+    if args.n > 1 and args.jobdirs:
+        print("The -jobdirs option changes the working directory, which "
+              "is not possible with more than one thread.",
+              file=sys.stderr, flush=True)
+        sys.exit(1)
 
-            if args.verbose:
-                print("worker: ",
-                      job.foo.__name__,
-                      job.bound_args.args,
-                      job.bound_args.kwargs,
-                      file=sys.stderr, flush=True)
+    finish = None
 
-            with redirect_stdout(sys.stderr):
-                result = run_job(key, job)
+    # run the init function if it is given
+    if args.init:
+        with redirect_stdout(sys.stderr):
+            look_up(args.init)()
 
-            if args.verbose:
-                print("result: ", result, file=sys.stderr, flush=True)
+    if args.finish:
+        finish = look_up(args.finish)
 
-            if args.jobdirs:
-                # parent directory
-                os.chdir("..")
+    jobs = _job_messages(input_stream)
 
-            output_stream.send(result)
+    if args.n > 1:
+        _run_threaded(args, jobs, output_stream)
 
-        if finish:
-            finish()
+    else:
+        for key, job in jobs:
+            output_stream.send(_run_job(args, key, job))
+
+    if finish:
+        finish()
 
 
 if __name__ == "__main__":
@@ -132,47 +247,65 @@ if __name__ == "__main__":
         description="Noodles can execute jobs one at a time, or "
                     "streaming on stdin/stdout.")
 
-    batch_parser = subparsers.add_parser(
-        "batch", help="run a single job")
-    batch_parser.add_argument(
-        "-persist",
-        help="keep going until a value, not another workflow, comes out.",
-        default=False, action='store_true')
-    batch_parser.set_defaults(func=run_batch_mode)
-
-    online_parser = subparsers.add_parser(
-        "online", help="stream jobs from standard input.")
-    online_parser.add_argument(
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
         "-registry", type=str,
         help="the serial registry")
-    online_parser.add_argument(
+    common.add_argument(
         "-n", type=int,
         help="the number of threads.", default=1)
-    online_parser.add_argument(
+    common.add_argument(
         "-verbose",
         help="output information to stderr for debugging",
         default=False, action='store_true')
-    online_parser.add_argument(
+    common.add_argument(
         "-jobdirs",
         help="create a directory for each job to run in",
         default=False, action='store_true')
-    online_parser.add_argument(
+    common.add_argument(
         "-msgpack",
         help="use MessagePack for serialisation.",
         default=False, action='store_true')
-    online_parser.add_argument(
+    common.add_argument(
+        "-framed",
+        help="use the binary framing protocol, sending large buffers "
+             "out-of-band.",
+        default=False, action='store_true')
+    common.add_argument(
         "-name", type=str,
         help="worker identity",
         default="worker-" + str(uuid.uuid4()))
-    online_parser.add_argument(
+    common.add_argument(
         "-init", type=str,
         help="an init function will be send before other jobs",
         default=None)
-    online_parser.add_argument(
+    common.add_argument(
         "-finish", type=str,
         help="a finish function will be send before other jobs",
         default=None)
 
+    batch_parser = subparsers.add_parser(
+        "batch", parents=[common],
+        help="run the jobs in a file, writing results to another file.")
+    batch_parser.add_argument(
+        "-input", type=str, required=True,
+        help="the file to read jobs from.")
+    batch_parser.add_argument(
+        "-output", type=str, required=True,
+        help="the file to write results to.")
+    batch_parser.add_argument(
+        "-index", type=str, default=None,
+        help="value for {index} in the file names; by default the "
+             "job-array index given by the queueing system.")
+    batch_parser.add_argument(
+        "-persist",
+        help="keep going until a value, not another workflow, comes out.",
+        default=False, action='store_true')
+    batch_parser.set_defaults(func=run_batch_mode)
+
+    online_parser = subparsers.add_parser(
+        "online", parents=[common],
+        help="stream jobs from standard input.")
     online_parser.set_defaults(func=run_online_mode)
 
     args = parser.parse_args()
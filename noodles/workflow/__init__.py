@@ -1,13 +1,18 @@
-from .arguments import (Empty, ArgumentKind, Argument, ArgumentAddress)
+from .arguments import (Empty, ArgumentKind, Argument, ArgumentAddress,
+                        intern_address)
 from .model import (
     Workflow, FunctionNode, NodeData, get_workflow, is_workflow,
-    is_node_ready)
+    is_node_ready, count_pending)
 from .mutations import (reset_workflow, insert_result)
-from .create import (from_call)
-from .graphs import (invert_links)
+from .create import (from_call, copy_argument, is_immutable)
+from .graphs import (invert_links, upward_rank)
+from .compact import (CompactWorkflow, compact_workflow)
 
-__all__ = ['invert_links', 'from_call',
+__all__ = ['invert_links', 'upward_rank',
+           'from_call', 'copy_argument', 'is_immutable',
            'Workflow', 'FunctionNode', 'NodeData',
            'get_workflow', 'is_workflow', 'reset_workflow',
+           'is_node_ready', 'count_pending',
            'insert_result', 'Empty',
-           'Argument', 'ArgumentAddress', 'ArgumentKind']
+           'Argument', 'ArgumentAddress', 'ArgumentKind', 'intern_address',
+           'CompactWorkflow', 'compact_workflow']
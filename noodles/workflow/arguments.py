@@ -2,6 +2,8 @@ from collections import namedtuple
 from enum import Enum
 from itertools import repeat
 from inspect import Parameter, signature
+from types import FunctionType
+from weakref import WeakKeyDictionary
 
 Empty = Parameter.empty
 
@@ -17,8 +19,93 @@ Argument = namedtuple(
     'Argument',
     ['address', 'value'])
 
+_address_table = {}
 
-def serialize_arguments(bound_args):
+
+def intern_address(address):
+    """Returns the canonical instance of an `ArgumentAddress`. Workflows
+    contain the same few addresses over and over; by sharing a single
+    instance for each distinct address we save a tuple per link."""
+    return _address_table.setdefault(address, address)
+
+
+def make_address(kind, name, key):
+    """Create an interned `ArgumentAddress`."""
+    try:
+        return _address_table[(kind, name, key)]
+    except KeyError:
+        return intern_address(ArgumentAddress(kind, name, key))
+
+
+class ArgumentSpec:
+    """Signature information of a function, computed once and shared by all
+    calls to that function.
+
+    .. py:attribute:: signature
+
+        The :py:class:`inspect.Signature` of the function.
+
+    .. py:attribute:: variadic
+
+        Name of the variadic (`*args`) parameter, or `None`.
+
+    .. py:attribute:: keyword
+
+        Name of the variadic keyword (`**kwargs`) parameter, or `None`.
+
+    .. py:attribute:: parameters
+
+        A tuple of `(name, kind, address)` triples, one for each parameter.
+        The `address` is the interned `ArgumentAddress` for a regular
+        parameter, and `None` for variadic parameters.
+    """
+    def __init__(self, f):
+        self.signature = signature(f)
+        self.variadic = None
+        self.keyword = None
+        parameters = []
+
+        for p in self.signature.parameters.values():
+            if p.kind == Parameter.VAR_POSITIONAL:
+                self.variadic = p.name
+                parameters.append((p.name, ArgumentKind.variadic, None))
+            elif p.kind == Parameter.VAR_KEYWORD:
+                self.keyword = p.name
+                parameters.append((p.name, ArgumentKind.keyword, None))
+            else:
+                parameters.append((
+                    p.name, ArgumentKind.regular,
+                    make_address(ArgumentKind.regular, p.name, None)))
+
+        self.parameters = tuple(parameters)
+
+
+_argument_specs = WeakKeyDictionary()
+
+
+def argument_spec(f):
+    """Get the :py:class:`ArgumentSpec` of `f`. For functions and classes the
+    spec is cached, by the object itself, so that a subclass doesn't get the
+    spec of its parent. Other callables (bound methods, builtins) get a fresh
+    spec every time."""
+    cacheable = isinstance(f, (FunctionType, type))
+    if cacheable:
+        try:
+            return _argument_specs[f]
+        except (KeyError, TypeError):
+            pass
+
+    spec = ArgumentSpec(f)
+    if cacheable:
+        try:
+            _argument_specs[f] = spec
+        except TypeError:
+            pass
+
+    return spec
+
+
+def serialize_arguments(bound_args, spec=None):
     """
     Generator that takes the bound_args output of signature().bind and iterates
     over all the arguments, returning reproducable addresses of each
@@ -37,23 +124,40 @@ def serialize_arguments(bound_args):
         `inspect` module.
     :type bound_args: BoundArguments
 
+    :param spec:
+        The :py:class:`ArgumentSpec` matching `bound_args`; if given, we
+        use the precomputed addresses in stead of walking the signature.
+    :type spec: ArgumentSpec
+
     :returns:
         Generates (kind, name, key)-tuples representing an address into the
         argument structure.
     :rtype: Iterator[ArgumentAddress]
     """
+    if spec is not None:
+        for name, kind, address in spec.parameters:
+            if address is not None:
+                yield address
+            elif kind == ArgumentKind.variadic:
+                for i in range(len(bound_args.arguments[name])):
+                    yield make_address(kind, name, i)
+            else:
+                for k in bound_args.arguments[name].keys():
+                    yield make_address(kind, name, k)
+        return
+
     for p in bound_args.signature.parameters.values():
         if p.kind == Parameter.VAR_POSITIONAL:
             for i, _ in enumerate(bound_args.arguments[p.name]):
-                yield ArgumentAddress(ArgumentKind.variadic, p.name, i)
+                yield make_address(ArgumentKind.variadic, p.name, i)
             continue
 
         if p.kind == Parameter.VAR_KEYWORD:
             for k in bound_args.arguments[p.name].keys():
-                yield ArgumentAddress(ArgumentKind.keyword, p.name, k)
+                yield make_address(ArgumentKind.keyword, p.name, k)
             continue
 
-        yield ArgumentAddress(ArgumentKind.regular, p.name, None)
+        yield make_address(ArgumentKind.regular, p.name, None)
 
 
 def ref_argument(bound_args, address):
@@ -102,28 +206,23 @@ def format_address(address):
     return "{0}[{1}]".format(address.name, address.key)
 
 
-def get_arguments(bound_args):
+def get_arguments(bound_args, spec=None):
     return [(address, ref_argument(bound_args, address))
-            for address in serialize_arguments(bound_args)
+            for address in serialize_arguments(bound_args, spec)
             if ref_argument(bound_args, address) is not Empty]
 
 
-def bind_arguments(f, arguments):
-    bound_args = signature(f).bind_partial()
-
-    variadic = next((x.name
-                     for x in bound_args.signature.parameters.values()
-                     if x.kind == Parameter.VAR_POSITIONAL), None)
+def bind_arguments(f, arguments, spec=None):
+    if spec is None:
+        spec = argument_spec(f)
 
-    if variadic:
-        bound_args.arguments[variadic] = []
+    bound_args = spec.signature.bind_partial()
 
-    keyword = next((x.name
-                    for x in bound_args.signature.parameters.values()
-                    if x.kind == Parameter.VAR_KEYWORD), None)
+    if spec.variadic:
+        bound_args.arguments[spec.variadic] = []
 
-    if keyword:
-        bound_args.arguments[keyword] = {}
+    if spec.keyword:
+        bound_args.arguments[spec.keyword] = {}
 
     for address, value in arguments:
         set_argument(bound_args, address, value)
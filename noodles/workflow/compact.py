@@ -0,0 +1,161 @@
+"""
+Compact workflow layout
+=======================
+
+The default :py:class:`Workflow` keeps its nodes in a `dict` keyed by
+`id(node)`, and its links as a `dict` of `set` objects. This is convenient
+while building a workflow, but for very large graphs (think of a parameter
+sweep with a million calls) the overhead of all these containers dominates.
+
+A :py:class:`CompactWorkflow` stores the same graph with dense integer node
+ids. The nodes live in a single `list`, and the links are stored in CSR form:
+an array of offsets into a flat array of target ids, next to a flat list of
+(interned) :py:class:`ArgumentAddress` objects. Both are exposed through
+read-only mappings, so that code which does `wf.nodes[n]` or iterates over
+`wf.links[n]` works unchanged on either layout.
+
+A compact workflow is created from a normal one with
+:py:func:`compact_workflow`, or by passing `compact=True` to
+:py:func:`from_call`. It is meant to be built once, at the end of
+construction, and handed to the scheduler as is.
+"""
+
+from array import array
+from collections.abc import Mapping
+
+from .model import Workflow
+from .arguments import intern_address
+
+
+class NodeList(Mapping):
+    """Read-only mapping from dense node ids to nodes, backed by a list."""
+    __slots__ = ('_nodes',)
+
+    def __init__(self, nodes):
+        self._nodes = nodes
+
+    def __getitem__(self, i):
+        if i < 0:
+            raise KeyError(i)
+        try:
+            return self._nodes[i]
+        except (IndexError, TypeError):
+            raise KeyError(i)
+
+    def __contains__(self, i):
+        return isinstance(i, int) and 0 <= i < len(self._nodes)
+
+    def __iter__(self):
+        return iter(range(len(self._nodes)))
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def values(self):
+        return list(self._nodes)
+
+
+class Adjacency(Mapping):
+    """Read-only mapping from dense node ids to a list of entries, stored in
+    CSR form. The entries of node `i` are found between `offsets[i]` and
+    `offsets[i+1]` in the flat `targets` array. If `labels` is given, each
+    entry is a `(target, label)` tuple, otherwise it is the bare target."""
+    __slots__ = ('offsets', 'targets', 'labels')
+
+    def __init__(self, offsets, targets, labels=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.labels = labels
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.offsets) - 1:
+            raise KeyError(i)
+
+        a, b = self.offsets[i], self.offsets[i + 1]
+        if self.labels is None:
+            return self.targets[a:b].tolist()
+
+        return list(zip(self.targets[a:b], self.labels[a:b]))
+
+    def __iter__(self):
+        return iter(range(len(self.offsets) - 1))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class CompactWorkflow(Workflow):
+    """Array backed workflow; see the module documentation.
+
+    .. py:attribute:: nodes
+
+        A :py:class:`NodeList`, mapping dense integer ids to nodes.
+
+    .. py:attribute:: links
+
+        An :py:class:`Adjacency`, giving a list of `(node, address)` links
+        from each node.
+    """
+    def __init__(self, root, nodes, offsets, targets, addresses):
+        super(CompactWorkflow, self).__init__(
+            root, NodeList(nodes), Adjacency(offsets, targets, addresses))
+
+    def _merge_items(self):
+        # dense ids are only unique within this workflow; when merging
+        # into another workflow we go back to keys by `id(node)`.
+        nodes = self.nodes._nodes
+        for i, node in enumerate(nodes):
+            yield id(node), node, [(id(nodes[t]), address)
+                                   for t, address in self.links[i]]
+
+    def _merge_root(self):
+        return id(self.root_node)
+
+    def create_inverse_links(self):
+        n = len(self.nodes)
+        count = array('q', bytes(8 * (n + 1)))
+        for t in self.links.targets:
+            count[t + 1] += 1
+
+        for i in range(n):
+            count[i + 1] += count[i]
+
+        offsets = array('q', count)
+        sources = array('q', bytes(8 * len(self.links.targets)))
+        for i in range(n):
+            for t in self.links.targets[
+                    self.links.offsets[i]:self.links.offsets[i + 1]]:
+                sources[count[t]] = i
+                count[t] += 1
+
+        self._inverse_links = Adjacency(offsets, sources)
+
+
+def compact_workflow(wf):
+    """Convert a workflow to the compact layout. This takes time linear in the
+    size of the workflow. The nodes are shared with the original workflow.
+
+    :param wf:
+        The workflow to convert.
+    :type wf: Workflow
+
+    :returns:
+        A new workflow, or `wf` itself if it was already compact.
+    :rtype: CompactWorkflow
+    """
+    if isinstance(wf, CompactWorkflow):
+        return wf
+
+    index = {k: i for i, k in enumerate(wf.nodes)}
+    nodes = list(wf.nodes.values())
+    offsets = array('q', [0])
+    targets = array('q')
+    addresses = []
+
+    for k in wf.nodes:
+        for tgt, address in wf.links.get(k, ()):
+            targets.append(index[tgt])
+            addresses.append(intern_address(address))
+        offsets.append(len(targets))
+
+    return CompactWorkflow(index[wf.root], nodes, offsets, targets, addresses)
@@ -1,13 +1,74 @@
-from inspect import (signature, Parameter)
 from .model import (
     Workflow, FunctionNode, get_workflow, is_workflow)
+from .compact import (compact_workflow)
 from .arguments import (
-    ref_argument, serialize_arguments, set_argument, Empty)
+    ref_argument, serialize_arguments, set_argument, argument_spec, Empty)
 
 from copy import deepcopy
+import sys
 
+_immutable_types = (
+    type(None), bool, int, float, complex, str, bytes, range,
+    type(Ellipsis), type(NotImplemented))
 
-def from_call(foo, args, kwargs, hints, call_by_value=True):
+
+def is_immutable(obj):
+    """Returns True if `obj` is known to be immutable, so that it can be
+    passed to a scheduled function without copying. These are the scalar
+    types, `str`, `bytes`, and `tuple` or `frozenset` instances containing
+    only immutable objects. A NumPy array counts as immutable if it is not
+    writeable, and neither is any array it is a view of."""
+    if type(obj) in _immutable_types:
+        return True
+
+    if type(obj) in (tuple, frozenset):
+        return all(is_immutable(x) for x in obj)
+
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and type(obj) is numpy.ndarray:
+        if obj.dtype.hasobject:
+            return False
+
+        while isinstance(obj, numpy.ndarray):
+            if obj.flags.writeable:
+                return False
+            obj = obj.base
+
+        return obj is None or type(obj) is bytes
+
+    return False
+
+
+def copy_argument(obj, pass_by='value'):
+    """Copy an argument to a scheduled function, so that changes the user
+    makes to `obj` after the call don't end up in the workflow.
+
+    :param obj:
+        The argument.
+
+    :param pass_by:
+        If `'value'`, every argument that is not known to be immutable is
+        deep-copied. If `'readonly'`, the function promises not to modify its
+        arguments, and the caller promises not to modify them before the
+        workflow has run, so we skip the copy. Classes that set the
+        class attribute `__always_copy__` to `True`
+        (:py:class:`Storable`, :py:class:`Escalator`) are still passed
+        through `deepcopy`, as that may turn them into promises.
+
+    :returns:
+        The argument to store in the workflow.
+    """
+    if is_immutable(obj):
+        return obj
+
+    if pass_by == 'readonly' and \
+            not getattr(type(obj), '__always_copy__', False):
+        return obj
+
+    return deepcopy(obj)
+
+
+def from_call(foo, args, kwargs, hints, call_by_value=True, compact=False):
     """Takes a function and a set of arguments it needs to run on. Returns a newly
     constructed workflow representing the promised value from the evaluation of
     the function with said arguments.
@@ -26,13 +87,16 @@ def from_call(foo, args, kwargs, hints, call_by_value=True):
     evaluating a workflow.
 
     If an argument is a promised value, the workflow representing the value
-    is added to the new workflow. First all the nodes in the original workflow,
-    if not already present in the new workflow from an earlier argument,
-    are copied to the new workflow, and a new entry is made into the link
-    dictionary. Then the links in the old workflow are also added to the
+    is added to the new workflow. Rather than copying all the nodes and links
+    of the argument workflow, the new workflow keeps a reference to it, and
+    a link from its root to the argument address (see
+    :py:meth:`Workflow.merge`). When the `nodes` and `links` of the new
+    workflow are first needed, all the nodes of the original workflows
+    are collected, each only once, and their links are added to the
     link dictionary. Since the link dictionary points from nodes to a
     :py:class:`set` of :py:class:`ArgumentAddress` es, no links are
-    duplicated.
+    duplicated. Building a workflow of `n` nodes this way takes `O(n)` time,
+    regardless of its depth.
 
     In the ``bound_args`` object the promised value is replaced by the
     ``Empty`` object, so that we can see which arguments still have to be
@@ -54,20 +118,30 @@ def from_call(foo, args, kwargs, hints, call_by_value=True):
 
     :param hints:
         Hints that can be passed to the scheduler on where or how
-        to schedule this job.
+        to schedule this job. The hint `pass_by='readonly'` disables
+        deep-copying of the arguments (see :py:func:`copy_argument`).
+
+    :param call_by_value:
+        Copy every argument that is not a promise, using
+        :py:func:`copy_argument`.
+
+    :param compact:
+        Return the workflow in the array backed layout of
+        :py:class:`CompactWorkflow`. Compacting takes time linear in the
+        size of the workflow, so this is best done only for the last call
+        that closes a large workflow, e.g. a `gather` over a sweep.
 
     :returns:
         New workflow.
     :rtype: Workflow
     """
-    # create the bound_args object
-    bound_args = signature(foo).bind(*args, **kwargs)
+    # create the bound_args object; the signature of `foo` is cached
+    spec = argument_spec(foo)
+    bound_args = spec.signature.bind(*args, **kwargs)
     bound_args.apply_defaults()
 
     # get the name of the variadic argument if there is one
-    variadic = next((x.name
-                     for x in bound_args.signature.parameters.values()
-                     if x.kind == Parameter.VAR_POSITIONAL), None)
+    variadic = spec.variadic
 
     # *HACK*
     # the BoundArguments class uses a tuple to store the
@@ -81,37 +155,37 @@ def from_call(foo, args, kwargs, hints, call_by_value=True):
                 list(bound_args.arguments[variadic])
 
     # create the node and initialise hash key
-    node = FunctionNode(foo, bound_args, hints)
+    node = FunctionNode(foo, bound_args, hints, spec=spec)
 
     # setup the new workflow
     root = id(node)
-    nodes = {root: node}
-    links = {root: set()}
+    parts = []
+    pass_by = hints.get('pass_by', 'value') if hints else 'value'
 
     # walk the arguments to the function call
-    for address in serialize_arguments(node.bound_args):
+    for address in serialize_arguments(node.bound_args, spec):
         arg = ref_argument(node.bound_args, address)
 
         # the argument may still become a workflow if it
         # is a Storable and it contains a promised object
         if not is_workflow(arg) and call_by_value:
-            arg = deepcopy(arg)
+            arg = copy_argument(arg, pass_by)
 
         # if still not a workflow, we have a plain value!
         if not is_workflow(arg):
             set_argument(node.bound_args, address, arg)
             continue
 
-        # merge the argument workflow into the new workflow
-        workflow = get_workflow(arg)
+        # link the argument workflow into the new workflow
         set_argument(node.bound_args, address, Empty)
-        for n in workflow.nodes:
-            if n not in nodes:
-                nodes[n] = workflow.nodes[n]
-                links[n] = set()
+        parts.append((get_workflow(arg), address))
 
-            links[n].update(workflow.links[n])
+    if parts:
+        workflow = Workflow.merge(root, node, parts)
+    else:
+        workflow = Workflow(root, {root: node}, {root: set()})
 
-        links[workflow.root].add((root, address))
+    if compact:
+        return compact_workflow(workflow)
 
-    return Workflow(root, nodes, links)
+    return workflow
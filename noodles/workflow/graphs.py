@@ -42,3 +42,49 @@ def invert_links(links):
     :rtype: Mapping[NodeId, Mapping[(ArgumentType, [int|str]), NodeId]]
     """
     return {node: find_links_to(links, node) for node in links}
+
+
+def upward_rank(links, cost, offset=0):
+    """
+    Computes the upward rank of every node: its own cost plus the largest
+    rank of the nodes that take its result. This is the length of the
+    longest path from the node to the root. Running the nodes with the
+    highest rank first keeps the critical path moving.
+
+    :param links:
+        forward links of a call-graph.
+    :type links: Mapping[NodeId, Set[(NodeId, ArgumentType, [int|str]])]
+
+    :param cost:
+        function giving the cost of a node.
+    :type cost: Callable[[NodeId], float]
+
+    :param offset:
+        rank of whatever takes the result of nodes without links; used for
+        a workflow that stands in for a node of another workflow.
+
+    :returns:
+        rank of each node.
+    :rtype: Mapping[NodeId, float]
+    """
+    targets = {n: {tgt for tgt, _ in v} for n, v in links.items()}
+    sources = {n: [] for n in links}
+    for n, v in targets.items():
+        for tgt in v:
+            sources[tgt].append(n)
+
+    # visit nodes after all of their targets, starting at the root
+    waiting = {n: len(v) for n, v in targets.items()}
+    todo = [n for n, k in waiting.items() if k == 0]
+    rank = {}
+
+    while todo:
+        n = todo.pop()
+        rank[n] = cost(n) + max((rank[tgt] for tgt in targets[n]),
+                                default=offset)
+        for src in sources[n]:
+            waiting[src] -= 1
+            if waiting[src] == 0:
+                todo.append(src)
+
+    return rank
@@ -1,7 +1,7 @@
 from collections import namedtuple
 from ..utility import (unwrap)
 from .arguments import (bind_arguments, get_arguments, ref_argument,
-                        serialize_arguments, Empty)
+                        serialize_arguments, argument_spec, Empty)
 
 NodeData = namedtuple(
     'NodeData',
@@ -21,19 +21,32 @@ class FunctionNode:
 
     A :py:class:`BoundArguments` object storing the arguments to
     the function.
+
+    .. py:attribute:: pending
+
+    The number of arguments that are still :py:obj:`Empty`. This counter
+    is initialised by the scheduler using :py:func:`count_pending` and
+    decremented by :py:func:`insert_result`, so that it can see that a node
+    is ready to run without scanning its arguments again.
     """
+    __slots__ = ('foo', 'bound_args', 'hints', 'result', 'prov', 'pending',
+                 'spec')
+
     @staticmethod
     def from_node_data(data):
         foo = unwrap(data.function)
-        bound_args = bind_arguments(foo, data.arguments)
-        return FunctionNode(foo, bound_args, data.hints)
+        spec = argument_spec(foo)
+        bound_args = bind_arguments(foo, data.arguments, spec)
+        return FunctionNode(foo, bound_args, data.hints, spec=spec)
 
-    def __init__(self, foo, bound_args, hints, result=Empty):
+    def __init__(self, foo, bound_args, hints, result=Empty, spec=None):
         self.foo = foo
         self.bound_args = bound_args
         self.hints = hints
         self.result = result
         self.prov = None
+        self.pending = None
+        self.spec = spec
 
     def apply(self):
         return self.foo(*self.bound_args.args, **self.bound_args.kwargs)
@@ -42,7 +55,7 @@ class FunctionNode:
     def data(self):
         """Convert to a :py:class:`NodeData` for subsequent serial."""
         return NodeData(
-            self.foo, get_arguments(self.bound_args), self.hints)
+            self.foo, get_arguments(self.bound_args, self.spec), self.hints)
 
     def __str__(self):
         s = self.foo.__name__ + '(' + \
@@ -68,17 +81,88 @@ class Workflow:
     .. py:attribute:: links
 
         A `dict` giving a `set` of links from each node.
+
+    A workflow created with :py:meth:`Workflow.merge` shares the structure of
+    the workflows it was built from: it only stores its root node and the
+    links from the roots of its parts. The `nodes` and `links` dictionaries
+    are filled in on first access, visiting every part only once. This keeps
+    the total cost of building a workflow linear in the number of nodes.
     """
+    __is_workflow__ = True
+
     def __init__(self, root, nodes, links):
         self.root = root
-        self.nodes = nodes
-        self.links = links
+        self._nodes = nodes
+        self._links = links
+        self._parts = None
+
+    def _merge_items(self):
+        """Iterate over `(node_id, node, links)` in the form needed when
+        this workflow is merged into another."""
+        for n, node in self._nodes.items():
+            yield n, node, self._links[n]
+
+    def _merge_root(self):
+        return self.root
+
+    @classmethod
+    def merge(cls, root, node, parts):
+        """Create a workflow with root node `node`, having id `root`, from
+        a list of `(workflow, address)` pairs. The root of each workflow
+        is linked to the given address in the arguments of `node`."""
+        wf = cls(root, None, None)
+        wf._parts = (node, parts)
+        return wf
+
+    @property
+    def nodes(self):
+        if self._nodes is None:
+            self._materialise()
+        return self._nodes
+
+    @property
+    def links(self):
+        if self._links is None:
+            self._materialise()
+        return self._links
+
+    def _materialise(self):
+        nodes = {}
+        links = {}
+        seen = set()
+        stack = [self]
+
+        while stack:
+            wf = stack.pop()
+            if id(wf) in seen:
+                continue
+            seen.add(id(wf))
+
+            if wf._parts is None:
+                for n, node, targets in wf._merge_items():
+                    nodes[n] = node
+                    links.setdefault(n, set()).update(targets)
+                continue
+
+            node, parts = wf._parts
+            nodes[wf.root] = node
+            links.setdefault(wf.root, set())
+            for sub, address in parts:
+                links.setdefault(sub._merge_root(), set()).add(
+                    (wf.root, address))
+                stack.append(sub)
+
+        self._nodes = nodes
+        self._links = links
+        self._parts = None
 
     def __iter__(self):
         return iter((self.root, self.nodes, self.links))
 
     @property
     def root_node(self):
+        if self._parts is not None:
+            return self._parts[0]
         return self.nodes[self.root]
 
     @property
@@ -102,22 +186,47 @@ class Workflow:
                 self._inverse_links[target].add(k)
 
 
+_workflow_types = {}
+
+
 def is_workflow(x):
-    return isinstance(x, Workflow) or ('_workflow' in dir(x))
+    """Returns True if `x` is a workflow or a promise wrapping one. Classes
+    take part in this protocol by setting the class attribute
+    `__is_workflow__` to `True`; promises should store their workflow in the
+    `_workflow` attribute. Only the type of `x` is inspected, and the answer
+    is cached per type, so that this check is cheap enough to run on every
+    argument of every call."""
+    t = type(x)
+    try:
+        return _workflow_types[t]
+    except KeyError:
+        result = _workflow_types[t] = \
+            bool(getattr(t, '__is_workflow__', False))
+        return result
 
 
 def get_workflow(x):
+    """Returns the workflow of `x` if `x` is a workflow or a promise,
+    otherwise `None`."""
+    if not is_workflow(x):
+        return None
+
     if isinstance(x, Workflow):
         return x
 
-    if '_workflow' in dir(x):
-        return x._workflow
-
-    return None
+    return x._workflow
 
 
 def is_node_ready(node):
     """Returns True if none of the argument holders contain any `Empty` object.
     """
     return all(ref_argument(node.bound_args, a) is not Empty
-               for a in serialize_arguments(node.bound_args))
+               for a in serialize_arguments(node.bound_args, node.spec))
+
+
+def count_pending(node):
+    """Returns the number of argument holders that contain an `Empty` object.
+    This walks all arguments once; after that :py:func:`insert_result` keeps
+    the count in `node.pending` up to date."""
+    return sum(1 for a in serialize_arguments(node.bound_args, node.spec)
+               if ref_argument(node.bound_args, a) is Empty)
@@ -1,4 +1,4 @@
-from .arguments import set_argument, Empty
+from .arguments import set_argument, ref_argument, Empty
 
 
 def reset_workflow(workflow):
@@ -9,11 +9,23 @@ def reset_workflow(workflow):
     return workflow
 
 
+def _is_empty(bound_args, address):
+    try:
+        return ref_argument(bound_args, address) is Empty
+    except (KeyError, IndexError):
+        return True
+
+
 def insert_result(node, address, value):
     """Runs `set_argument`, but checks first wether the data location is not
     already filled with some data. In any normal circumstance this checking
     is redundant, but if we don't give an error here the program would continue
     with unexpected results.
+
+    If the node keeps a count of pending arguments (see
+    :py:func:`count_pending`), the count is decremented when an empty
+    argument is filled. The new count is returned, or `None` if the node
+    doesn't keep count.
     """
     # a = ref_argument(node.bound_args, address)
     # if a != Empty:
@@ -22,4 +34,8 @@ def insert_result(node, address, value):
     #        .format(arg=format_address(address),
     #                name=node.foo.__name__))
 
+    if node.pending is not None and _is_empty(node.bound_args, address):
+        node.pending -= 1
+
     set_argument(node.bound_args, address, value)
+    return node.pending
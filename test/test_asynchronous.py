@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from noodles import schedule, gather, serial, run_single
+from noodles.run.asynchronous import run_async
+
+
+@schedule
+async def fetch(x):
+    await asyncio.sleep(0.2)
+    return x
+
+
+@schedule
+def square(x):
+    return x*x
+
+
+@schedule
+async def fail(x):
+    await asyncio.sleep(0.01)
+    raise ValueError("failing on purpose")
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+def test_concurrent_coroutines():
+    wf = total(gather(*[square(fetch(i)) for i in range(1000)]))
+
+    start = time.time()
+    assert run_async(wf) == sum(i*i for i in range(1000))
+    assert time.time() - start < 1.5
+
+
+def test_processes():
+    wf = total(gather(*[square(fetch(i)) for i in range(20)]))
+    assert run_async(wf, n_processes=2, registry=serial.base) == 2470
+
+
+def test_error():
+    with pytest.raises(ValueError):
+        run_async(total(gather(fetch(1), fail(2))))
+
+
+def test_coroutine_in_single_runner():
+    assert run_single(square(fetch(3))) == 9
+
+
+def test_coroutine_in_running_loop():
+    # as in a Jupyter notebook, where an event loop is already running
+    async def main():
+        return run_single(square(fetch(3)))
+
+    assert asyncio.run(main()) == 9
+
+
+class Abort(BaseException):
+    pass
+
+
+@schedule
+def abort(x):
+    raise Abort()
+
+
+def test_thread_pool_base_exception():
+    with pytest.raises(Abort):
+        run_async(total(gather(square(1), abort(2))))
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from noodles import schedule, gather, serial
+from noodles.workflow import get_workflow
+from noodles.run.batch import (run_batch, write_batch, read_batch)
+from noodles.run.job_keeper import JobKeeper
+from noodles.run.scheduler import Job
+
+try:
+    import msgpack  # noqa
+    has_msgpack = True
+except ImportError:
+    has_msgpack = False
+
+
+@schedule
+def square(x):
+    print("squaring", x)
+    return x*x
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+def test_worker_batch_mode(tmpdir):
+    wf = get_workflow(gather(*[square(i) for i in range(4)]))
+    keeper = JobKeeper()
+    messages = [keeper.register(Job(wf, n)) for n in wf.nodes
+                if n != wf.root]
+
+    path = os.path.join(str(tmpdir), 'jobs-{index}')
+    write_batch(serial.base(), path.format(index=3) + '.in', messages)
+
+    subprocess.check_call(
+        [sys.executable, '-m', 'noodles.worker', 'batch',
+         '-registry', 'noodles.serial.base',
+         '-input', path + '.in', '-output', path + '.out'],
+        env=dict(os.environ, SLURM_ARRAY_TASK_ID='3'))
+
+    results = read_batch(serial.base(), path.format(index=3) + '.out')
+    assert sorted(r.key for r in results) == sorted(m.key for m in messages)
+    assert sorted(r.value for r in results) == [0, 1, 4, 9]
+    assert all(r.status == 'done' for r in results)
+
+
+def test_run_batch(tmpdir):
+    wf = total(gather(*[square(i) for i in range(10)]))
+    result = run_batch(wf, serial.base, n_processes=2,
+                       spool_dir=str(tmpdir))
+    assert result == 285
+    assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.skipif(not has_msgpack, reason="msgpack needed.")
+def test_run_batch_msgpack():
+    wf = total(gather(*[square(i) for i in range(10)]))
+    assert run_batch(wf, serial.base, batch_size=3, use_msgpack=True) == 285
+
+
+def test_run_batch_framed():
+    wf = total(gather(*[square(i) for i in range(10)]))
+    assert run_batch(wf, serial.base, n_threads=2, framed=True) == 285
@@ -0,0 +1,110 @@
+from noodles import (schedule, schedule_hint, gather, run_parallel,
+                     run_process, serial)
+from noodles.workflow import get_workflow
+from noodles.run.scheduler import Scheduler
+from noodles.run.queue import Queue
+from noodles.run.haploid import pull_map
+from noodles.run.worker import worker
+from noodles.run.job_keeper import JobKeeper
+from noodles.run.runners import run_parallel_timing
+
+import pytest
+
+
+@schedule_hint(batch=4)
+def square(x):
+    return x*x
+
+
+@schedule
+def cube(x):
+    return x*x*x
+
+
+@schedule_hint(batch=3)
+def inverse(x):
+    return 1 / x
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+def run_counting(wf, **kwargs):
+    """Run `wf` in a single thread, returning the result and the number of
+    messages sent to the worker."""
+    messages = []
+
+    @pull_map
+    def count(key, job):
+        messages.append(key)
+        return key, job
+
+    result = Scheduler(**kwargs).run(
+        Queue() >> count >> worker, get_workflow(wf))
+    return result, len(messages)
+
+
+def test_batch_hint():
+    wf = total(gather(*[square(i) for i in range(10)]))
+    # batches of 4, 4 and 2 squares, one gather and one total
+    assert run_counting(wf) == (285, 5)
+
+
+@schedule
+def value(x):
+    return x
+
+
+def test_batch_waits_while_busy():
+    # every value makes a square and a cube ready; the cube keeps the worker
+    # busy, so the squares are held back until a batch is full
+    wf = gather(*[gather(square(x), cube(x))
+                  for x in [value(i) for i in range(8)]])
+    result, n_messages = run_counting(wf)
+    assert result == [[i**2, i**3] for i in range(8)]
+    assert n_messages == 8 + 8 + 2 + 8 + 1
+
+
+def test_batch_sent_when_idle():
+    # a result that makes nothing else ready sends the batch, even though
+    # it isn't full and other jobs are still running
+    wf = gather(*[square(cube(i)) for i in range(3)])
+    result, n_messages = run_counting(wf)
+    assert result == [i**6 for i in range(3)]
+    assert n_messages == 3 + 3 + 1
+
+
+def test_batch_keep_jobs():
+    wf = total(gather(*[square(i) for i in range(10)]))
+    jobs = JobKeeper(keep=True)
+    assert run_counting(wf, job_keeper=jobs) == (285, 5)
+    assert len(jobs) == 5
+
+
+def test_batch_timer(tmpdir):
+    wf = total(gather(*[square(i) for i in range(10)]))
+    assert run_parallel_timing(wf, 2, str(tmpdir.join('timing.json'))) \
+        == 285
+
+
+def test_batch_scheduler_mode():
+    wf = total(gather(*[cube(i) for i in range(10)]))
+    assert run_counting(wf, batch=100) == (2025, 3)
+
+
+def test_batch_error():
+    wf = gather(*[inverse(i) for i in range(3)])
+    with pytest.raises(ZeroDivisionError):
+        run_counting(wf)
+
+
+def test_batch_parallel():
+    wf = total(gather(*[square(i) for i in range(100)]))
+    assert run_parallel(wf, 4) == 328350
+
+
+def test_batch_process():
+    wf = total(gather(*[square(i) for i in range(10)]))
+    assert run_process(wf, n_processes=1, registry=serial.base) == 285
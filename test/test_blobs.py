@@ -0,0 +1,95 @@
+import mmap
+import os
+import threading
+
+from noodles import (serial, gather, schedule_hint)
+from noodles.prov.blobs import (BlobStore, larger_than)
+from noodles.run.run_with_prov import run_parallel_opt
+
+
+@schedule_hint(store=True)
+def big_result(i):
+    calls.append(i)
+    return list(range(2000))
+
+
+calls = []
+
+
+def blob_files(path):
+    return [name for shard in os.listdir(path) if len(shard) == 2
+            for name in os.listdir(os.path.join(path, shard))]
+
+
+def test_blob_store(tmpdir):
+    store = BlobStore(str(tmpdir), mmap_size=100)
+
+    a = store.put(b'small')
+    assert store.put(b'small') == a
+    b = store.put(b'x' * 1000)
+    assert store.refcount(a) == 2 and store.refcount(b) == 1
+    assert len(blob_files(str(tmpdir))) == 2
+
+    assert store.get(a) == b'small'
+    data = store.get(b)
+    assert isinstance(data, mmap.mmap) and data[:] == b'x' * 1000
+    data.close()
+
+    store.release(a)
+    assert store.get_text(a) == 'small'
+    store.release(a)
+    store.release(b)
+    assert blob_files(str(tmpdir)) == []
+
+    # a file without reference, as if a run was killed after writing it;
+    # it is left alone while it may still be written to
+    c = store.put(b'orphan')
+    store.db.execute('delete from "refs";')
+    assert store.collect() == 0
+    assert os.path.exists(store.blob_path(c))
+    assert store.collect(min_age=0) == 1
+    assert not os.path.exists(store.blob_path(c))
+
+
+def test_put_waits_for_collect(tmpdir):
+    # two stores on the same directory, as in two processes
+    a = BlobStore(str(tmpdir))
+    b = BlobStore(str(tmpdir))
+    ids = []
+
+    with a._transaction():
+        t = threading.Thread(target=lambda: ids.append(b.put(b'data')))
+        t.start()
+        t.join(0.2)
+        assert t.is_alive() and not ids
+
+    t.join()
+    assert a.refcount(ids[0]) == 1
+    assert a.get(ids[0]) == b'data'
+
+
+def test_larger_than():
+    assert larger_than('x' * 100, 100)
+    assert not larger_than('x' * 10, 100)
+    assert larger_than(list(range(1000)), 1000)
+    assert not larger_than({'a': [1, 2, 3]}, 100)
+    assert larger_than([{'a': 'x' * 50}] * 3, 100)
+
+
+def test_deduplicated_results(tmpdir):
+    db_file = str(tmpdir.join('cache.jsonl'))
+    blob_dir = str(tmpdir.join('blobs'))
+    calls.clear()
+
+    wf = gather(*[big_result(i) for i in range(5)])
+    result = run_parallel_opt(wf, 2, serial.base, db_file,
+                              database='journal', blob_dir=blob_dir)
+    assert result == [list(range(2000))] * 5
+    assert len(blob_files(blob_dir)) == 1
+    assert os.path.getsize(db_file) < 5000
+
+    calls.clear()
+    result = run_parallel_opt(wf, 2, serial.base, db_file,
+                              database='journal', blob_dir=blob_dir)
+    assert result == [list(range(2000))] * 5
+    assert calls == []
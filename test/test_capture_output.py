@@ -23,3 +23,9 @@ def test_capture_output_nomsgpack():
     a = writes_to_stdout()
     result = run_process(a, n_processes=1, registry=serial.base, use_msgpack=False)
     assert result == 42
+
+
+def test_capture_output_framed():
+    a = writes_to_stdout()
+    result = run_process(a, n_processes=1, registry=serial.base, framed=True)
+    assert result == 42
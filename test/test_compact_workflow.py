@@ -0,0 +1,73 @@
+from noodles import (schedule, gather, get_workflow, run_single, serial)
+from noodles.workflow import (
+    compact_workflow, CompactWorkflow, from_call, Empty)
+from noodles.prov.workflow import set_global_provenance
+
+
+@schedule
+def value(a):
+    return a
+
+
+@schedule
+def add(a, b):
+    return a + b
+
+
+def make_workflow():
+    return get_workflow(
+        gather(*[add(value(i), i) for i in range(5)], add(1, value(2))))
+
+
+def test_compact_layout():
+    wf = make_workflow()
+    cwf = compact_workflow(wf)
+
+    assert isinstance(cwf, CompactWorkflow)
+    assert len(cwf.nodes) == len(wf.nodes)
+    assert sorted(cwf.nodes) == list(range(len(wf.nodes)))
+    assert sum(len(l) for l in cwf.links.values()) == \
+        sum(len(l) for l in wf.links.values())
+    assert cwf.root_node is wf.root_node
+    assert compact_workflow(cwf) is cwf
+
+
+def test_compact_run():
+    assert run_single(compact_workflow(make_workflow())) == \
+        [0, 2, 4, 6, 8, 3]
+
+
+def test_compact_from_call():
+    a = value(1)
+    wf = from_call(add.__wrapped__, (a, 2), {}, {}, compact=True)
+    assert isinstance(wf, CompactWorkflow)
+    assert wf.root_node.bound_args.args == (Empty, 2)
+    assert run_single(wf) == 3
+
+
+def test_compact_serialisation():
+    registry = serial.base()
+    cwf = compact_workflow(make_workflow())
+    dec = registry.from_json(registry.to_json(cwf), deref=True)
+
+    assert isinstance(dec, CompactWorkflow)
+    assert run_single(dec) == [0, 2, 4, 6, 8, 3]
+
+
+def test_compact_provenance():
+    registry = serial.base()
+    wf = make_workflow()
+    set_global_provenance(wf, registry)
+    keys = [n.prov for n in wf.nodes.values()]
+
+    cwf = compact_workflow(make_workflow())
+    set_global_provenance(cwf, registry)
+    assert [n.prov for n in cwf.nodes.values()] == keys
+
+
+def test_compact_merge():
+    a = compact_workflow(get_workflow(add(value(1), 2)))
+    b = compact_workflow(get_workflow(add(value(3), 4)))
+    wf = from_call(add.__wrapped__, (a, b), {}, {})
+    assert len(wf.nodes) == 5
+    assert run_single(wf) == 10
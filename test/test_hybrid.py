@@ -7,8 +7,9 @@ from noodles.run.scheduler import Scheduler
 from noodles.run.worker import run_job
 from noodles.run.hybrid import hybrid_coroutine_worker
 from noodles.run.hybrid import run_hybrid
+from noodles.run.hybrid import balanced_threaded_worker
 
-from noodles.run.haploid import haploid
+from noodles.run.haploid import (haploid, pull)
 from noodles.run.queue import (Queue)
 from noodles.run.thread_pool import (thread_pool)
 from noodles.run.worker import (worker)
@@ -121,3 +122,40 @@ def test_hybrid_coroutine_runner_03():
     assert c1() == 11
     assert c2() == 7
     assert result == 173
+
+
+@schedule
+def slow_square(x):
+    time.sleep(0.01)
+    return x*x
+
+
+def pulling_tic_worker(tic):
+    jobs = Queue()
+
+    @pull
+    def get_result():
+        source = jobs.source()
+
+        for key, job in source:
+            tic()
+            yield run_job(key, job)
+
+    return Connection(get_result, jobs.sink)
+
+
+def test_balanced_threaded_worker():
+    B = sum(gather(*[slow_square(i) for i in range(20)]))
+
+    tic1, c1 = ticcer()
+    tic2, c2 = ticcer()
+
+    result = Scheduler().run(
+        balanced_threaded_worker({
+            1: pulling_tic_worker(tic1), 2: pulling_tic_worker(tic2)},
+            capacity=2),
+        get_workflow(B))
+
+    assert result == 2470
+    assert c1() + c2() == 22
+    assert c1() >= 5 and c2() >= 5
@@ -0,0 +1,54 @@
+from itertools import count
+import io
+import json
+
+from noodles import schedule, gather, serial, run_process
+from noodles.workflow import get_workflow
+from noodles.run.scheduler import Scheduler
+from noodles.run.job_keeper import (JobKeeper, job_keys)
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
+
+
+@schedule
+def value(x):
+    return x
+
+
+def test_job_keys():
+    keys = job_keys()
+    a = [next(keys) for _ in range(10)]
+
+    assert all(isinstance(k, int) and 0 <= k < 2**63 for k in a)
+    assert a == list(range(a[0], a[0] + 10))
+    assert a[0] % 2**40 == 0
+
+
+def test_counting_keys():
+    jobs = JobKeeper(keys=count())
+    wf = get_workflow(gather(*[value(i) for i in range(5)]))
+    result = Scheduler(job_keeper=jobs).run(Queue() >> worker, wf)
+
+    assert result == [0, 1, 2, 3, 4]
+    assert next(jobs.keys) == 6
+
+
+def test_integer_keys_over_the_wire():
+    wf = gather(*[value(i) for i in range(5)])
+    assert run_process(wf, n_processes=1, registry=serial.base) == \
+        [0, 1, 2, 3, 4]
+
+
+def test_job_log():
+    wf = get_workflow(gather(*[value(i) for i in range(5)]))
+    jobs = JobKeeper(keep=True, log_size=1)
+    Scheduler(job_keeper=jobs).run(Queue() >> worker, wf)
+    assert all(len(job.log) == 1 for job in jobs.values())
+
+    log = io.StringIO()
+    jobs = JobKeeper(keys=count(), log_file=log)
+    wf = get_workflow(gather(*[value(i) for i in range(5)]))
+    Scheduler(job_keeper=jobs).run(Queue() >> worker, wf)
+    entries = [json.loads(line) for line in log.getvalue().splitlines()]
+    assert [e['key'] for e in entries] == list(range(6))
+    assert all(e['status'] == 'register' for e in entries)
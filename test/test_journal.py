@@ -0,0 +1,62 @@
+from noodles import (serial, gather, schedule_hint)
+from noodles.prov import open_job_db
+from noodles.prov.journal import JobDB
+from noodles.run.run_with_prov import run_parallel_opt
+
+
+@schedule_hint(store=True)
+def count_calls(x):
+    calls.append(x)
+    return x * 2
+
+
+calls = []
+
+
+def test_journal_cache(tmpdir):
+    db_file = str(tmpdir.join('cache.jsonl'))
+    calls.clear()
+
+    wf = gather(*[count_calls(i % 4) for i in range(8)])
+    result = run_parallel_opt(wf, 4, serial.base, db_file, database='journal')
+    assert result == [0, 2, 4, 6] * 2
+    assert sorted(calls) == [0, 1, 2, 3]
+
+    calls.clear()
+    wf = gather(*[count_calls(i) for i in range(6)])
+    result = run_parallel_opt(wf, 4, serial.base, db_file, database='journal')
+    assert result == [0, 2, 4, 6, 8, 10]
+    assert sorted(calls) == [4, 5]
+
+
+def test_torn_write(tmpdir):
+    db_file = str(tmpdir.join('cache.jsonl'))
+    job_msg = {'data': {'function': 'f', 'arguments': [], 'hints': {}}}
+
+    db = open_job_db('journal', db_file)
+    assert isinstance(db, JobDB)
+    db.new_job(1, 'a', job_msg)
+    db.store_result(1, 42)
+    db.new_job(2, 'b', job_msg)
+    db.close()
+
+    with open(db_file, 'ab') as f:
+        f.write(b'{"result": "b", "val')
+
+    db = JobDB(db_file)
+    assert db.job_exists('a') and db.job_exists('b')
+    assert db.get_result_or_attach(3, 'a', {}) == ('retrieved', None, 42)
+    assert db.get_result_or_attach(4, 'b', {})[0] == 'broken'
+    assert not db.job_exists('b')
+    db.close()
+
+    with open(db_file, 'rb') as f:
+        assert all(line.endswith(b'\n') for line in f)
+    assert JobDB(db_file).job_exists('a')
+
+
+def test_removed_job(tmpdir):
+    db = JobDB(str(tmpdir.join('cache.jsonl')))
+    # as if the job was removed in between `job_exists` and this
+    assert db.get_result_or_attach(1, 'a', {}) == ('broken', None, None)
+    db.close()
@@ -1,7 +1,8 @@
 from pytest import raises
 from noodles.workflow import (
     Empty, ArgumentAddress,
-    ArgumentKind, is_workflow, get_workflow, Workflow)
+    ArgumentKind, is_workflow, get_workflow, Workflow,
+    count_pending, insert_result)
 from noodles import run_single, schedule, gather
 
 
@@ -17,6 +18,26 @@ def test_get_workflow():
     assert get_workflow(4) is None
 
 
+def test_workflow_protocol():
+    class Promise:
+        __is_workflow__ = True
+
+        def __init__(self, workflow):
+            self._workflow = workflow
+
+    class NotAPromise:
+        def __init__(self):
+            self._workflow = None
+
+    wf = get_workflow(value(1))
+    assert is_workflow(value(1))
+    assert is_workflow(Promise(wf))
+    assert get_workflow(Promise(wf)) is wf
+    assert get_workflow(wf) is wf
+    assert not is_workflow(NotAPromise())
+    assert get_workflow(NotAPromise()) is None
+
+
 @schedule
 def value(a):
     return a
@@ -72,6 +93,23 @@ def test_binder():
         in C.links[B.root]
 
 
+def test_pending_count():
+    A = value(1)
+    B = value(2)
+    C = get_workflow(gather(A, B, 3))
+
+    node = C.nodes[C.root]
+    node.pending = count_pending(node)
+    assert node.pending == 2
+
+    address = ArgumentAddress(ArgumentKind.variadic, 'a', 0)
+    assert insert_result(node, address, 1) == 1
+    # filling the same slot twice doesn't count
+    assert insert_result(node, address, 1) == 1
+    assert insert_result(
+        node, ArgumentAddress(ArgumentKind.variadic, 'a', 1), 2) == 0
+
+
 @schedule
 def takes_keywords(s, **kwargs):
     return s
@@ -133,3 +171,75 @@ def test_tuple_unpack():
     result = run_single(b)
     assert result.x == -1
     assert result.y == 1
+
+
+def test_shared_structure():
+    A = value(1)
+    B = add(A, 1)
+    C = add(A, 2)
+    D = add(B, C)
+
+    wf = get_workflow(D)
+    a = get_workflow(A)
+    assert len(wf.nodes) == 4
+    assert {tgt for tgt, _ in wf.links[a.root]} == \
+        {get_workflow(B).root, get_workflow(C).root}
+    assert run_single(D) == 5
+
+
+def test_long_chain():
+    x = value(0)
+    for i in range(2000):
+        x = add(x, 1)
+
+    wf = get_workflow(x)
+    assert len(wf.nodes) == 2001
+    assert run_single(x) == 2000
+
+
+def test_argument_spec():
+    from noodles.workflow.arguments import (
+        argument_spec, serialize_arguments)
+    from noodles.workflow.model import FunctionNode
+    from noodles.interface import unwrap
+
+    @schedule
+    def f(a, *args, b=1, **kwargs):
+        return a
+
+    spec = argument_spec(unwrap(f))
+    assert spec is argument_spec(unwrap(f))
+    assert not hasattr(f, '__argument_spec__')
+    assert spec.variadic == 'args'
+    assert spec.keyword == 'kwargs'
+
+    wf = get_workflow(f(1, 2, 3, c=4))
+    node = wf.root_node
+    assert node.spec is spec
+    assert list(serialize_arguments(node.bound_args, spec)) == \
+        list(serialize_arguments(node.bound_args))
+
+    copy = FunctionNode.from_node_data(node.data)
+    assert copy.spec is spec
+    assert copy.bound_args.arguments == node.bound_args.arguments
+
+
+def test_argument_spec_subclass():
+    from noodles.workflow.arguments import (
+        argument_spec, get_arguments, ArgumentSpec)
+    from noodles.workflow.model import (FunctionNode, NodeData)
+
+    class Base:
+        def __init__(self, x):
+            self.x = x
+
+    class Derived(Base):
+        def __init__(self, x, y):
+            super().__init__(x + y)
+
+    # as on a worker, that decodes the job before having seen `Derived`
+    assert list(argument_spec(Base).signature.parameters) == ['x']
+    spec = ArgumentSpec(Derived)
+    arguments = get_arguments(spec.signature.bind(1, 2), spec)
+    node = FunctionNode.from_node_data(NodeData(Derived, arguments, {}))
+    assert node.apply().x == 3
@@ -0,0 +1,95 @@
+from noodles import schedule, schedule_hint, run_single, get_workflow
+from noodles.storable import Storable
+from noodles.workflow import is_immutable
+
+try:
+    import numpy as np
+except ImportError:
+    has_numpy = False
+else:
+    has_numpy = True
+
+import pytest
+
+
+class A(Storable):
+    def __init__(self, x=None):
+        super(A, self).__init__()
+        self.x = x
+
+
+@schedule
+def length(a):
+    return len(a)
+
+
+@schedule_hint(pass_by='readonly')
+def length_readonly(a):
+    return len(a)
+
+
+@schedule_hint(pass_by='readonly')
+def get_x(a):
+    return a.x
+
+
+@schedule
+def value(x):
+    return x
+
+
+def first_argument(promise):
+    node = get_workflow(promise).root_node
+    return next(iter(node.bound_args.arguments.values()))
+
+
+def test_is_immutable():
+    assert is_immutable(1)
+    assert is_immutable("abc")
+    assert is_immutable(b"abc")
+    assert is_immutable((1, 2.0, ("x", None)))
+    assert is_immutable(frozenset([1, 2]))
+    assert not is_immutable((1, [2]))
+    assert not is_immutable([1, 2])
+    assert not is_immutable({'a': 1})
+
+
+def test_pass_by_value():
+    data = [1, 2, 3]
+    p = length(data)
+    assert first_argument(p) is not data
+    data.append(4)
+    assert run_single(p) == 3
+
+    t = (1, 2, "three")
+    assert first_argument(length(t)) is t
+
+
+def test_pass_by_readonly():
+    data = [1, 2, 3]
+    p = length_readonly(data)
+    assert first_argument(p) is data
+    assert run_single(p) == 3
+
+
+def test_readonly_storable():
+    a = A(value(42))
+    p = get_x(a)
+    assert first_argument(p) is not a
+    assert run_single(p) == 42
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_readonly_array():
+    a = np.arange(10)
+    assert not is_immutable(a)
+
+    a.setflags(write=False)
+    assert is_immutable(a)
+    assert first_argument(length(a)) is a
+
+    b = np.arange(10)
+    view = b[::2]
+    view.setflags(write=False)
+    assert not is_immutable(view)
+    assert first_argument(length(view)) is not view
@@ -0,0 +1,76 @@
+import time
+
+from noodles import (schedule, schedule_hint, gather, run_parallel,
+                     update_hints)
+from noodles.workflow import (get_workflow, upward_rank)
+from noodles.run.priority import PriorityScheduler
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
+
+
+@schedule
+def add(a, b):
+    return a + b
+
+
+@schedule_hint(cost=5)
+def expensive(x):
+    return x
+
+
+log = []
+
+
+@schedule
+def sleep_and_log(x, dt):
+    time.sleep(dt)
+    log.append(x)
+    return x
+
+
+@schedule
+def recurse(n):
+    if n == 0:
+        return 0
+    return add(1, recurse(n - 1))
+
+
+def test_upward_rank():
+    a = expensive(1)
+    b = add(a, 2)
+    c = add(b, add(3, 4))
+    wf = get_workflow(c)
+
+    rank = upward_rank(wf.links, lambda n: wf.nodes[n].hints.get('cost', 1))
+    assert rank[wf.root] == 1
+    assert rank[get_workflow(b).root] == 2
+    assert rank[get_workflow(a).root] == 7
+    assert max(rank.values()) == 7
+
+
+def test_critical_path_first():
+    # with a single slot, the order in which jobs are sent is the order in
+    # which they run; the chain behind the expensive node should go first.
+    log.clear()
+    short = [sleep_and_log(i, 0) for i in range(4)]
+    long = sleep_and_log('long', 0)
+    update_hints(long, {'cost': 10})
+    wf = gather(*short, add(long, '!'))
+
+    result = PriorityScheduler(1).run(Queue() >> worker, get_workflow(wf))
+    assert result == [0, 1, 2, 3, 'long!']
+    assert log[0] == 'long'
+
+
+def test_history():
+    history = {}
+    wf = gather(*[sleep_and_log(i, 0.01) for i in range(3)])
+    PriorityScheduler(2, history=history).run(
+        Queue() >> worker, get_workflow(wf))
+
+    name, = [k for k in history if k.endswith('sleep_and_log')]
+    assert history[name] > 0.005
+
+
+def test_priority_nested():
+    assert run_parallel(recurse(20), 4, priority=True) == 20
@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+
+import pytest
+
+try:
+    import numpy as np
+except ImportError:
+    has_numpy = False
+else:
+    has_numpy = True
+
+from noodles import schedule, schedule_hint, gather
+from noodles.run.process_pool import run_process_pool
+
+
+@schedule
+def pid(x):
+    return x, os.getpid()
+
+
+@schedule
+def norm(a):
+    return float(np.sqrt((a**2).sum()))
+
+
+@schedule
+def fail(x):
+    raise ValueError("failing on purpose")
+
+
+@schedule_hint(batch=5)
+def square(x):
+    return x*x
+
+
+@schedule
+def total(xs):
+    return sum(xs)
+
+
+@schedule
+def recurse(n):
+    if n == 0:
+        return 0
+    return add_one(recurse(n - 1))
+
+
+@schedule
+def add_one(x):
+    return x + 1
+
+
+def test_process_pool():
+    result = run_process_pool(gather(*[pid(i) for i in range(20)]), 2)
+    assert [x for x, _ in result] == list(range(20))
+    assert os.getpid() not in [p for _, p in result]
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_process_pool_arrays():
+    a = np.ones((100, 100))
+    assert run_process_pool(norm(a), 1) == 100.0
+
+
+def test_process_pool_error():
+    with pytest.raises(ValueError):
+        run_process_pool(fail(1), 1)
+
+
+def test_process_pool_batch():
+    wf = total(gather(*[square(i) for i in range(20)]))
+    assert run_process_pool(wf, 2) == 2470
+
+
+def test_process_pool_workflow_result():
+    assert run_process_pool(recurse(5), 2) == 5
+
+
+def test_process_pool_spawn():
+    ctx = multiprocessing.get_context('spawn')
+    assert run_process_pool(square(7), 1, mp_context=ctx) == 49
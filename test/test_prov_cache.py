@@ -0,0 +1,121 @@
+from noodles import (serial, gather, schedule, schedule_hint)
+from noodles.prov.cache import LRUCache
+from noodles.run.run_with_prov import (run_parallel, run_parallel_opt)
+
+
+@schedule_hint(store=True)
+def load(x):
+    calls.append(x)
+    return [x] * 10
+
+
+calls = []
+
+
+def test_lru_cache():
+    cache = LRUCache(10)
+    cache.put('a', 1, 4)
+    cache.put('b', 2, 4)
+    assert cache.get('a') == 1
+    cache.put('c', 3, 4)          # evicts 'b', the least recently used
+    cache.put('d', 4, 11)         # too large to store
+
+    assert 'b' not in cache and 'd' not in cache
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.bytes == 8
+
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 1
+    assert stats['evictions'] == 1
+    assert cache.hit_rate == 2 / 3
+
+
+def test_lru_cache_pending():
+    cache = LRUCache(10)
+    cache.put('a', 'running', 4)
+    cache.put('b', 'done', 4)
+
+    def done(value):
+        return value == 'done'
+
+    assert cache.get('a', hit=done) == 'running'
+    assert cache.get('b', hit=done) == 'done'
+    assert cache.get('c', hit=done) is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['pending'] == 1
+    assert stats['misses'] == 1
+    assert cache.hit_rate == 1 / 3
+
+
+def test_cached_results(tmpdir):
+    db_file = str(tmpdir.join('cache.jsonl'))
+    calls.clear()
+
+    wf = gather(*[load(i) for i in range(3)])
+    run_parallel_opt(wf, 2, serial.base, db_file, database='journal')
+    assert sorted(calls) == [0, 1, 2]
+
+    calls.clear()
+    cache = LRUCache(2**20)
+    wf = gather(*[load(i % 3) for i in range(30)])
+    result = run_parallel_opt(wf, 2, serial.base, db_file,
+                              database='journal', cache=cache)
+
+    assert result == [[i % 3] * 10 for i in range(30)]
+    assert calls == []
+    assert len(cache) == 3
+    assert cache.misses == 3 and cache.hits == 27
+
+
+@schedule
+def append_one(xs):
+    xs.append(1)
+    return len(xs)
+
+
+def test_cache_filled_by_run(tmpdir):
+    db_file = str(tmpdir.join('cache.jsonl'))
+    calls.clear()
+    cache = LRUCache(2**20)
+
+    wf = gather(*[load(i % 3) for i in range(30)])
+    run_parallel_opt(wf, 2, serial.base, db_file,
+                     database='journal', cache=cache)
+    assert sorted(calls) == [0, 1, 2]
+    # duplicates of a running job are attached to it, and count as pending
+    assert cache.misses == 3 and cache.hits + cache.pending == 27
+    assert all(cache.get(k)[0] == 'done' for k in list(cache.items))
+
+    # every hit gets its own copy of the result
+    for _ in range(2):
+        result = run_parallel_opt(append_one(load(0)), 2, serial.base,
+                                  db_file, database='journal', cache=cache)
+        assert result == 11
+    assert sorted(calls) == [0, 1, 2]
+
+
+@schedule_hint(store=True, batch=4)
+def small(x):
+    calls.append(x)
+    return x * x
+
+
+def test_batch_hint_not_batched(tmpdir):
+    db_file = str(tmpdir.join('cache.jsonl'))
+    calls.clear()
+
+    wf = gather(*[small(i) for i in range(6)])
+    result = run_parallel(wf, 2, serial.base, db_file, database='journal')
+    assert result == [i * i for i in range(6)]
+    assert sorted(calls) == list(range(6))
+
+    # each call is stored on its own, so a partly new workflow reuses them
+    calls.clear()
+    cache = LRUCache(2**20)
+    wf = gather(*[small(i) for i in range(3, 9)])
+    result = run_parallel_opt(wf, 2, serial.base, db_file,
+                              database='journal', cache=cache)
+    assert result == [i * i for i in range(3, 9)]
+    assert sorted(calls) == [6, 7, 8]
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+import pytest
+
+from noodles import serial
+from noodles.tutorial import add
+from noodles.prov.key import (prov_key, job_prov, update_object_hash)
+
+
+@pytest.mark.parametrize('obj', [
+    {'b': [1, 2.5, None, True, "xé\n"], 'a': {'y': [{'q': 'r'}] * 70}},
+    {3: 'int key', 1: [1], 2.5: 'f'},
+    [1.0 / 3, -0.0, 1e300, 12345678901234567890, float('nan')],
+    {'data': 'A' * 300000, 'k': ['\U0001f600' * 40000]},
+    [list(range(10000)), {'k%d' % i: i for i in range(100)}],
+    [], {}, "", [{}], ("a", "b")])
+def test_same_as_json(obj):
+    expected = hashlib.md5(json.dumps(obj, sort_keys=True).encode())
+    assert update_object_hash(hashlib.md5(), obj).hexdigest() == \
+        expected.hexdigest()
+
+
+def test_prov_key_stable():
+    registry = serial.base()
+    job_msg = registry.deep_encode(add(1, 2)._workflow.root_node)
+
+    # the key as computed by earlier versions
+    m = hashlib.md5()
+    for obj in [job_msg['data']['function'], job_msg['data']['arguments'],
+                job_msg['data']['hints']['version']]:
+        m.update(json.dumps(obj, sort_keys=True).encode())
+
+    assert prov_key(job_msg) == m.hexdigest()
+    assert prov_key(job_msg, hash='blake2b') != m.hexdigest()
+
+
+def test_buffers():
+    registry = serial.base()
+    a = add(b'x' * 1000, b'y')
+    b = add(b'x' * 999 + b'z', b'y')
+
+    msg_a, key_a = job_prov(registry, a._workflow.root_node)
+    msg_b, key_b = job_prov(registry, b._workflow.root_node)
+    assert msg_a == msg_b
+    assert key_a != key_b
+    assert job_prov(registry, a._workflow.root_node)[1] == key_a
@@ -3,7 +3,8 @@ import io
 
 from noodles.run.remote.io import (
     MsgPackObjectReader, MsgPackObjectWriter,
-    JSONObjectReader, JSONObjectWriter)
+    JSONObjectReader, JSONObjectWriter,
+    FramedObjectReader, FramedObjectWriter)
 from noodles.serial import base as registry
 import math
 
@@ -13,6 +14,13 @@ try:
 except ImportError:
     has_msgpack = False
 
+try:
+    import numpy as np
+    from noodles.serial.numpy import arrays_to_buffers
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
 
 objects = ["Hello", 42, [3, 4], (5, 6), {"hello": "world"},
            math.tan, object]
@@ -46,3 +54,76 @@ def test_json():
     new_objects = list(input_stream)
 
     assert new_objects == objects
+
+
+def test_framed():
+    f = io.BytesIO()
+    output_stream = FramedObjectWriter(registry(), f)
+
+    for obj in objects + [b"\x00\x01 bytes"]:
+        output_stream.send(obj)
+
+    f.seek(0)
+    input_stream = FramedObjectReader(registry(), f)
+
+    new_objects = list(input_stream)
+    assert new_objects == objects + [b"\x00\x01 bytes"]
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_framed_arrays():
+    reg = registry() + arrays_to_buffers()
+    arrays = [np.arange(12.).reshape(3, 4),
+              np.asfortranarray(np.arange(6).reshape(2, 3)),
+              np.arange(10)[::2],
+              np.zeros((0, 3))]
+
+    f = io.BytesIO()
+    output_stream = FramedObjectWriter(reg, f)
+    output_stream.send({"arrays": arrays})
+
+    # the data is not base64 encoded
+    assert len(f.getvalue()) < sum(a.nbytes for a in arrays) + 1000
+
+    f.seek(0)
+    result = next(FramedObjectReader(reg, f))["arrays"]
+    for a, b in zip(arrays, result):
+        assert a.dtype == b.dtype
+        assert a.shape == b.shape
+        assert (a == b).all()
+
+    # outside a framed message, arrays are still encoded in-band
+    assert (reg.from_json(reg.to_json(arrays[0])) == arrays[0]).all()
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_framed_datetime_arrays():
+    reg = registry() + arrays_to_buffers()
+    arrays = [np.arange('2020-01-01', '2020-01-11', dtype='datetime64[D]'),
+              np.arange(5).astype('timedelta64[s]').reshape(1, 5)]
+
+    f = io.BytesIO()
+    FramedObjectWriter(reg, f).send(arrays)
+    f.seek(0)
+    result = next(FramedObjectReader(reg, f))
+    for a, b in zip(arrays, result):
+        assert a.dtype == b.dtype
+        assert (a == b).all()
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_framed_structured_arrays():
+    reg = registry() + arrays_to_buffers()
+    dtype = np.dtype([('x', '<f8'), (('label', 'y'), '<i4'),
+                      ('z', [('a', 'u1', (2,))])])
+    a = np.zeros(3, dtype=dtype)
+    a['x'] = [1., 2., 3.]
+    a['y'] = [4, 5, 6]
+
+    f = io.BytesIO()
+    FramedObjectWriter(reg, f).send(a)
+    f.seek(0)
+    b = next(FramedObjectReader(reg, f))
+    assert b.dtype == dtype
+    assert b.dtype.names == ('x', 'y', 'z')
+    assert (b == a).all()
@@ -1,4 +1,8 @@
 from noodles import schedule, run_single, run_parallel, gather, result
+from noodles.workflow import get_workflow, Empty
+from noodles.run.scheduler import Scheduler
+from noodles.run.queue import Queue
+from noodles.run.worker import worker
 import time
 
 
@@ -74,3 +78,32 @@ def test_parallel_runner_02():
     end = time.time()
     # print(end-start)
     assert (end - start) < 0.4   # liberal upper limit for running time
+
+
+def test_release_results():
+    A = add(1, 1)
+    B = sub(3, A)
+    C = sum(gather(*[mul(add(i, B), A) for i in range(6)]))
+    wf = get_workflow(C)
+
+    # arguments are reset after each run, so we can run the workflow again
+    for _ in range(2):
+        assert Scheduler(release=True).run(Queue() >> worker, wf) == 42
+        assert result(C) == 42
+        assert all(node.result is Empty for n, node in wf.nodes.items()
+                   if n != wf.root)
+
+
+@schedule
+def add_later(a, b):
+    return add(add(a, b), 1)
+
+
+def test_release_arguments_of_workflow_node():
+    wf = get_workflow(mul(add_later(add(1, 2), 3), 2))
+    scheduler = Scheduler(release=True)
+    assert scheduler.run(Queue() >> worker, wf) == 14
+
+    # nodes let go of their arguments, also if they returned a workflow,
+    # or are the root of a child workflow
+    assert scheduler.received == {}
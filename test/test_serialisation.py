@@ -9,3 +9,63 @@ def test_path():
     b = registry.deep_decode(encoded)
 
     assert a.path == b.path
+
+
+class A:
+    pass
+
+
+class B(A):
+    pass
+
+
+class SerA(serial.Serialiser):
+    def __init__(self, tag):
+        super(SerA, self).__init__(A)
+        self.tag = tag
+
+    def encode(self, obj, make_rec):
+        return make_rec(self.tag)
+
+    def decode(self, cls, data):
+        return cls()
+
+
+def test_lookup_cache():
+    registry = serial.base()
+    assert registry[B] is registry.default
+
+    first = SerA('first')
+    registry[A] = first
+    assert registry[B] is first
+    assert registry.deep_encode(B())['data'] == 'first'
+
+    second = SerA('second')
+    combined = registry + serial.Registry(types={B: second})
+    assert combined[B] is second
+    assert registry[B] is first
+    assert combined.deep_encode(B())['type'] == __name__ + '.B'
+
+
+def test_single_pass_encoder():
+    import json
+    from noodles import schedule, gather, get_workflow
+    from noodles.utility import deep_map, inverse_deep_map
+
+    @schedule
+    def add(a, b):
+        return a + b
+
+    registry = serial.base()
+    wf = get_workflow(gather(add(1, 2), add((3, 4), [5, (6,)])))
+    objs = [wf, wf.root_node, (1, (2, [3, (4,)])),
+            {'a': [None, True, 1.5, "x"], 'b': {'c': (1,)}}]
+
+    for obj in objs:
+        reference = deep_map(lambda o: registry.encode(o), obj)
+        assert registry.deep_encode(obj) == reference
+        assert registry.to_json(obj) == json.dumps(reference)
+
+    rec = registry.deep_encode(objs[-1])
+    assert registry.deep_decode(rec) == \
+        inverse_deep_map(lambda r: registry.decode(r), rec)
@@ -0,0 +1,112 @@
+import os
+import pytest
+
+try:
+    import numpy as np
+    from noodles.serial.numpy import arrays_to_shared_memory
+    from noodles.serial.shared_memory import (
+        segment_owner, release_segments, SharedMemory)
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+from noodles import schedule, serial, run_process
+from noodles.run.job_keeper import JobKeeper
+
+
+def registry():
+    return serial.base() + arrays_to_shared_memory()
+
+
+@schedule
+def double(a):
+    return a * 2
+
+
+def segment_exists(name):
+    try:
+        SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_shared_memory_roundtrip():
+    reg = registry()
+    arrays = [np.arange(12.).reshape(3, 4),
+              np.asfortranarray(np.arange(6).reshape(2, 3)),
+              np.arange(10)[::2],
+              np.zeros((0, 3))]
+
+    for a in arrays:
+        rec = reg.deep_encode(a)
+        name = rec['data']['segment']
+        assert segment_exists(name)
+
+        b = reg.deep_decode(rec)
+        assert not segment_exists(name)
+        assert a.dtype == b.dtype
+        assert a.shape == b.shape
+        assert (a == b).all()
+        b[...] = 1
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_job_keeper_releases_segments():
+    reg = registry()
+    jobs = JobKeeper()
+    jobs['key'] = None
+
+    with segment_owner('key'):
+        rec = reg.deep_encode(np.arange(10))
+    name = rec['data']['segment']
+
+    assert segment_exists(name)
+    del jobs['key']
+    assert not segment_exists(name)
+    release_segments('key')
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_shared_memory_process():
+    a = np.arange(1000.)
+    result = run_process(double(a), n_processes=1, registry=registry)
+    assert (result == 2 * a).all()
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_unowned_segments_released():
+    reg = registry()
+    rec = reg.deep_encode(np.arange(10))
+    name = rec['data']['segment']
+
+    # done at exit for segments that were created outside `segment_owner`
+    assert segment_exists(name)
+    release_segments(None)
+    assert not segment_exists(name)
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_no_segments_for_prov():
+    from noodles.prov.key import job_prov
+    from noodles.workflow import get_workflow
+
+    reg = registry()
+    job = get_workflow(double(np.arange(10.))).root_node
+    msg1, key1 = job_prov(reg, job)
+    msg2, key2 = job_prov(reg, job)
+    assert key1 == key2
+    assert 'segment' not in str(msg1)
+
+
+@pytest.mark.skipif(not has_numpy, reason="No NumPy installed.")
+def test_shared_memory_structured():
+    reg = registry()
+    a = np.zeros(4, dtype=[('x', '<f8'), ('t', '<M8[s]')])
+    a['x'] = np.arange(4.)
+
+    b = reg.deep_decode(reg.deep_encode(a))
+    assert b.dtype == a.dtype
+    assert b.dtype.names == ('x', 't')
+    assert (a == b).all()
@@ -2,10 +2,11 @@
 
 from noodles.prov.sqlite import JobDB
 from noodles.prov.key import prov_key
-from noodles import serial
+from noodles import serial, schedule, gather
 from noodles.tutorial import (sub)
 from noodles.run.job_keeper import JobKeeper
 from noodles.run.scheduler import Job
+from noodles.run.run_with_sqlite import run_parallel
 
 
 def test_add_job():
@@ -27,3 +28,65 @@ def test_add_job():
     db = JobDB(':memory:')
     msg, db_id, value = db.add_job(prov, job_msg, jobs)
     print(msg, db_id, value)
+
+
+@schedule
+def count_calls(x):
+    calls.append(x)
+    return x
+
+
+calls = []
+
+
+def test_store_and_retrieve():
+    registry = serial.base()
+    jobs = JobKeeper()
+
+    with JobDB(':memory:') as db:
+        wf = sub(4, 1)
+        key, node = jobs.register(Job(wf._workflow, wf._workflow.root))
+        prov = prov_key(registry.deep_encode(node))
+
+        assert not db.job_exists(prov)
+        db.new_job(key, prov, registry.deep_encode(node))
+        assert db.job_exists(prov)
+
+        # a second job with the same prov attaches to the running one
+        other, _ = jobs.register(Job(wf._workflow, wf._workflow.root))
+        status, _, _ = db.get_result_or_attach(other, prov, jobs)
+        assert status == 'attached'
+
+        assert db.store_result(key, registry.deep_encode(3)) == [other]
+        db.flush()
+        status, _, result = db.get_result_or_attach(other, prov, jobs)
+        assert status == 'retrieved'
+        assert registry.deep_decode(result) == 3
+
+
+def test_removed_job():
+    registry = serial.base()
+    jobs = JobKeeper()
+
+    with JobDB(':memory:') as db:
+        wf = sub(4, 1)
+        key, node = jobs.register(Job(wf._workflow, wf._workflow.root))
+        prov = prov_key(registry.deep_encode(node))
+
+        # as if the job was removed in between `job_exists` and this
+        status, other_key, _ = db.get_result_or_attach(key, prov, jobs)
+        assert status == 'broken' and other_key is None
+
+
+def test_cached_run(tmpdir):
+    db_file = str(tmpdir.join('cache.db'))
+    calls.clear()
+
+    wf = gather(*[count_calls(i % 5) for i in range(10)])
+    assert run_parallel(wf, 4, serial.base, db_file) == [0, 1, 2, 3, 4] * 2
+    assert sorted(calls) == [0, 1, 2, 3, 4]
+
+    calls.clear()
+    wf = gather(*[count_calls(i) for i in range(7)])
+    assert run_parallel(wf, 4, serial.base, db_file) == list(range(7))
+    assert sorted(calls) == [5, 6]
@@ -0,0 +1,69 @@
+import time
+
+from pytest import raises
+
+from noodles import schedule, gather, run_parallel
+
+
+@schedule
+def value(x):
+    return x
+
+
+@schedule
+def slow(x, dt):
+    time.sleep(dt)
+    return x
+
+
+@schedule
+def add(a, b):
+    return a + b
+
+
+@schedule
+def fail():
+    raise ValueError("failing job")
+
+
+def test_work_stealing():
+    wf = gather(*[add(value(i), value(2 * i)) for i in range(1000)])
+    result = run_parallel(wf, 4, engine='work_stealing')
+    assert result == [3 * i for i in range(1000)]
+
+
+def test_stealing_idle_threads():
+    # jobs are handed out in turn, so the slow jobs all end up with the
+    # first thread; the others should take the rest of its work.
+    wf = gather(*[slow(i, 0.2 if i % 4 == 0 else 0.0) for i in range(16)])
+
+    start = time.time()
+    result = run_parallel(wf, 4, engine='work_stealing')
+    elapsed = time.time() - start
+
+    assert result == list(range(16))
+    assert elapsed < 0.7
+
+
+def test_work_stealing_error():
+    with raises(Exception):
+        run_parallel(gather(value(1), fail()), 2, engine='work_stealing')
+
+
+class Abort(BaseException):
+    pass
+
+
+@schedule
+def abort():
+    raise Abort()
+
+
+def test_work_stealing_base_exception():
+    with raises(Abort):
+        run_parallel(gather(value(1), abort()), 2, engine='work_stealing')
+
+
+def test_unknown_engine():
+    with raises(ValueError):
+        run_parallel(value(1), 2, engine='unknown')
@@ -0,0 +1,24 @@
+import time
+
+from noodles import schedule, gather, serial, Scheduler
+from noodles.workflow import get_workflow
+from noodles.run.process import process_worker
+
+
+@schedule
+def sleep_and_print(x):
+    print("Hello from job", x)
+    time.sleep(0.5)
+    return x
+
+
+def test_threaded_worker():
+    wf = gather(*[sleep_and_print(i) for i in range(4)])
+
+    start = time.time()
+    result = Scheduler().run(
+        process_worker(serial.base, n_threads=4), get_workflow(wf))
+    elapsed = time.time() - start
+
+    assert result == [0, 1, 2, 3]
+    assert elapsed < 1.9